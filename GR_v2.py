@@ -1,30 +1,1220 @@
-import customtkinter as ctk
-import tkinter as tk
-from tkinter import ttk, messagebox
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import time
 import threading
 from datetime import datetime
-import time
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 import traceback
 import json
 import re
 import os
+import queue
+import asyncio
+import gzip
+import hashlib
+import heapq
+import random
+import shutil
+import sqlite3
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import itertools
+import numpy as np
+import argparse
+import contextlib
+import csv
+import sys
+
+# Référence des mesures de démarrage (log_startup), prise après les imports ci-dessus
+STARTUP_STARTED = time.perf_counter()
+
+# Interface graphique importée à la demande (load_gui) : le mode ligne de commande s'en passe
+ctk = tk = ttk = messagebox = None
+
+# Selenium importé au premier chargement de page par navigateur (load_selenium)
+webdriver = By = WebDriverWait = EC = None
+TimeoutException = NoSuchElementException = None
+ChromeDriverManager = Service = Options = None
+CHROMEDRIVER_CACHE_FILE = 'chromedriver_path.json'  # Chemin du ChromeDriver résolu par webdriver_manager
+
+# Paramètres du pool de scan
+SCAN_WORKERS = 2  # Nombre de navigateurs par défaut
+SCAN_MAX_WORKERS = 8  # Plafond du nombre de navigateurs simultanés
+SCAN_MAX_RATE = 2.0  # Plafond de politesse : pages chargées par seconde pour tout le pool
+SCAN_MIN_RATE = 0.2  # Débit plancher quand le site ralentit ou renvoie des erreurs
+SCAN_BURST = 2  # Jetons accumulables : chargements possibles d'affilée après une pause
+SCAN_TARGET_LATENCY = 3.0  # Secondes : au-delà (moyenne glissante), le débit est réduit
+PAGE_READY_TIMEOUT = 10  # Secondes d'attente maximale des éléments extraits d'une page coureur
+# Textes affichés à la place d'un coureur quand le dossard n'existe pas (comparés en minuscules)
+RUNNER_NOT_FOUND_MARKERS = ("introuvable", "not found", "n'existe pas")
+RACE_URL_TIMEOUT = 2  # Secondes d'attente du raceId dans l'URL
+
+# Profils de navigateur : 'standard' (fenêtre visible, page complète) ou 'fast' (sans fenêtre, sans ressources lourdes)
+BROWSER_PROFILE = 'standard'
+FAST_WINDOW_SIZE = "1280,900"  # Assez large pour garder la mise en page bureau (classes MUI extraites)
+BLOCKED_URL_PATTERNS = [  # Requêtes bloquées par le profil rapide (Network.setBlockedURLs)
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*facebook.com*", "*hotjar.com*", "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+]
+
+# Cycle de vie des navigateurs
+DRIVER_MAX_PAGES = 500  # Pages chargées avant de remplacer un navigateur
+DRIVER_MAX_RSS_MB = 1500  # Mémoire (Chrome et ses sous-processus) au-delà de laquelle il est remplacé
+DRIVER_MEASURE_EVERY = 10  # Pages entre deux mesures de la mémoire
+DRIVER_PREWARM_RATIO = 0.9  # Part de la limite à partir de laquelle le remplaçant est lancé
+
+# File de scan persistante : nouvelles tentatives et coupe-circuit
+SCAN_JOBS_FILE = 'scan_jobs.sqlite3'  # État de chaque dossard (statut, tentatives, dernière erreur)
+SCAN_MAX_ATTEMPTS = 5  # Tentatives par dossard avant de le marquer en échec
+SCAN_RETRY_BASE = 2.0  # Secondes avant la première nouvelle tentative, doublées ensuite
+SCAN_RETRY_MAX = 120.0  # Plafond du délai entre deux tentatives
+BREAKER_WINDOW = 20  # Dernières réponses observées par le coupe-circuit
+BREAKER_ERROR_RATIO = 0.5  # Proportion d'erreurs qui met le pool en pause
+BREAKER_COOLDOWN = 30.0  # Secondes de pause, doublées à chaque nouvelle coupure
+BREAKER_MAX_COOLDOWN = 600.0
+
+# Récupération HTTP sans navigateur
+LIVETRAIL_BASE_URL = "https://grandraid-reunion-oxybol.v3.livetrail.net"
+RUNNER_PATH = "/fr/2024/runners/{bib}"
+HTTP_CONCURRENCY = 8  # Requêtes HTTP simultanées (connexions keep-alive partagées)
+HTTP_TIMEOUT = 15  # Secondes
+HTTP_MAX_PARSE_MISSES = 5  # Pages reçues mais sans données d'affilée avant de passer à Selenium seul
+
+# Stockage des données : instantané JSON + journal en ajout seul
+DATA_FILE = 'race_data.json'
+JOURNAL_FILE = 'race_data.journal.jsonl'
+JOURNAL_COMPACT_EVERY = 500  # Enregistrements journalisés avant compaction en arrière-plan
+STORAGE_BACKEND = 'json'  # 'json' : instantané + journal en mémoire, 'sqlite' : base indexée lue à la demande
+SQLITE_FILE = 'race_data.sqlite3'
+SQLITE_CACHE_SIZE = 2000  # Coureurs décodés gardés en mémoire avec le stockage SQLite
+SQLITE_READ_CHUNK = 500  # Coureurs lus par requête SQLite (limite des paramètres, lecture par lots)
+RECORD_CACHE_SIZE = 10000  # Coureurs typés (RunnerRecord) gardés en mémoire avec le stockage JSON
+
+# Archive des pages brutes (relecture hors ligne sans Chrome)
+PAGE_ARCHIVE_DIR = 'page_archive'
+ARCHIVE_PAGES = False  # Activable depuis l'interface
+
+# Tableau principal
+VIRTUAL_TREE_THRESHOLD = 2000  # Au-delà, le tableau ne matérialise que les lignes visibles
+TREE_ROW_HEIGHT = 25
+TREE_WHEEL_ROWS = 3  # Lignes parcourues par cran de molette en mode virtuel
+UI_TICK_MS = 100  # Période de traitement des évènements postés par les threads de travail
+UI_BATCH_SIZE = 1000  # Évènements traités au plus par période
+
+# Parcours d'une plage de dossards (reprise après interruption)
+CRAWL_JOURNAL_FILE = 'crawl_progress.jsonl'  # Dossards traités : une ligne JSON par dossard
+MAX_BIB_COUNT = 100000  # Dossards acceptés au plus dans une liste ou une plage (ex. "1-99999999" refusé)
+
+# Suivi en direct
+LIVE_REFRESH_INTERVAL = 180  # Secondes entre deux rafraîchissements des coureurs encore en course
+FINAL_STATES = ("Finisher", "Abandon", "Non partant")  # États qui ne changent plus
+
+# Durée de validité d'un relevé en cache selon l'état du coureur (secondes, None : définitif)
+CACHE_TTL = {
+    "Finisher": None,
+    "Non partant": None,
+    "Abandon": 6 * 3600,  # Un abandon peut encore être corrigé par l'organisation
+    "En course": 10 * 60,  # Valeur aussi utilisée pour les états inconnus
+}
+
+# Cache des classements TOP
+TOP_CACHE_SIZE = 256  # Classements (course, analyse, section) gardés en mémoire
+MATRIX_CACHE_SIZE = 8  # Matrices coureurs × points (sélection, course) partagées entre fenêtres TOP
+
+# Script exécuté dans la page : renvoie en un seul aller-retour les textes bruts de l'en-tête
+# et du tableau des points de passage. La normalisation est faite en Python (build_runner_data).
+PAGE_EXTRACTION_JS = """
+const first = (root, cls) => root.getElementsByClassName(cls)[0] || null;
+const all = (root, cls) => Array.from(root.getElementsByClassName(cls));
+const text = el => el ? el.innerText.trim() : null;
+
+const page = {
+    name: text(first(document, 'mui-oah8u0')),
+    category: text(first(document, 'mui-1vu7he5')),
+    state: null,
+    finish_time: null,
+    speed_items: [],
+    rankings: [],
+    rows: []
+};
+
+// État : Finisher dans mui-w9oezj, Abandon / Non partant dans mui-gzldy9
+let container = first(document, 'mui-w9oezj');
+let stateElement = container ? container.querySelector('p.MuiTypography-noWrap') : null;
+if (!stateElement) {
+    const fallback = first(document, 'mui-gzldy9');
+    if (fallback) {
+        container = fallback;
+        stateElement = first(container, 'mui-1xavr8a') || first(container, 'mui-evvpi6');
+    }
+}
+if (stateElement) {
+    page.state = text(stateElement);
+    page.finish_time = text(first(container, 'mui-1vazesu'));
+}
+
+// Vitesse moyenne : deuxième section d'infos du conteneur principal
+const main = first(document, 'mui-14iziq5');
+const infoSections = main ? all(main, 'mui-157h3i3') : [];
+if (infoSections.length >= 2) {
+    for (const element of all(infoSections[1], 'mui-8v90jo')) {
+        const labelContainer = first(element, 'mui-ct9q29');
+        const label = labelContainer ? first(labelContainer, 'mui-wenrje') : null;
+        const values = element.getElementsByTagName('p');
+        if (label && values.length) {
+            page.speed_items.push([text(label), text(values[values.length - 1])]);
+        }
+    }
+}
+
+// Classements : première section d'infos de la page
+const rankingSection = first(document, 'mui-157h3i3');
+if (rankingSection) {
+    for (const element of all(rankingSection, 'mui-4ae55t')) {
+        const type = first(element, 'mui-280lq');
+        const value = first(element, 'mui-17rj2i9');
+        if (type && value) {
+            page.rankings.push([text(type), text(value)]);
+        }
+    }
+}
+
+// Tableau des points de passage
+for (const row of document.getElementsByClassName('MuiTableRow-root')) {
+    const cells = all(row, 'MuiTableCell-root');
+    const point = first(row, 'mui-1v8uc0v');
+    if (cells.length < 7 || !point) {
+        continue;
+    }
+
+    // Temps de course : premier mui-193t7sq de la 5e cellule hors bloc temps de repos (mui-1jkxyqi)
+    const raceTime = all(cells[4], 'mui-193t7sq').find(
+        el => !(el.parentElement.getAttribute('class') || '').includes('mui-1jkxyqi')
+    );
+
+    let effortSpeed = null;
+    const effortContainer = all(row, 'mui-1jkxyqi').find(el => el.innerText.includes('Vitesse effort'));
+    if (effortContainer) {
+        effortSpeed = text(first(effortContainer, 'mui-vm42pa'));
+    }
+
+    let rank = null;
+    let evolution = null;
+    for (const cell of all(row, 'mui-ct9q29')) {
+        const rankElement = first(cell, 'mui-n2g1ua');
+        if (rankElement) {
+            rank = text(rankElement);
+            evolution = text(first(cell, 'mui-2e3q6l') || first(cell, 'mui-1duggqj'));
+            break;
+        }
+    }
+
+    page.rows.push({
+        point: text(point),
+        kilometer: text(first(row, 'mui-o6szkf')),
+        passage_time: text(first(row, 'mui-1g6ia2u')),
+        race_time: text(raceTime),
+        speeds: all(row, 'mui-193t7sq').map(text),
+        effort_speed: effortSpeed,
+        elevations: all(row, 'mui-vm42pa').map(text),
+        rank: rank,
+        rank_evolution: evolution
+    });
+}
+
+// Octets reçus pour la page et ses ressources (mesures par profil de navigateur)
+page.transferred = performance.getEntriesByType('navigation')
+    .concat(performance.getEntriesByType('resource'))
+    .reduce((total, entry) => total + (entry.transferSize || 0), 0);
+
+return page;
+"""
+
+
+def load_gui():
+    """Importe customtkinter/tkinter au lancement de l'interface graphique"""
+    global ctk, tk, ttk, messagebox
+    import customtkinter as ctk
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+
+
+def load_selenium():
+    """Importe Selenium et webdriver_manager au premier besoin d'un navigateur"""
+    global webdriver, By, WebDriverWait, EC, TimeoutException, NoSuchElementException
+    global ChromeDriverManager, Service, Options
+    if webdriver is not None:
+        return
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException, NoSuchElementException
+    from webdriver_manager.chrome import ChromeDriverManager
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    log_startup("Selenium importé")
+
+
+def resolve_chromedriver(refresh=False):
+    """Chemin du ChromeDriver : relu depuis le cache disque, sinon résolu par webdriver_manager"""
+    if not refresh and os.path.exists(CHROMEDRIVER_CACHE_FILE):
+        try:
+            with open(CHROMEDRIVER_CACHE_FILE, 'r', encoding='utf-8') as f:
+                path = json.load(f).get('path')
+            if path and os.path.exists(path):
+                return path
+        except (OSError, ValueError) as e:
+            print(f"Cache du ChromeDriver illisible: {e}")
+
+    print("Installation du ChromeDriver...")
+    started = time.perf_counter()
+    path = ChromeDriverManager().install()
+    print(f"ChromeDriver résolu en {time.perf_counter() - started:.1f}s: {path}")
+    try:
+        with open(CHROMEDRIVER_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'path': path, 'resolved_at': datetime.now().isoformat()}, f)
+    except OSError as e:
+        print(f"Impossible d'enregistrer le chemin du ChromeDriver: {e}")
+    return path
+
+
+def log_startup(step):
+    """Affiche le temps écoulé depuis le lancement du programme"""
+    print(f"[démarrage] {step}: {(time.perf_counter() - STARTUP_STARTED) * 1000:.0f} ms")
+
+
+def parse_bib_list(text, max_count=MAX_BIB_COUNT):
+    """
+    Liste de dossards "12, 40-45, 300" -> [12, 40, 41, ..., 45, 300] (ValueError si invalide ou trop longue).
+    Un dossard saisi plusieurs fois n'est gardé qu'à sa première position.
+    """
+    bibs = {}  # Dossard -> None : ensemble qui garde l'ordre de saisie
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = (int(bound) for bound in part.split('-', 1))
+            if start > end:
+                raise ValueError(f"Plage de dossards invalide : {part}")
+            if end - start + 1 > max_count:
+                raise ValueError(f"Plus de {max_count} dossards demandés : {part}")
+            bibs.update(dict.fromkeys(range(start, end + 1)))
+        else:
+            bibs[int(part)] = None
+        if len(bibs) > max_count:
+            raise ValueError(f"Plus de {max_count} dossards demandés")
+    return list(bibs)
+
+
+def parse_duration(text):
+    """Convertit un temps H:MM:SS (heures au-delà de 24 acceptées) en secondes, None si invalide"""
+    match = re.fullmatch(r'(\d+):(\d{1,2}):(\d{1,2})', text.strip()) if isinstance(text, str) else None
+    if not match:
+        return None
+    hours, minutes, seconds = map(int, match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def format_duration(seconds):
+    """Affiche une durée en secondes au format HH:MM:SS"""
+    return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+
+def format_age(timestamp, now=None):
+    """Âge d'un relevé horodaté ("il y a 12 min"), "inconnu" sans horodatage"""
+    if not timestamp:
+        return "inconnu"
+    minutes = int(((now or time.time()) - timestamp) // 60)
+    if minutes < 1:
+        return "à l'instant"
+    if minutes < 60:
+        return f"il y a {minutes} min"
+    return f"il y a {minutes // 60} h {minutes % 60:02d}"
+
+
+def parse_speed(text):
+    """Convertit une vitesse affichée ("6.2 km/h") en km/h, None si absente"""
+    try:
+        return float(text.replace('km/h', '').strip())
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_rank(value):
+    """Convertit un classement affiché en entier, None si absent"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
+class CheckpointRecord:
+    """Point de passage typé : temps, vitesses et classements sont analysés une seule fois"""
+    point: str
+    kilometer: float
+    race_seconds: int | None
+    speed: float | None
+    effort_speed: float | None
+    elevation_gain: int
+    elevation_loss: int
+    rank: int | None
+    rank_evolution: int | None
+    rank_invalid: bool = False  # Classement affiché mais illisible (ex. "DNF"), distinct d'un classement absent
+
+    @classmethod
+    def from_dict(cls, checkpoint):
+        rank = parse_rank(checkpoint.get('rank'))
+        return cls(
+            point=checkpoint['point'],
+            kilometer=checkpoint.get('kilometer') or 0,
+            race_seconds=parse_duration(checkpoint.get('race_time')),
+            speed=parse_speed(checkpoint.get('speed')),
+            effort_speed=parse_speed(checkpoint.get('effort_speed')),
+            elevation_gain=checkpoint.get('elevation_gain') or 0,
+            elevation_loss=checkpoint.get('elevation_loss') or 0,
+            rank=rank,
+            rank_evolution=checkpoint.get('rank_evolution'),
+            rank_invalid=rank is None and bool(checkpoint.get('rank'))
+        )
+
+
+@dataclass(slots=True)
+class RunnerRecord:
+    """Coureur typé utilisé par les analyses ; les textes affichés restent dans les données brutes"""
+    race_name: str
+    name: str
+    category: str
+    state: str
+    checkpoints: list
+    values: object = field(default=None, repr=False, compare=False)  # Passages en colonnes (checkpoint_values)
+    points: tuple = field(default=None, repr=False, compare=False)  # Noms des points, dans l'ordre des passages
+
+    # Colonnes de checkpoint_values, dans l'ordre
+    VALUE_COLUMNS = (
+        'race_seconds', 'rank', 'kilometer', 'elevation_gain', 'elevation_loss', 'speed', 'effort_speed',
+        'rank_invalid'
+    )
+
+    @classmethod
+    def from_data(cls, runner_data):
+        infos = runner_data['infos']
+        record = cls(
+            race_name=infos['race_name'],
+            name=infos['name'],
+            category=infos.get('category'),
+            state=infos.get('state'),
+            checkpoints=[CheckpointRecord.from_dict(cp) for cp in runner_data['checkpoints']]
+        )
+        record.checkpoint_values()  # Préparées au stockage : RaceMatrix n'a plus qu'à les assembler
+        return record
+
+    def checkpoint_values(self):
+        """Tableau passages × VALUE_COLUMNS (NaN pour une valeur absente), calculé une seule fois"""
+        if self.values is None:
+            self.points = tuple(cp.point for cp in self.checkpoints)
+            self.values = np.array([
+                [np.nan if value is None else value for value in (
+                    cp.race_seconds, cp.rank, cp.kilometer, cp.elevation_gain, cp.elevation_loss,
+                    cp.speed, cp.effort_speed, cp.rank_invalid
+                )]
+                for cp in self.checkpoints
+            ], dtype=float).reshape(-1, len(self.VALUE_COLUMNS))
+        return self.values
+
+
+class RaceMatrix:
+    """
+    Matrice coureurs × points de passage (NaN pour les passages absents) sur laquelle
+    les classements TOP sont calculés par opérations vectorisées
+    """
+
+    def __init__(self, runners):
+        self.bibs = [bib for bib, record in runners]
+        self.names = [record.name for bib, record in runners]
+        self.races = [record.race_name for bib, record in runners]
+        self.counts = np.array([len(record.checkpoints) for bib, record in runners], dtype=np.int64)
+        n = len(runners)
+        m = int(self.counts.max()) if n else 0
+        self.shape = (n, m)
+
+        # Position (ligne, colonne) de chaque point de passage dans la matrice
+        total = int(self.counts.sum())
+        rows = np.repeat(np.arange(n), self.counts)
+        cols = np.arange(total) - np.repeat(np.cumsum(self.counts) - self.counts, self.counts)
+
+        # Les colonnes de chaque coureur sont déjà prêtes dans son RunnerRecord : un seul assemblage
+        values = np.concatenate(
+            [record.checkpoint_values() for bib, record in runners] or [np.empty((0, len(RunnerRecord.VALUE_COLUMNS)))]
+        )
+
+        columns = np.full((len(RunnerRecord.VALUE_COLUMNS), n, m), np.nan)
+        columns[:, rows, cols] = values.T
+        self.seconds, self.rank, self.km, self.gain, self.loss, self.speed, self.effort, invalid = columns
+        self.rank_invalid = invalid == 1
+
+        # Points codés en entiers ; une section est codée par la paire de points consécutifs.
+        # Les coureurs d'une course suivent peu de suites de points différentes : chacune est codée une fois
+        point_ids = {}
+        sequences = {}
+
+        def encode(points):
+            codes = sequences.get(points)
+            if codes is None:
+                codes = np.array([point_ids.setdefault(point, len(point_ids)) for point in points], dtype=np.int64)
+                sequences[points] = codes
+            return codes
+
+        codes = np.concatenate(
+            [encode(record.points) for bib, record in runners] or [np.empty(0, dtype=np.int64)]
+        )
+        self.point_names = list(point_ids)
+        self.points = np.full((n, m), -1, dtype=np.int64)
+        self.points[rows, cols] = codes
+        width = max(len(self.point_names), 1)
+        start, end = self.points[:, :-1], self.points[:, 1:]
+        self.sections = np.where((start >= 0) & (end >= 0), start * width + end, -1)
+
+        # Temps et distances entre deux points consécutifs
+        with np.errstate(invalid='ignore'):
+            self.segment_seconds = self.seconds[:, 1:] - self.seconds[:, :-1]
+            self.segment_hours = self.segment_seconds / 3600
+            self.segment_km = self.km[:, 1:] - self.km[:, :-1]
+
+        self.section_infos = None
+        self.build_section_index()
+
+    def build_section_index(self):
+        """
+        Index des sections : les passages (ligne, colonne de départ, secondes) de chaque section
+        sont contigus et triés par temps, une section se lit par simple découpage
+        """
+        rows, cols = np.nonzero(self.moving())
+        seconds = self.segment_seconds[rows, cols]
+        codes = self.sections[rows, cols]
+        order = np.lexsort((seconds, codes))  # Tri stable : ex-aequo dans l'ordre des coureurs
+        self.section_rows = rows[order]
+        self.section_cols = cols[order]
+        self.section_seconds = seconds[order]
+        keys, starts, counts = np.unique(codes[order], return_index=True, return_counts=True)
+        self.section_index = {
+            self.section_name(key): (start, start + count)
+            for key, start, count in zip(keys.tolist(), starts.tolist(), counts.tolist())
+        }
+
+    def section_name(self, code):
+        width = max(len(self.point_names), 1)
+        return f"{self.point_names[code // width]} → {self.point_names[code % width]}"
+
+    def point(self, row, col):
+        return self.point_names[self.points[row, col]]
+
+    @staticmethod
+    def top_desc(limit, *keys):
+        """
+        Indices des limit premiers par clés décroissantes : la première clé est départagée par
+        les suivantes puis par la position, comme des list.sort(reverse=True) successifs.
+        Seuls les candidats au niveau du limit-ième de la première clé sont triés.
+        """
+        primary = keys[0]
+        candidates = np.arange(len(primary))
+        if 0 < limit < len(primary):
+            with np.errstate(invalid='ignore'):
+                threshold = np.partition(-primary, limit - 1)[limit - 1]
+                selected = np.nonzero(-primary <= threshold)[0]
+            if len(selected) >= limit:  # Sinon (valeurs NaN) : tri complet
+                candidates = selected
+        order = np.lexsort([-key[candidates] for key in reversed(keys)])
+        return candidates[order[:limit]]
+
+    @staticmethod
+    def row_sum(values):
+        """Somme ligne par ligne, accumulée dans l'ordre des colonnes comme la boucle Python"""
+        if values.shape[1] == 0:
+            return np.zeros(values.shape[0])
+        return np.cumsum(values, axis=1)[:, -1]
+
+    def moving(self):
+        with np.errstate(invalid='ignore'):
+            return self.segment_hours > 0
+
+    def progressions(self, limit=20):
+        """Places gagnées entre le premier et le dernier classement connu"""
+        n, m = self.shape
+        if not n or not m:
+            return []
+        has_rank = ~np.isnan(self.rank)
+        index = np.arange(n)
+        first = self.rank[index, has_rank.argmax(axis=1)]
+        last = self.rank[index, m - 1 - has_rank[:, ::-1].argmax(axis=1)]
+        progression = first - last
+        eligible = np.nonzero((self.counts >= 2) & has_rank.any(axis=1))[0]
+        return [
+            {
+                'progression': int(progression[row]),
+                'bib': self.bibs[row],
+                'name': self.names[row],
+                'race': self.races[row],
+                'start_pos': int(first[row]),
+                'end_pos': int(last[row])
+            }
+            for row in eligible[self.top_desc(limit, progression[eligible])]
+        ]
+
+    def section_progressions(self, limit=20):
+        """Places gagnées entre deux points consécutifs"""
+        with np.errstate(invalid='ignore'):
+            progression = self.rank[:, :-1] - self.rank[:, 1:]
+            rows, cols = np.nonzero(progression > 0)
+        values = progression[rows, cols]
+        return [
+            {
+                'progression': int(values[i]),
+                'bib': self.bibs[rows[i]],
+                'name': self.names[rows[i]],
+                'race': self.races[rows[i]],
+                'from_point': self.point(rows[i], cols[i]),
+                'to_point': self.point(rows[i], cols[i] + 1),
+                'start_rank': int(self.rank[rows[i], cols[i]]),
+                'end_rank': int(self.rank[rows[i], cols[i] + 1])
+            }
+            for i in self.top_desc(limit, values)
+        ]
+
+    def vertical_speeds(self, elevation, key, limit=20):
+        """Vitesse verticale sur les sections de plus de 100 m de dénivelé"""
+        with np.errstate(invalid='ignore'):
+            mask = (elevation[:, :-1] > 100) & self.moving()
+        total_time = self.row_sum(np.where(mask, self.segment_hours, 0.0))
+        total_elevation = np.where(mask, np.abs(elevation[:, :-1]), 0).sum(axis=1)
+        total_distance = self.row_sum(np.where(mask, self.segment_km, 0.0))
+        eligible = np.nonzero(total_time > 0)[0]
+        speed = np.zeros(len(total_time))
+        speed[eligible] = total_elevation[eligible] / total_time[eligible]
+        results = []
+        for row in eligible[self.top_desc(limit, speed[eligible])]:
+            distance = total_distance[row]
+            results.append({
+                'speed': speed[row],
+                'bib': self.bibs[row],
+                'name': self.names[row],
+                'race': self.races[row],
+                key: int(total_elevation[row]),
+                'time': total_time[row],
+                'distance': distance,
+                'elevation_ratio': total_elevation[row] / (distance * 1000) if distance > 0 else 0
+            })
+        return results
+
+    def climbers(self, limit=20):
+        return self.vertical_speeds(self.gain, 'elevation_gain', limit)
+
+    def descenders(self, limit=20):
+        return self.vertical_speeds(self.loss, 'elevation_loss', limit)
+
+    def average_speeds(self, limit=20):
+        """Moyennes des vitesses et des vitesses effort relevées aux points de passage"""
+        valid = ~np.isnan(self.speed) & ~np.isnan(self.effort)
+        count = valid.sum(axis=1)
+        eligible = np.nonzero(count > 0)[0]
+        rankings = {}
+        for key, values in (('speed', self.speed), ('effort', self.effort)):
+            average = np.zeros(len(count))
+            average[eligible] = self.row_sum(np.where(valid, values, 0.0))[eligible] / count[eligible]
+            rankings[key] = [
+                {key: average[row], 'bib': self.bibs[row], 'name': self.names[row], 'race': self.races[row]}
+                for row in eligible[self.top_desc(limit, average[eligible])]
+            ]
+        return rankings['speed'], rankings['effort']
+
+    def section_speeds(self, limit=20):
+        """Vitesses réelles entre deux points consécutifs"""
+        rows, cols = np.nonzero(self.moving())
+        distance = self.segment_km[rows, cols]
+        speed = distance / self.segment_hours[rows, cols]
+        return [
+            {
+                'speed': speed[i],
+                'bib': self.bibs[rows[i]],
+                'name': self.names[rows[i]],
+                'race': self.races[rows[i]],
+                'from_point': self.point(rows[i], cols[i]),
+                'to_point': self.point(rows[i], cols[i] + 1),
+                'distance': distance[i]
+            }
+            for i in self.top_desc(limit, speed)
+        ]
+
+    def sections_info(self):
+        """Distance et dénivelés de chaque section, relevés à sa première occurrence"""
+        if self.section_infos is None:
+            self.section_infos = self.collect_sections_info()
+        return self.section_infos
+
+    def collect_sections_info(self):
+        flat = self.sections.ravel()
+        # Première position de chaque code de section (décalé de 1 : -1 signifie pas de section)
+        point_count = max(len(self.point_names), 1)
+        first = np.full(point_count * point_count + 1, len(flat))
+        np.minimum.at(first, flat + 1, np.arange(len(flat)))
+        codes = np.nonzero(first[1:] < len(flat))[0]
+        width = max(self.shape[1] - 1, 1)
+        infos = {}
+        for code, index in sorted(zip(codes.tolist(), first[codes + 1].tolist()), key=lambda item: item[1]):
+            row, col = divmod(index, width)
+            name = self.section_name(code)
+            infos[name] = {
+                'name': name,
+                'distance': self.km[row, col + 1] - self.km[row, col],
+                'elevation_gain': int(self.gain[row, col + 1]),
+                'elevation_loss': int(self.loss[row, col + 1])
+            }
+        return infos
+
+    def section_performances(self, section_name, section_info, limit=20):
+        """Classements temps, vitesse, vitesse effort et progression sur une section"""
+        if section_name not in self.section_index:
+            return {}
+        start, end = self.section_index[section_name]
+        rows, cols = self.section_rows[start:end], self.section_cols[start:end]
+        seconds = self.section_seconds[start:end]
+        # Passages dont un classement est illisible : écartés, comme avant les données typées
+        readable = ~(self.rank_invalid[rows, cols] | self.rank_invalid[rows, cols + 1])
+        rows, cols, seconds = rows[readable], cols[readable], seconds[readable]
+        if not len(seconds):
+            return {}
+        hours = seconds / 3600
+        speed = section_info['distance'] / hours
+        effort = (
+            section_info['distance'] +
+            (section_info['elevation_gain'] / 1000 * 10) +
+            (section_info['elevation_loss'] / 1000 * 2)
+        ) / hours
+        rank1 = np.nan_to_num(self.rank[rows, cols])
+        rank2 = np.nan_to_num(self.rank[rows, cols + 1])
+        progression = np.where((rank1 != 0) & (rank2 != 0), rank1 - rank2, 0)
+
+        # Tendance commune à toute la section (montée/descente/plat)
+        total_distance_m = section_info['distance'] * 1000
+        tendency = "➡️"
+        if total_distance_m > 0:
+            elevation_ratio = (section_info['elevation_gain'] - section_info['elevation_loss']) / total_distance_m
+            if elevation_ratio > 0.05:
+                tendency = "↗️"
+            elif elevation_ratio < -0.05:
+                tendency = "↘️"
+
+        # Tris successifs stables, chacun départageant les ex-aequo par le classement précédent
+        orders = {
+            'time': np.arange(min(limit, len(seconds))),  # L'index est déjà trié par temps
+            'speed': self.top_desc(limit, speed),
+            'effort': self.top_desc(limit, effort, speed),
+            'progression': self.top_desc(limit, progression, effort, speed)
+        }
+
+        def performances(order):
+            columns = (rows, seconds, speed, effort, progression, rank1, rank2)
+            return [
+                {
+                    'bib': self.bibs[row],
+                    'name': self.names[row],
+                    'race': self.races[row],
+                    'time': int(time),
+                    'speed': row_speed,
+                    'effort_speed': row_effort,
+                    'progression': int(row_progression),
+                    'start_rank': int(start_rank),
+                    'end_rank': int(end_rank),
+                    'tendency': tendency
+                }
+                for row, time, row_speed, row_effort, row_progression, start_rank, end_rank
+                in zip(*(values[order].tolist() for values in columns))
+            ]
+
+        return {key: performances(order) for key, order in orders.items()}
+
+
+class TopResultCache:
+    """
+    Cache LRU des classements TOP. Chaque résultat est rangé avec la version des données
+    de sa course : il reste valable tant qu'aucun scan n'a touché cette course.
+    """
+
+    def __init__(self, max_size=TOP_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()  # clé -> (version, résultat)
+        self.lock = threading.Lock()
+
+    def get(self, key, version):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, version, result):
+        with self.lock:
+            self.entries[key] = (version, result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class JsonRaceStore:
+    """
+    Stockage des coureurs : un instantané (race_data.json) et un journal en ajout seul
+    (une ligne JSON par relevé). Un nouveau coureur est journalisé en entier ; un relevé qui
+    ne fait qu'ajouter des passages n'écrit que ses infos et les nouveaux passages, un relevé
+    identique seulement sa date (scraped_at).
+    La compaction réécrit l'instantané en arrière-plan. Au chargement, l'instantané
+    est rejoué avec le journal : un arrêt brutal ne perd au plus que la ligne en cours.
+    """
+
+    def __init__(self, data_path=DATA_FILE, journal_path=JOURNAL_FILE, compact_every=JOURNAL_COMPACT_EVERY):
+        self.data_path = data_path
+        self.journal_path = journal_path
+        self.rotated_path = journal_path + '.compacting'  # Journal en cours d'intégration à l'instantané
+        self.compact_every = compact_every
+        self.lock = threading.Lock()
+        self.compaction_lock = threading.Lock()
+        self.journal = None
+        self.pending = 0
+
+    def replay(self, path, data):
+        """Rejoue un journal dans data et renvoie le nombre d'enregistrements lus"""
+        if not os.path.exists(path):
+            return 0
+        count = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"Enregistrement incomplet ignoré dans {path}")
+                    continue
+                if 'data' in record:
+                    data[record['bib']] = record['data']
+                elif 'checkpoints_from' not in record:
+                    # Relevé identique : seule la date du relevé change
+                    base = data.get(record['bib'])
+                    if base is not None:
+                        data[record['bib']] = {**base, 'infos': {**base['infos'], 'scraped_at': record['scraped_at']}}
+                else:
+                    # Relevé partiel : passages connus repris jusqu'à checkpoints_from
+                    base = data.get(record['bib'])
+                    if base is None or len(base['checkpoints']) < record['checkpoints_from']:
+                        print(f"Relevé partiel sans base ignoré pour le dossard {record['bib']}")
+                        continue
+                    data[record['bib']] = {
+                        'infos': record['infos'],
+                        'checkpoints': base['checkpoints'][:record['checkpoints_from']] + record['checkpoints']
+                    }
+                count += 1
+        return count
+
+    def load(self):
+        data = {}
+        if os.path.exists(self.data_path):
+            with open(self.data_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+        replayed = self.replay(self.rotated_path, data)
+        replayed += self.replay(self.journal_path, data)
+        if replayed:
+            print(f"{replayed} enregistrements rejoués depuis le journal")
+
+        # Compaction interrompue ou journal volumineux : intégrer le journal dès maintenant
+        if os.path.exists(self.rotated_path) or replayed >= self.compact_every:
+            self.compact(lambda: dict(data))
+        return data
+
+    @staticmethod
+    def journal_entry(bib_str, runner_data, previous=None):
+        """Ligne du journal : le coureur entier, ou seulement les passages ajoutés depuis previous"""
+        if previous is not None:
+            known = len(previous['checkpoints'])
+            if runner_data['checkpoints'][:known] == previous['checkpoints']:
+                return {
+                    'bib': bib_str,
+                    'infos': runner_data['infos'],
+                    'checkpoints_from': known,
+                    'checkpoints': runner_data['checkpoints'][known:]
+                }
+        return {'bib': bib_str, 'data': runner_data}
+
+    def append(self, bib_str, runner_data, previous=None):
+        """Ajoute un relevé au journal ; renvoie True si une compaction est souhaitable"""
+        return self.write_entry(self.journal_entry(bib_str, runner_data, previous))
+
+    def touch(self, bib_str, scraped_at):
+        """Journalise la date d'un relevé identique aux données connues"""
+        return self.write_entry({'bib': bib_str, 'scraped_at': scraped_at})
+
+    def write_entry(self, entry):
+        line = json.dumps(entry, ensure_ascii=False)
+        with self.lock:
+            if self.journal is None:
+                self.journal = open(self.journal_path, 'a', encoding='utf-8')
+                if self.journal.tell() and not self.ends_with_newline(self.journal_path):
+                    self.journal.write('\n')  # Isoler une ligne tronquée par un arrêt brutal
+            self.journal.write(line + '\n')
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+            self.pending += 1
+            return self.pending >= self.compact_every
+
+    @staticmethod
+    def ends_with_newline(path):
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def rotate_journal(self):
+        """
+        Met le journal de côté. Si un journal mis de côté n'a pas encore été intégré
+        (instantané en échec, arrêt brutal), le journal courant lui est ajouté plutôt
+        que de l'écraser.
+        """
+        if not os.path.exists(self.journal_path):
+            return
+        if not os.path.exists(self.rotated_path):
+            os.replace(self.journal_path, self.rotated_path)
+            return
+        with open(self.journal_path, 'rb') as source, open(self.rotated_path, 'ab') as rotated:
+            if rotated.tell() and not self.ends_with_newline(self.rotated_path):
+                rotated.write(b'\n')
+            shutil.copyfileobj(source, rotated)
+            rotated.flush()
+            os.fsync(rotated.fileno())
+        os.remove(self.journal_path)
+
+    def compact(self, snapshot_source, background=False):
+        """
+        Réécrit l'instantané. snapshot_source() est appelé juste après la mise de côté
+        du journal et doit renvoyer une copie de toutes les données déjà journalisées.
+        """
+        if not self.compaction_lock.acquire(blocking=not background):
+            return  # Une compaction est déjà en cours
+        try:
+            with self.lock:
+                if self.journal:
+                    self.journal.close()
+                    self.journal = None
+                self.rotate_journal()
+                self.pending = 0
+            data = snapshot_source()
+        except Exception:
+            self.compaction_lock.release()
+            raise
+
+        if background:
+            thread = threading.Thread(target=self.write_snapshot, args=(data,))
+            thread.daemon = True
+            thread.start()
+        else:
+            self.write_snapshot(data)
+
+    def write_snapshot(self, data):
+        try:
+            tmp_path = self.data_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.data_path)
+            if os.path.exists(self.rotated_path):
+                os.remove(self.rotated_path)
+            print(f"Instantané des données écrit ({len(data)} coureurs)")
+        except Exception as e:
+            print(f"Erreur lors de l'écriture de l'instantané: {e}")
+        finally:
+            self.compaction_lock.release()
+
+    def close(self):
+        with self.lock:
+            if self.journal:
+                self.journal.close()
+                self.journal = None
+
+
+class SQLiteRaceStore:
+    """
+    Stockage SQLite : tables normalisées runners / checkpoints indexées par course, état,
+    catégorie, dossard et point de passage. Les données ne sont pas chargées en mémoire :
+    load() renvoie un SQLiteRunnerMap qui lit les coureurs à la demande et écrit
+    directement dans la base.
+    """
+
+    RUNNER_COLUMNS = (
+        'race_name', 'name', 'category', 'state', 'finish_time', 'overall_rank', 'gender_rank',
+        'category_rank', 'average_speed', 'last_checkpoint', 'total_elevation_gain', 'total_elevation_loss'
+    )
+    CHECKPOINT_COLUMNS = (
+        'point', 'kilometer', 'passage_time', 'race_time', 'speed', 'effort_speed',
+        'elevation_gain', 'elevation_loss', 'rank', 'rank_evolution'
+    )
+
+    def __init__(self, path=SQLITE_FILE):
+        self.path = path
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.create_schema()
+
+    def create_schema(self):
+        with self.lock, self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS runners (
+                    bib TEXT PRIMARY KEY,
+                    race_name TEXT,
+                    name TEXT,
+                    category TEXT,
+                    state TEXT,
+                    finish_time TEXT,
+                    overall_rank TEXT,
+                    gender_rank TEXT,
+                    category_rank TEXT,
+                    average_speed TEXT,
+                    last_checkpoint TEXT,
+                    total_elevation_gain INTEGER,
+                    total_elevation_loss INTEGER,
+                    infos TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    bib TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    point TEXT,
+                    kilometer REAL,
+                    passage_time TEXT,
+                    race_time TEXT,
+                    speed TEXT,
+                    effort_speed TEXT,
+                    elevation_gain INTEGER,
+                    elevation_loss INTEGER,
+                    rank TEXT,
+                    rank_evolution INTEGER,
+                    PRIMARY KEY (bib, idx)
+                );
+                CREATE INDEX IF NOT EXISTS idx_runners_race ON runners(race_name);
+                CREATE INDEX IF NOT EXISTS idx_runners_state ON runners(state);
+                CREATE INDEX IF NOT EXISTS idx_runners_category ON runners(category);
+                CREATE INDEX IF NOT EXISTS idx_checkpoints_point ON checkpoints(point);
+            """)
+
+    def load(self):
+        # Première utilisation : reprendre les données JSON existantes
+        if not self.count() and (os.path.exists(DATA_FILE) or os.path.exists(JOURNAL_FILE)):
+            data = JsonRaceStore().load()
+            if data:
+                print(f"Import de {len(data)} coureurs depuis {DATA_FILE} dans {self.path}")
+                self.write_runners(data.items())
+        return SQLiteRunnerMap(self)
+
+    def write_runners(self, items):
+        """Insère ou remplace des coureurs (bib_str, données) en une transaction"""
+        with self.lock, self.connection:
+            for bib_str, runner_data in items:
+                infos = runner_data['infos']
+                self.connection.execute("DELETE FROM checkpoints WHERE bib = ?", (bib_str,))
+                self.connection.execute(
+                    f"INSERT OR REPLACE INTO runners (bib, {', '.join(self.RUNNER_COLUMNS)}, infos) "
+                    f"VALUES (?, {', '.join('?' for _ in self.RUNNER_COLUMNS)}, ?)",
+                    (bib_str, *(infos.get(column) for column in self.RUNNER_COLUMNS),
+                     json.dumps(infos, ensure_ascii=False))
+                )
+                self.connection.executemany(
+                    f"INSERT INTO checkpoints (bib, idx, {', '.join(self.CHECKPOINT_COLUMNS)}) "
+                    f"VALUES (?, ?, {', '.join('?' for _ in self.CHECKPOINT_COLUMNS)})",
+                    [
+                        (bib_str, idx, *(cp.get(column) for column in self.CHECKPOINT_COLUMNS))
+                        for idx, cp in enumerate(runner_data['checkpoints'])
+                    ]
+                )
+
+    def delete_runner(self, bib_str):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM checkpoints WHERE bib = ?", (bib_str,))
+            self.connection.execute("DELETE FROM runners WHERE bib = ?", (bib_str,))
+
+    def read_runners(self, bibs=None, race=None):
+        """Lit les coureurs (tous, ou les dossards demandés) éventuellement filtrés par course"""
+        conditions = []
+        params = []
+        if race is not None:
+            conditions.append("r.race_name = ?")
+            params.append(race)
+
+        chunks = [None] if bibs is None else [
+            bibs[i:i + SQLITE_READ_CHUNK] for i in range(0, len(bibs), SQLITE_READ_CHUNK)
+        ]
+        runners = {}
+        with self.lock:
+            for chunk in chunks:
+                where = list(conditions)
+                chunk_params = list(params)
+                if chunk is not None:
+                    where.append(f"r.bib IN ({', '.join('?' for _ in chunk)})")
+                    chunk_params.extend(chunk)
+                clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+                for bib_str, infos in self.connection.execute(
+                        f"SELECT r.bib, r.infos FROM runners r {clause} ORDER BY r.rowid", chunk_params):
+                    runners[bib_str] = {'infos': json.loads(infos), 'checkpoints': []}
+
+                rows = self.connection.execute(
+                    f"SELECT c.bib, {', '.join('c.' + column for column in self.CHECKPOINT_COLUMNS)} "
+                    f"FROM checkpoints c JOIN runners r ON r.bib = c.bib {clause} ORDER BY c.bib, c.idx",
+                    chunk_params
+                )
+                for bib_str, *values in rows:
+                    runners[bib_str]['checkpoints'].append(dict(zip(self.CHECKPOINT_COLUMNS, values)))
+        return runners
+
+    def read_infos(self):
+        """Parcourt (dossard, infos) de tous les coureurs par lots, sans lire les passages"""
+        last_rowid = 0
+        while True:
+            with self.lock:
+                rows = self.connection.execute(
+                    "SELECT rowid, bib, infos FROM runners WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, SQLITE_READ_CHUNK)
+                ).fetchall()
+            if not rows:
+                return
+            for last_rowid, bib_str, infos in rows:
+                yield bib_str, json.loads(infos)
+
+    def contains(self, bib_str):
+        with self.lock:
+            return self.connection.execute(
+                "SELECT 1 FROM runners WHERE bib = ?", (bib_str,)
+            ).fetchone() is not None
+
+    def bibs(self):
+        with self.lock:
+            return [row[0] for row in self.connection.execute("SELECT bib FROM runners ORDER BY rowid")]
+
+    def count(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM runners").fetchone()[0]
+
+    def append(self, bib_str, runner_data, previous=None):
+        """Rien à journaliser : SQLiteRunnerMap écrit déjà chaque coureur dans la base"""
+        return False
+
+    def touch(self, bib_str, scraped_at):
+        return False
+
+    def compact(self, snapshot_source, background=False):
+        """Les écritures sont déjà persistées ; seule l'optimisation de la base est lancée"""
+        with self.lock:
+            self.connection.execute("PRAGMA optimize")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class SQLiteRunnerMap(MutableMapping):
+    """
+    Vue dictionnaire (dossard -> données) d'un SQLiteRaceStore avec cache LRU borné.
+    Le cache est partagé par les threads de scan, de calcul et de l'interface (lock).
+    """
+
+    def __init__(self, store, cache_size=SQLITE_CACHE_SIZE):
+        self.store = store
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def remember(self, bib_str, runner_data):
+        with self.lock:
+            self.cache[bib_str] = runner_data
+            self.cache.move_to_end(bib_str)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def __getitem__(self, bib_str):
+        with self.lock:
+            runner_data = self.cache.get(bib_str)
+            if runner_data is not None:
+                self.cache.move_to_end(bib_str)
+                return runner_data
+        runner_data = self.store.read_runners([bib_str]).get(bib_str)
+        if runner_data is None:
+            raise KeyError(bib_str)
+        with self.lock:
+            # Une écriture concurrente a pu mettre en cache une version plus récente
+            runner_data = self.cache.setdefault(bib_str, runner_data)
+            self.cache.move_to_end(bib_str)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return runner_data
+
+    def __setitem__(self, bib_str, runner_data):
+        self.store.write_runners([(bib_str, runner_data)])
+        self.remember(bib_str, runner_data)
+
+    def __delitem__(self, bib_str):
+        self.store.delete_runner(bib_str)
+        with self.lock:
+            self.cache.pop(bib_str, None)
+
+    def __contains__(self, bib_str):
+        with self.lock:
+            if bib_str in self.cache:
+                return True
+        return self.store.contains(bib_str)
+
+    def __iter__(self):
+        return iter(self.store.bibs())
+
+    def __len__(self):
+        return self.store.count()
+
+    def update(self, other=(), **kwargs):
+        items = list(dict(other, **kwargs).items())
+        self.store.write_runners(items)
+        for bib_str, runner_data in items:
+            self.remember(bib_str, runner_data)
+
+    def items(self):
+        """Parcourt tous les coureurs par lots de SQLITE_READ_CHUNK, sans tout charger en mémoire"""
+        bibs = self.store.bibs()
+        for start in range(0, len(bibs), SQLITE_READ_CHUNK):
+            yield from self.store.read_runners(bibs[start:start + SQLITE_READ_CHUNK]).items()
+
+    def values(self):
+        for bib_str, runner_data in self.items():
+            yield runner_data
+
+    def infos(self):
+        """(dossard, infos) de tous les coureurs, sans lire leurs passages"""
+        return self.store.read_infos()
+
+    def select(self, bibs, race=None):
+        """Coureurs des dossards demandés, filtrés par course via l'index"""
+        return self.store.read_runners(bibs, race)
 
 
 class RaceDataScraper:
-    def __init__(self):
-        print("Initialisation du scraper...")
-        self.chrome_options = Options()
-        self.chrome_options.add_argument('--start-maximized')
-        self.chrome_options.add_argument('--no-sandbox')
-        self.chrome_options.add_argument('--disable-dev-shm-usage')
+    def __init__(self, offline=False):
+        """offline=True : pas de chargement des données (relecture de l'archive)"""
+        if not offline:
+            print("Initialisation du scraper...")
 
         # Ajout du dictionnaire de correspondance des courses
         self.race_names = {
@@ -35,17 +1225,42 @@ class RaceDataScraper:
             "ZEM": "Zembrocal"
         }
 
-        print("Installation du ChromeDriver...")
-        self.service = Service(ChromeDriverManager().install())
+        self.service = None
+        self.service_lock = threading.Lock()  # Les navigateurs du pool démarrent en parallèle
         self.driver = None
+        self.driver_pages = 0  # Pages chargées par le navigateur principal
         self.all_data = {}
-        self.load_data()
+        self.records = OrderedDict()  # Dossard -> RunnerRecord, les moins récemment utilisés sont oubliés
+        self.records_size = SQLITE_CACHE_SIZE if STORAGE_BACKEND == 'sqlite' else RECORD_CACHE_SIZE
+        self.data_version = 0  # Incrémentée à chaque modification des données
+        self.race_versions = {}  # Course -> version de sa dernière modification
+        self.top_cache = TopResultCache()
+        self.matrix_cache = TopResultCache(MATRIX_CACHE_SIZE)
+        self.matrix_lock = threading.Lock()  # Un seul calcul d'une matrice demandée par plusieurs onglets
+        self.cache_stats = {'hit': 0, 'miss': 0, 'stale': 0}  # Consultations du cache depuis le lancement
+        self.empty_bibs = set()  # Dossards sans coureur constatés depuis le lancement
+        self.fetch_errors = {}  # Dossard -> dernière erreur de récupération
+        self.store = SQLiteRaceStore() if STORAGE_BACKEND == 'sqlite' else JsonRaceStore()
+        self.extraction_mode = 'js'  # 'js' : un seul execute_script par page, 'webdriver' : élément par élément
+        self.fetch_backend = 'webdriver'  # 'http' : essai sans navigateur d'abord, Selenium en secours
+        self.browser_profile = BROWSER_PROFILE  # Profil des prochains navigateurs lancés
+        self.page_metrics = {}  # Profil -> {'pages', 'seconds', 'bytes'} mesurés par get_runner_data
+        self.http_backend = HttpFetchBackend(self)
+        self.page_archive = PageArchive(PAGE_ARCHIVE_DIR) if ARCHIVE_PAGES else None
+        self.data_lock = threading.RLock()  # all_data est partagé entre les navigateurs du pool
+        if not offline:
+            self.load_data()
 
     def get_race_from_url(self, driver):
         """Récupère le code de la course depuis l'URL"""
         try:
             # Attendre que l'URL soit mise à jour avec le raceId avec un timeout plus court
-            time.sleep(1)
+            try:
+                WebDriverWait(driver, RACE_URL_TIMEOUT, poll_frequency=0.1).until(
+                    lambda d: 'raceId=' in d.current_url
+                )
+            except TimeoutException:
+                pass
             current_url = driver.current_url
             print(f"URL courante: {current_url}")
 
@@ -72,27 +1287,297 @@ class RaceDataScraper:
             print(f"Erreur lors de la récupération du nom de la course: {e}")
             return "Course inconnue"
 
+    def get_race_from_html(self, url, html, page):
+        """Récupère le nom de la course d'une page obtenue sans navigateur"""
+        match = re.search(r'raceId=(\w+)', url) or re.search(r'raceId=(\w+)', html)
+        if match:
+            return self.race_names.get(match.group(1), "Course inconnue")
+        race_info = (page.get('name') or '').lower()
+        for code, name in self.race_names.items():
+            if name.lower() in race_info:
+                return name
+        return "Course inconnue"
+
     def load_data(self):
         try:
-            if os.path.exists('race_data.json'):
-                with open('race_data.json', 'r', encoding='utf-8') as f:
-                    self.all_data = json.load(f)
+            self.all_data = self.store.load()
+            if self.all_data:
                 print(f"Données chargées pour {len(self.all_data)} coureurs")
         except Exception as e:
             print(f"Erreur lors du chargement des données: {e}")
             self.all_data = {}
 
-    def save_data(self):
+    def get_runners(self, bibs, race="Toutes les courses"):
+        """Liste (dossard, données) des dossards connus, dans l'ordre demandé, filtrée par course"""
+        race_filter = None if race == "Toutes les courses" else race
+        if isinstance(self.all_data, SQLiteRunnerMap):
+            found = self.all_data.select([str(bib) for bib in bibs], race_filter)
+        else:
+            found = self.all_data
+
+        runners = []
+        for bib in bibs:
+            data = found.get(str(bib))
+            if data and (race_filter is None or data['infos']['race_name'] == race_filter):
+                runners.append((bib, data))
+        return runners
+
+    def touch_races(self, race_names):
+        """Nouvelle version des données pour les courses modifiées (appelé sous data_lock)"""
+        self.data_version += 1
+        for race_name in race_names:
+            self.race_versions[race_name] = self.data_version
+
+    def race_version(self, race):
+        """Version des données d'une course ("Toutes les courses" : version de l'ensemble)"""
+        with self.data_lock:
+            if race == "Toutes les courses":
+                return self.data_version
+            return self.race_versions.get(race, 0)
+
+    @staticmethod
+    def race_of(runner_data):
+        return runner_data['infos']['race_name'] if runner_data else None
+
+    @staticmethod
+    def is_final(runner_data):
+        """Vrai si l'état du coureur ne peut plus changer (arrivé, abandon, non partant)"""
+        return runner_data['infos']['state'] in FINAL_STATES
+
+    @staticmethod
+    def is_fresh(runner_data, now=None):
+        """Vrai si le relevé est encore valable (durée de validité selon l'état, horodatage scraped_at)"""
+        infos = runner_data['infos']
+        ttl = CACHE_TTL.get(infos['state'], CACHE_TTL["En course"])
+        if ttl is None:
+            return True
+        return (now or time.time()) - infos.get('scraped_at', 0) < ttl
+
+    def cache_lookup(self, bib_str):
+        """Consulte le cache : (données ou None, 'hit' | 'miss' | 'stale'), compté dans cache_stats"""
+        runner_data = self.all_data.get(bib_str)
+        if runner_data is None:
+            status = 'miss'
+        elif self.is_fresh(runner_data):
+            status = 'hit'
+        else:
+            status = 'stale'
+        with self.data_lock:
+            self.cache_stats[status] += 1
+        return runner_data, status
+
+    @staticmethod
+    def merge_runner(previous, runner_data):
+        """
+        Fusionne un nouveau relevé avec les données connues : None si rien n'a changé, sinon
+        de nouvelles données qui reprennent les passages déjà connus suivis des nouveaux.
+        Les dictionnaires existants ne sont jamais modifiés sur place (la compaction
+        écrit une copie superficielle de all_data depuis un autre thread).
+        """
+        if previous is None:
+            return runner_data
+        known = previous['checkpoints']
+        checkpoints = runner_data['checkpoints']
+        if checkpoints[:len(known)] == known:
+            previous_infos = {key: value for key, value in previous['infos'].items() if key != 'scraped_at'}
+            if len(checkpoints) == len(known) and runner_data['infos'] == previous_infos:
+                return None
+            checkpoints = known + checkpoints[len(known):]
+        # Sinon, passages corrigés par le site : le nouveau relevé remplace l'ancien
+        return {**runner_data, 'checkpoints': checkpoints}
+
+    def remember_record(self, bib_str, record):
+        """Garde un coureur typé en tête du cache borné (appelé sous data_lock)"""
+        self.records[bib_str] = record
+        self.records.move_to_end(bib_str)
+        while len(self.records) > self.records_size:
+            self.records.popitem(last=False)
+
+    def get_record(self, bib_str, runner_data):
+        """Version typée des données d'un coureur (construite au premier accès, gardée en cache borné)"""
+        with self.data_lock:
+            record = self.records.get(bib_str)
+            if record is None:
+                record = RunnerRecord.from_data(runner_data)
+            self.remember_record(bib_str, record)
+        return record
+
+    def get_runner_records(self, bibs, race="Toutes les courses"):
+        """Comme get_runners, mais avec les coureurs typés (dossard, RunnerRecord)"""
+        return [(bib, self.get_record(str(bib), data)) for bib, data in self.get_runners(bibs, race)]
+
+    def runner_infos(self):
+        """(dossard, infos) de tous les coureurs ; avec SQLite, seule la colonne infos est lue"""
+        if isinstance(self.all_data, SQLiteRunnerMap):
+            return self.all_data.infos()
+        with self.data_lock:
+            return [(bib, data['infos']) for bib, data in self.all_data.items() if data and 'infos' in data]
+
+    def copy_data(self):
+        with self.data_lock:
+            return dict(self.all_data)
+
+    def save_data(self, background=False):
+        """Écrit un instantané complet des données (compaction du journal)"""
         try:
-            with open('race_data.json', 'w', encoding='utf-8') as f:
-                json.dump(self.all_data, f, ensure_ascii=False, indent=4)
-            print("Données sauvegardées avec succès")
+            self.store.compact(self.copy_data, background=background)
         except Exception as e:
             print(f"Erreur lors de la sauvegarde des données: {e}")
 
+    def rebuild_from_archive(self, archive_dir=PAGE_ARCHIVE_DIR, workers=None):
+        """
+        Reconstruit les données de tous les coureurs archivés en relisant leurs pages,
+        sur tous les cœurs disponibles et sans navigateur. Renvoie le nombre de coureurs relus.
+        """
+        archive = PageArchive(archive_dir)
+        entries = list(archive.latest_entries().values())
+        if not entries:
+            print("Aucune page archivée")
+            return 0
+
+        print(f"Relecture de {len(entries)} pages archivées...")
+        rebuilt = {}
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=init_archive_reader) as executor:
+            tasks = [(archive_dir, entry) for entry in entries]
+            for bib_str, runner_data in executor.map(parse_archived_page, tasks, chunksize=16):
+                if runner_data:
+                    rebuilt[bib_str] = runner_data
+
+        with self.data_lock:
+            touched = {self.race_of(self.all_data.get(bib_str)) for bib_str in rebuilt}
+            touched.update(self.race_of(runner_data) for runner_data in rebuilt.values())
+            self.all_data.update(rebuilt)
+            for bib_str, runner_data in rebuilt.items():
+                self.remember_record(bib_str, RunnerRecord.from_data(runner_data))
+            self.touch_races(touched)
+        self.save_data()
+        print(f"{len(rebuilt)} coureurs reconstruits depuis l'archive")
+        return len(rebuilt)
+
+    def store_runner(self, bib_str, runner_data):
+        """
+        Enregistre les données d'un coureur (appelable depuis plusieurs threads).
+        Renvoie False si elles sont identiques à celles déjà connues : seule la date du relevé
+        est alors journalisée.
+        """
+        try:
+            scraped_at = time.time()
+            with self.data_lock:
+                previous = self.all_data.get(bib_str)
+                merged = self.merge_runner(previous, runner_data)
+                if merged is None:
+                    # Relevé identique : seul l'horodatage change, journalisé sans les données
+                    self.all_data[bib_str] = {**previous, 'infos': {**previous['infos'], 'scraped_at': scraped_at}}
+                    needs_compaction = self.store.touch(bib_str, scraped_at)
+                    changed = False
+                else:
+                    runner_data = {**merged, 'infos': {**merged['infos'], 'scraped_at': scraped_at}}
+                    self.all_data[bib_str] = runner_data
+                    self.remember_record(bib_str, RunnerRecord.from_data(runner_data))
+                    self.touch_races({self.race_of(previous), self.race_of(runner_data)})
+                    needs_compaction = self.store.append(bib_str, runner_data, previous)
+                    changed = True
+            if needs_compaction:
+                self.save_data(background=True)
+            return changed
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde du dossard {bib_str}: {e}")
+            return False
+
+    def ensure_service(self, refresh=False):
+        """Importe Selenium et résout le ChromeDriver au premier navigateur"""
+        with self.service_lock:
+            if self.service is None or refresh:
+                load_selenium()
+                self.service = Service(resolve_chromedriver(refresh))
+
+    def build_chrome_options(self, profile):
+        """Options de Chrome du profil 'standard' ou 'fast'"""
+        options = Options()
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        if profile != 'fast':
+            options.add_argument('--start-maximized')
+            return options
+
+        options.add_argument('--headless=new')
+        options.add_argument(f'--window-size={FAST_WINDOW_SIZE}')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--mute-audio')
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        # DOMContentLoaded suffit : wait_for_page attend ensuite le tableau des passages
+        options.page_load_strategy = 'eager'
+        return options
+
+    def create_driver(self):
+        """
+        Lance une nouvelle instance de Chrome avec le profil courant, noté sur le navigateur
+        (browser_profile) : le profil peut changer pendant qu'il tourne.
+        """
+        self.ensure_service()
+        profile = self.browser_profile
+        options = self.build_chrome_options(profile)
+        try:
+            driver = webdriver.Chrome(service=self.service, options=options)
+        except Exception as e:
+            # Le ChromeDriver en cache peut ne plus correspondre à Chrome : nouvelle résolution
+            print(f"Échec du lancement de Chrome ({e}), nouvelle résolution du ChromeDriver...")
+            self.ensure_service(refresh=True)
+            driver = webdriver.Chrome(service=self.service, options=options)
+        driver.browser_profile = profile
+
+        if profile == 'fast':
+            try:
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+            except Exception as e:
+                print(f"Blocage des ressources indisponible: {e}")
+        return driver
+
+    def profile_metrics(self, driver):
+        """Mesures du profil avec lequel le navigateur a été lancé (appelé sous data_lock)"""
+        profile = getattr(driver, 'browser_profile', self.browser_profile)
+        return self.page_metrics.setdefault(profile, {'pages': 0, 'seconds': 0.0, 'bytes': 0, 'measured': 0})
+
+    def record_page_metrics(self, driver, seconds):
+        """Ajoute la durée de chargement d'une page aux mesures du profil du navigateur"""
+        with self.data_lock:
+            metrics = self.profile_metrics(driver)
+            metrics['pages'] += 1
+            metrics['seconds'] += seconds
+
+    def record_page_transfer(self, driver, transferred):
+        """Ajoute les octets reçus d'une page, renvoyés par PAGE_EXTRACTION_JS sans aller-retour de plus"""
+        if transferred is None:
+            return
+        with self.data_lock:
+            metrics = self.profile_metrics(driver)
+            metrics['bytes'] += int(transferred)
+            metrics['measured'] += 1
+
+    def describe_page_metrics(self):
+        """Résumé par profil : "fast : 120 pages, 0.8 s et 310 Ko par page" """
+        def describe(profile, metrics):
+            text = f"{profile} : {metrics['pages']} pages, {metrics['seconds'] / metrics['pages']:.1f} s"
+            if not metrics['measured']:
+                return text + " par page"
+            return text + f" et {metrics['bytes'] / metrics['measured'] / 1024:.0f} Ko par page"
+
+        with self.data_lock:
+            return " · ".join(
+                describe(profile, metrics) for profile, metrics in self.page_metrics.items() if metrics['pages']
+            )
+
     def initialize_driver(self):
+        """Navigateur principal, remplacé toutes les DRIVER_MAX_PAGES pages"""
+        if self.driver and self.driver_pages >= DRIVER_MAX_PAGES:
+            print(f"Navigateur principal recyclé après {self.driver_pages} pages")
+            self.close_driver()
         if not self.driver:
-            self.driver = webdriver.Chrome(service=self.service, options=self.chrome_options)
+            self.driver = self.create_driver()
+            self.driver_pages = 0
+        self.driver_pages += 1
         return self.driver
 
     def close_driver(self):
@@ -100,6 +1585,11 @@ class RaceDataScraper:
             self.driver.quit()
             self.driver = None
 
+    def close(self):
+        """Ferme le navigateur principal et le journal des données"""
+        self.close_driver()
+        self.store.close()
+
     def extract_numeric_value(self, text):
         """Extrait la valeur numérique d'une chaîne de caractères"""
         if not text:
@@ -125,8 +1615,145 @@ class RaceDataScraper:
         except:
             return None, None
 
-    def get_checkpoint_data(self, driver):
+    def extract_page_js(self, driver):
+        """Extrait en un seul aller-retour les textes bruts de l'en-tête et du tableau"""
+        page = driver.execute_script(PAGE_EXTRACTION_JS)
+        if not isinstance(page, dict):
+            raise ValueError("Réponse inattendue du script d'extraction")
+        return page
+
+    def normalize_checkpoints(self, rows):
+        """Convertit les lignes brutes extraites de la page en points de passage"""
+        checkpoints = []
+        for row in rows:
+            try:
+                speed = next((text for text in row['speeds'] if text and 'km/h' in text), "N/A")
+
+                elevations = row['elevations']
+                d_plus = 0
+                d_minus = 0
+                if len(elevations) >= 2:
+                    match = re.search(r'\d+', elevations[-2] or '')
+                    d_plus = int(match.group()) if match else 0
+                    match = re.search(r'\d+', elevations[-1] or '')
+                    d_minus = int(match.group()) if match else 0
+
+                evolution = None
+                if row['rank_evolution']:
+                    evolution_match = re.search(r'[+-]?\d+',
+                                                row['rank_evolution'].replace('(', '').replace(')', ''))
+                    if evolution_match:
+                        evolution = int(evolution_match.group())
+
+                checkpoints.append({
+                    'point': row['point'],
+                    'kilometer': self.extract_numeric_value(row['kilometer']),
+                    'passage_time': row['passage_time'] if row['passage_time'] is not None else "N/A",
+                    'race_time': row['race_time'] or "N/A",
+                    'speed': speed,
+                    'effort_speed': row['effort_speed'] if row['effort_speed'] is not None else "N/A",
+                    'elevation_gain': d_plus,
+                    'elevation_loss': d_minus,
+                    'rank': row['rank'],
+                    'rank_evolution': evolution
+                })
+            except Exception as e:
+                print(f"Erreur lors du traitement d'un point de passage: {e}")
+                continue
+        return checkpoints
+
+    def build_runner_data(self, bib_number, race_name, page):
+        """Construit les données complètes d'un coureur à partir des textes bruts de la page"""
+        name = page['name'] if page.get('name') is not None else "Inconnu"
+        category = page['category'] if page.get('category') is not None else "Inconnue"
+        raw_state = page.get('state') or "Inconnu"
+        normalized_state = raw_state.upper()
+
+        if "NON PARTANT" in normalized_state:
+            return {
+                'infos': {
+                    'bib_number': bib_number,
+                    'race_name': race_name,
+                    'name': name,
+                    'category': category,
+                    'state': "Non partant",
+                    'finish_time': "-",
+                    'overall_rank': "-",
+                    'gender_rank': "-",
+                    'category_rank': "-",
+                    'average_speed': "-",
+                    'last_checkpoint': "-",
+                    'total_elevation_gain': 0,
+                    'total_elevation_loss': 0
+                },
+                'checkpoints': []
+            }
+
+        if "ABANDON" in normalized_state:
+            state = "Abandon"
+        elif "FINISHER" in normalized_state:
+            state = "Finisher"
+        else:
+            state = "En course"
+
+        if state in ["Abandon", "Finisher"]:
+            finish_time = page.get('finish_time')
+            try:
+                if finish_time is None:
+                    finish_time = "-"
+                elif ':' in finish_time:
+                    hours, minutes, _ = finish_time.split(':')
+                    finish_time = f"{hours}h{minutes}"
+            except ValueError:
+                finish_time = "-"
+        else:
+            finish_time = "En course"
+
+        avg_speed = "N/A"
+        for label, value in page.get('speed_items', []):
+            if "VIT. MOY." in label.upper():
+                avg_speed = value
+                break
+
+        rankings = {"Général": "", "Sexe": "", "Catégorie": ""}
+        for type_text, value_text in page.get('rankings', []):
+            type_text = type_text.upper()
+            if "GÉNÉRAL" in type_text or "GENERAL" in type_text:
+                rankings["Général"] = value_text
+            elif "SEXE" in type_text:
+                rankings["Sexe"] = value_text
+            elif "CATÉGORIE" in type_text or "CATEGORIE" in type_text:
+                rankings["Catégorie"] = value_text
+
+        checkpoints = self.normalize_checkpoints(page.get('rows', []))
+
+        return {
+            'infos': {
+                'bib_number': bib_number,
+                'race_name': race_name,
+                'name': name,
+                'category': category,
+                'state': state,
+                'finish_time': finish_time,
+                'overall_rank': rankings['Général'],
+                'gender_rank': rankings['Sexe'],
+                'category_rank': rankings['Catégorie'],
+                'average_speed': avg_speed,
+                'last_checkpoint': checkpoints[-1]['point'] if checkpoints else "",
+                'total_elevation_gain': sum(cp['elevation_gain'] for cp in checkpoints),
+                'total_elevation_loss': sum(cp['elevation_loss'] for cp in checkpoints)
+            },
+            'checkpoints': checkpoints
+        }
+
+    def get_checkpoint_data(self, driver, mode=None):
         """Extraire les données des points de passage pour un coureur"""
+        if (mode or self.extraction_mode) == 'js':
+            try:
+                return self.normalize_checkpoints(self.extract_page_js(driver)['rows'])
+            except Exception as e:
+                print(f"Erreur lors de l'extraction JavaScript, retour au mode WebDriver: {e}")
+
         try:
             checkpoints = []
             rows = driver.find_elements(By.CLASS_NAME, "MuiTableRow-root")
@@ -286,23 +1913,78 @@ class RaceDataScraper:
         return ''.join(c for c in unicodedata.normalize('NFD', text.lower())
                        if unicodedata.category(c) != 'Mn')
 
-    def get_runner_data(self, bib_number):
-        """Récupère les données complètes d'un coureur"""
+    def page_not_found(self, driver):
+        """Vrai si la page affiche explicitement qu'aucun coureur ne porte ce dossard"""
+        if driver.current_url.startswith('chrome-error://'):
+            return False  # Page d'erreur de Chrome (réseau, DNS...) : échec à retenter
+        try:
+            text = driver.execute_script("return document.body ? document.body.innerText : '';") or ''
+        except Exception:
+            return False
+        text = text.lower()
+        return any(marker in text for marker in RUNNER_NOT_FOUND_MARKERS)
+
+    def wait_for_page(self, driver, timeout=PAGE_READY_TIMEOUT):
+        """
+        Attend les éléments extraits : le nom, puis les points de passage ou l'état non partant,
+        ou le message d'un dossard inexistant
+        """
+        def ready(d):
+            if not d.find_elements(By.CLASS_NAME, "mui-oah8u0"):
+                return self.page_not_found(d)
+            if d.find_elements(By.CLASS_NAME, "MuiTableRow-root"):
+                return True
+            return any(
+                "NON PARTANT" in element.text.upper()
+                for class_name in ("mui-w9oezj", "mui-gzldy9")
+                for element in d.find_elements(By.CLASS_NAME, class_name)
+            )
+
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=0.1).until(ready)
+            return True
+        except TimeoutException:
+            print(f"Page incomplète après {timeout}s, extraction de ce qui est affiché")
+            return False
+
+    def get_runner_data(self, bib_number, driver=None, refresh=False):
+        """
+        Récupère les données complètes d'un coureur (avec le driver fourni ou le driver principal).
+        refresh=True : ignore le cache et recharge la page (suivi en direct).
+        """
         bib_str = str(bib_number)
         print(f"\nTraitement du dossard {bib_number}")
 
-        # Vérifier si les données sont en cache
-        if bib_str in self.all_data:
-            print(f"Données trouvées en cache pour le dossard {bib_number}")
-            return self.all_data[bib_str]
+        # Vérifier si les données sont en cache et encore valables
+        if not refresh:
+            cached, status = self.cache_lookup(bib_str)
+            if status == 'hit':
+                print(f"Données trouvées en cache pour le dossard {bib_number}")
+                return cached
+            if status == 'stale':
+                print(f"Données en cache périmées pour le dossard {bib_number} ({format_age(cached['infos'].get('scraped_at'))})")
 
         print(f"Récupération des données en ligne pour le dossard {bib_number}")
+        self.empty_bibs.discard(bib_str)  # Constat d'une tentative précédente, refait à chaque chargement
         try:
             # Initialisation du driver et chargement de la page
-            driver = self.initialize_driver()
-            url = f"https://grandraid-reunion-oxybol.v3.livetrail.net/fr/2024/runners/{bib_number}"
+            if driver is None:
+                driver = self.initialize_driver()
+            url = LIVETRAIL_BASE_URL + RUNNER_PATH.format(bib=bib_number)
+            started = time.monotonic()
             driver.get(url)
-            time.sleep(1)
+            self.wait_for_page(driver)
+            self.record_page_metrics(driver, time.monotonic() - started)
+            if not driver.find_elements(By.CLASS_NAME, "mui-oah8u0"):
+                # Seul un message explicite classe le dossard comme vide ; une page lente,
+                # une page d'erreur ou une panne du site est un échec à retenter
+                if self.page_not_found(driver):
+                    print(f"Aucun coureur pour le dossard {bib_number}")
+                    self.empty_bibs.add(bib_str)
+                else:
+                    print(f"Page sans coureur pour le dossard {bib_number}, nouvelle tentative prévue")
+                    self.fetch_errors[bib_str] = f"Page sans coureur après {PAGE_READY_TIMEOUT}s"
+                return None
 
             # Initialisation des variables par défaut
             name = "Inconnu"
@@ -315,6 +1997,21 @@ class RaceDataScraper:
             # Récupération du nom de la course
             race_name = self.get_race_from_url(driver)
 
+            # Archivage de la page rendue pour une relecture hors ligne
+            if self.page_archive:
+                self.page_archive.save(bib_number, driver.current_url, driver.page_source)
+
+            # Extraction de toute la page en un seul aller-retour
+            if self.extraction_mode == 'js':
+                try:
+                    page = self.extract_page_js(driver)
+                    self.record_page_transfer(driver, page.get('transferred'))
+                    runner_data = self.build_runner_data(bib_number, race_name, page)
+                    self.store_runner(bib_str, runner_data)
+                    return runner_data
+                except Exception as e:
+                    print(f"Erreur lors de l'extraction JavaScript, retour au mode WebDriver: {e}")
+
             # Récupération du nom du coureur
             try:
                 name_element = driver.find_element(By.CLASS_NAME, "mui-oah8u0")
@@ -378,8 +2075,7 @@ class RaceDataScraper:
                         },
                         'checkpoints': []
                     }
-                    self.all_data[bib_str] = runner_data
-                    self.save_data()
+                    self.store_runner(bib_str, runner_data)
                     return runner_data
 
                 # Détermination de l'état et du temps pour les autres cas
@@ -465,7 +2161,7 @@ class RaceDataScraper:
                     print(f"Erreur lors de la récupération des classements: {str(e)}")
 
                 # Récupération des points de passage
-                checkpoints = self.get_checkpoint_data(driver)
+                checkpoints = self.get_checkpoint_data(driver, mode='webdriver')
 
                 # Détermination du dernier point
                 last_checkpoint = ""
@@ -494,12 +2190,12 @@ class RaceDataScraper:
                 }
 
                 # Sauvegarde des données
-                self.all_data[bib_str] = runner_data
-                self.save_data()
+                self.store_runner(bib_str, runner_data)
                 return runner_data
 
             except Exception as e:
                 print(f"Erreur lors de la récupération de l'état: {str(e)}")
+                self.fetch_errors[bib_str] = f"État illisible: {e}"
                 state = "Inconnu"
                 finish_time = "-"
                 print("État inconnu assigné suite à une erreur")
@@ -508,8 +2204,1146 @@ class RaceDataScraper:
         except Exception as e:
             print(f"Erreur générale pour le dossard {bib_number}: {str(e)}")
             traceback.print_exc()
+            self.fetch_errors[bib_str] = str(e)
+            return None
+
+
+class RunnerPageParser:
+    """Lecture d'une page coureur HTML (lxml) vers le même format brut que PAGE_EXTRACTION_JS"""
+
+    def find_all(self, root, class_name):
+        return root.xpath(
+            f".//*[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+        )
+
+    def find(self, root, class_name):
+        elements = self.find_all(root, class_name)
+        return elements[0] if elements else None
+
+    def text(self, element):
+        if element is None:
+            return None
+        return re.sub(r'\s+', ' ', element.text_content()).strip()
+
+    def parse(self, html):
+        import lxml.html
+
+        document = lxml.html.fromstring(html)
+        page = {
+            'name': self.text(self.find(document, 'mui-oah8u0')),
+            'category': self.text(self.find(document, 'mui-1vu7he5')),
+            'state': None,
+            'finish_time': None,
+            'speed_items': [],
+            'rankings': [],
+            'rows': []
+        }
+
+        # État : Finisher dans mui-w9oezj, Abandon / Non partant dans mui-gzldy9
+        container = self.find(document, 'mui-w9oezj')
+        state_element = None
+        if container is not None:
+            state_element = next(
+                (el for el in self.find_all(container, 'MuiTypography-noWrap') if el.tag == 'p'), None
+            )
+        if state_element is None:
+            fallback = self.find(document, 'mui-gzldy9')
+            if fallback is not None:
+                container = fallback
+                state_element = self.find(container, 'mui-1xavr8a')
+                if state_element is None:
+                    state_element = self.find(container, 'mui-evvpi6')
+        if state_element is not None:
+            page['state'] = self.text(state_element)
+            page['finish_time'] = self.text(self.find(container, 'mui-1vazesu'))
+
+        # Vitesse moyenne : deuxième section d'infos du conteneur principal
+        main = self.find(document, 'mui-14iziq5')
+        info_sections = self.find_all(main, 'mui-157h3i3') if main is not None else []
+        if len(info_sections) >= 2:
+            for element in self.find_all(info_sections[1], 'mui-8v90jo'):
+                label_container = self.find(element, 'mui-ct9q29')
+                label = self.find(label_container, 'mui-wenrje') if label_container is not None else None
+                values = list(element.iter('p'))
+                if label is not None and values:
+                    page['speed_items'].append([self.text(label), self.text(values[-1])])
+
+        # Classements : première section d'infos de la page
+        ranking_section = self.find(document, 'mui-157h3i3')
+        if ranking_section is not None:
+            for element in self.find_all(ranking_section, 'mui-4ae55t'):
+                type_element = self.find(element, 'mui-280lq')
+                value_element = self.find(element, 'mui-17rj2i9')
+                if type_element is not None and value_element is not None:
+                    page['rankings'].append([self.text(type_element), self.text(value_element)])
+
+        # Tableau des points de passage
+        for row in self.find_all(document, 'MuiTableRow-root'):
+            cells = self.find_all(row, 'MuiTableCell-root')
+            point = self.find(row, 'mui-1v8uc0v')
+            if len(cells) < 7 or point is None:
+                continue
+
+            race_time = next(
+                (el for el in self.find_all(cells[4], 'mui-193t7sq')
+                 if 'mui-1jkxyqi' not in el.getparent().get('class', '')),
+                None
+            )
+
+            effort_speed = None
+            for effort_container in self.find_all(row, 'mui-1jkxyqi'):
+                if 'Vitesse effort' in effort_container.text_content():
+                    effort_speed = self.text(self.find(effort_container, 'mui-vm42pa'))
+                    break
+
+            rank = None
+            evolution = None
+            for cell in self.find_all(row, 'mui-ct9q29'):
+                rank_element = self.find(cell, 'mui-n2g1ua')
+                if rank_element is not None:
+                    rank = self.text(rank_element)
+                    evolution_element = self.find(cell, 'mui-2e3q6l')
+                    if evolution_element is None:
+                        evolution_element = self.find(cell, 'mui-1duggqj')
+                    evolution = self.text(evolution_element)
+                    break
+
+            page['rows'].append({
+                'point': self.text(point),
+                'kilometer': self.text(self.find(row, 'mui-o6szkf')),
+                'passage_time': self.text(self.find(row, 'mui-1g6ia2u')),
+                'race_time': self.text(race_time),
+                'speeds': [self.text(el) for el in self.find_all(row, 'mui-193t7sq')],
+                'effort_speed': effort_speed,
+                'elevations': [self.text(el) for el in self.find_all(row, 'mui-vm42pa')],
+                'rank': rank,
+                'rank_evolution': evolution
+            })
+
+        return page
+
+
+class PageArchive:
+    """
+    Archive compressée des pages coureurs, adressée par contenu : chaque page est stockée
+    une seule fois sous objects/<sha256[:2]>/<sha256>.html.gz et index.jsonl associe
+    chaque récupération (dossard, URL, date) à son empreinte.
+    """
+
+    def __init__(self, directory=PAGE_ARCHIVE_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, 'index.jsonl')
+        self.lock = threading.Lock()
+
+    def object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], f"{digest}.html.gz")
+
+    def save(self, bib, url, html):
+        """Archive une page et renvoie son empreinte"""
+        try:
+            content = html.encode('utf-8')
+            digest = hashlib.sha256(content).hexdigest()
+            path = self.object_path(digest)
+            with self.lock:
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    tmp_path = path + '.tmp'
+                    with gzip.open(tmp_path, 'wb') as f:
+                        f.write(content)
+                    os.replace(tmp_path, path)
+
+                entry = {
+                    'bib': bib,
+                    'url': url,
+                    'sha256': digest,
+                    'fetched_at': datetime.now().isoformat(timespec='seconds')
+                }
+                with open(self.index_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            return digest
+        except Exception as e:
+            print(f"Erreur lors de l'archivage de la page du dossard {bib}: {e}")
             return None
 
+    def read(self, digest):
+        with gzip.open(self.object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def latest_entries(self):
+        """Dernière page archivée pour chaque dossard"""
+        entries = {}
+        if not os.path.exists(self.index_path):
+            return entries
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Ligne tronquée par un arrêt brutal
+                entries[str(entry['bib'])] = entry
+        return entries
+
+
+archive_reader = None  # Lecteur du processus de relecture : (RaceDataScraper hors ligne, RunnerPageParser)
+
+
+def init_archive_reader():
+    """Prépare un seul lecteur par processus de relecture, partagé par toutes ses pages"""
+    global archive_reader
+    archive_reader = (RaceDataScraper(offline=True), RunnerPageParser())
+
+
+def parse_archived_page(task):
+    """Relit une page archivée (exécuté dans un processus de relecture)"""
+    archive_dir, entry = task
+    try:
+        if archive_reader is None:
+            init_archive_reader()
+        reader, parser = archive_reader
+        html = PageArchive(archive_dir).read(entry['sha256'])
+        page = parser.parse(html)
+        race_name = reader.get_race_from_html(entry['url'], html, page)
+        return str(entry['bib']), reader.build_runner_data(entry['bib'], race_name, page)
+    except Exception as e:
+        print(f"Erreur lors de la relecture du dossard {entry.get('bib')}: {e}")
+        return str(entry.get('bib')), None
+
+
+class HttpFetchBackend:
+    """
+    Récupération des pages coureurs en HTTP simple, sans navigateur.
+    Les requêtes partagent un pool de connexions keep-alive (aiohttp) et leur nombre
+    simultané est borné. Les pages qui ne contiennent pas les données (rendu côté
+    navigateur uniquement, erreur réseau...) sont renvoyées pour un passage par Selenium.
+    Après HTTP_MAX_PARSE_MISSES pages de ce type d'affilée, le site est considéré comme
+    rendu côté navigateur : le HTTP est désactivé pour la session et ne consomme plus de
+    jetons du limiteur.
+    """
+
+    def __init__(self, scraper, base_url=LIVETRAIL_BASE_URL, concurrency=HTTP_CONCURRENCY, timeout=HTTP_TIMEOUT):
+        self.scraper = scraper
+        self.base_url = base_url.rstrip('/')  # Modifiable pour viser un serveur local de réponses enregistrées
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.parser = RunnerPageParser()
+        self.parse_misses = 0  # Pages reçues sans données d'affilée
+        self.disabled = False
+
+    def runner_url(self, bib):
+        return self.base_url + RUNNER_PATH.format(bib=bib)
+
+    def parse_runner(self, bib, url, html):
+        """Construit les données du coureur, ou None si la page ne contient pas les données"""
+        page = self.parser.parse(html)
+        if not page['name'] or not (page['rows'] or "NON PARTANT" in (page['state'] or '').upper()):
+            return None
+        race_name = self.scraper.get_race_from_html(url, html, page)
+        return self.scraper.build_runner_data(bib, race_name, page)
+
+    def record_parse(self, parsed):
+        """Compte les pages sans données d'affilée et désactive le HTTP au-delà du seuil"""
+        self.parse_misses = 0 if parsed else self.parse_misses + 1
+        if not self.disabled and self.parse_misses >= HTTP_MAX_PARSE_MISSES:
+            self.disabled = True
+            print(f"{self.parse_misses} pages sans données en HTTP : passage à Selenium seul")
+
+    async def fetch_runner(self, session, bib, limiter=None):
+        url = self.runner_url(bib)
+        self.scraper.empty_bibs.discard(str(bib))
+        started = time.monotonic()
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    print(f"HTTP {response.status} pour le dossard {bib}")
+                    if response.status == 404:
+                        self.scraper.empty_bibs.add(str(bib))
+                    if limiter:
+                        # 429 et 5xx : le serveur sature ; un 404 reste une réponse normale
+                        limiter.record(time.monotonic() - started, response.status < 500 and response.status != 429)
+                    return None
+                html = await response.text()
+                final_url = str(response.url)
+            if limiter:
+                limiter.record(time.monotonic() - started, True)
+            runner_data = self.parse_runner(bib, final_url, html)
+            self.record_parse(runner_data is not None)
+            if runner_data and self.scraper.page_archive:
+                self.scraper.page_archive.save(bib, final_url, html)
+            return runner_data
+        except Exception as e:
+            print(f"Erreur HTTP pour le dossard {bib}: {e}")
+            if limiter:
+                limiter.record(time.monotonic() - started, False)
+            return None
+
+    async def fetch_all(self, items, on_result, limiter=None):
+        import aiohttp
+
+        failed = []
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            async def fetch(index, bib):
+                async with semaphore:
+                    if self.disabled:
+                        failed.append((index, bib))
+                        return
+                    if limiter and limiter.breaker:
+                        delay = limiter.breaker.delay()
+                        while delay > 0:
+                            await asyncio.sleep(min(delay, 1))
+                            delay = limiter.breaker.delay()
+                    if limiter:
+                        delay = limiter.reserve()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                    data = await self.fetch_runner(session, bib, limiter)
+                if data:
+                    self.scraper.store_runner(str(bib), data)
+                    on_result(index, bib, data)
+                elif str(bib) in self.scraper.empty_bibs:
+                    on_result(index, bib, None)  # Dossard inexistant : inutile de passer par Selenium
+                else:
+                    failed.append((index, bib))
+
+            await asyncio.gather(*(fetch(index, bib) for index, bib in items))
+
+        return sorted(failed)
+
+    def fetch_runners(self, items, on_result, limiter=None):
+        """
+        Récupère les dossards (index, dossard) en HTTP. on_result(index, bib, data) est
+        appelé pour chaque coureur obtenu ; renvoie les éléments à récupérer avec Selenium.
+        """
+        items = list(items)
+        if self.disabled:
+            return items
+        delivered = set()  # Index déjà transmis : jamais renvoyés vers Selenium, même après une erreur
+
+        def deliver(index, bib, data):
+            delivered.add(index)
+            on_result(index, bib, data)
+
+        try:
+            return asyncio.run(self.fetch_all(items, deliver, limiter))
+        except Exception as e:
+            print(f"Récupération HTTP indisponible, passage par Selenium: {e}")
+            return [(index, bib) for index, bib in items if index not in delivered]
+
+
+class RateLimiter:
+    """
+    Seau à jetons partagé par les navigateurs et les requêtes HTTP d'un scan.
+    Le débit s'adapte aux réponses observées : divisé par deux sur erreur ou quand la
+    latence moyenne dépasse la cible, puis remonté par petits pas jusqu'au plafond.
+    """
+
+    def __init__(self, max_rate=SCAN_MAX_RATE, min_rate=SCAN_MIN_RATE, burst=SCAN_BURST,
+                 target_latency=SCAN_TARGET_LATENCY):
+        self.max_rate = max_rate  # 0 ou None : pas de limite
+        self.min_rate = min(min_rate, max_rate) if max_rate else min_rate
+        self.rate = max_rate
+        self.burst = burst
+        self.target_latency = target_latency
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.latency = None  # Moyenne glissante des temps de réponse (secondes)
+        self.error_rate = 0.0  # Moyenne glissante des échecs (0 à 1)
+        self.breaker = None  # CircuitBreaker informé de chaque réponse
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Prend un jeton et renvoie l'attente nécessaire avant la requête (secondes)"""
+        if not self.max_rate:
+            return 0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1  # Un solde négatif réserve les créneaux suivants
+            return -self.tokens / self.rate if self.tokens < 0 else 0
+
+    def wait(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, latency, ok):
+        """Prend en compte une réponse (durée en secondes, succès) pour ajuster le débit"""
+        if self.breaker:
+            self.breaker.record(ok)
+        with self.lock:
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            self.error_rate = 0.8 * self.error_rate + (0 if ok else 0.2)
+            if not self.max_rate:
+                return
+            if not ok or self.latency > self.target_latency:
+                self.rate = max(self.min_rate, self.rate / 2)
+            elif self.error_rate < 0.1:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+    def stats(self):
+        with self.lock:
+            return {'rate': self.rate, 'latency': self.latency, 'error_rate': self.error_rate}
+
+
+class CircuitBreaker:
+    """
+    Coupe-circuit du pool : quand la proportion d'erreurs des dernières réponses dépasse
+    le seuil, toutes les requêtes sont suspendues pendant une pause. Une seule requête
+    d'essai passe ensuite : un succès referme le circuit, un échec double la pause.
+    """
+
+    def __init__(self, window=BREAKER_WINDOW, error_ratio=BREAKER_ERROR_RATIO,
+                 cooldown=BREAKER_COOLDOWN, max_cooldown=BREAKER_MAX_COOLDOWN):
+        self.window = window
+        self.error_ratio = error_ratio
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.outcomes = []  # Dernières réponses (True : succès)
+        self.state = 'closed'  # 'closed', 'open' (pause) ou 'half-open' (requête d'essai)
+        self.reopen_at = 0.0
+        self.probing = False
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    def open(self):
+        self.state = 'open'
+        self.reopen_at = time.monotonic() + self.cooldown
+        self.trips += 1
+        print(f"Trop d'erreurs : scan suspendu {self.cooldown:.0f}s")
+        self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+        self.outcomes = []
+
+    def delay(self):
+        """Attente imposée avant la prochaine requête (secondes, 0 : la requête peut partir)"""
+        with self.lock:
+            if self.state == 'open':
+                remaining = self.reopen_at - time.monotonic()
+                if remaining > 0:
+                    return remaining
+                self.state = 'half-open'
+                self.probing = False
+            if self.state == 'half-open':
+                if self.probing:
+                    return 1.0  # Attendre le résultat de la requête d'essai
+                self.probing = True
+            return 0
+
+    def wait(self):
+        delay = self.delay()
+        while delay > 0:
+            time.sleep(min(delay, 1))
+            delay = self.delay()
+
+    def record(self, ok):
+        with self.lock:
+            if self.state == 'half-open':
+                if ok:
+                    print("Le site répond de nouveau : reprise du scan")
+                    self.state = 'closed'
+                    self.cooldown = self.base_cooldown
+                else:
+                    self.open()
+                return
+            if self.state == 'open':
+                return  # Réponse d'une requête partie avant la coupure
+            self.outcomes = (self.outcomes + [ok])[-self.window:]
+            errors = self.outcomes.count(False)
+            if len(self.outcomes) >= self.window // 2 and errors >= self.error_ratio * len(self.outcomes):
+                self.open()
+
+
+class ScanJobQueue:
+    """
+    File de scan persistante (SQLite) : statut, nombre de tentatives et dernière erreur
+    de chaque dossard. Un scan interrompu ou en partie échoué se reprend avec incomplete().
+    Statuts : 'pending', 'running', 'retry', 'done', 'empty', 'failed'.
+    """
+
+    def __init__(self, path=SCAN_JOBS_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    bib INTEGER PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    next_attempt REAL,
+                    updated_at REAL
+                )
+            """)
+
+    def enqueue(self, bibs):
+        """Remet les dossards en attente (tentatives remises à zéro)"""
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO jobs (bib, status, attempts, last_error, next_attempt, updated_at) "
+                "VALUES (?, 'pending', 0, NULL, NULL, ?)",
+                [(bib, now) for bib in bibs]
+            )
+
+    def mark(self, bib, status):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET status = ?, next_attempt = NULL, updated_at = ? WHERE bib = ?",
+                (status, time.time(), bib)
+            )
+
+    def fail(self, bib, error, max_attempts=SCAN_MAX_ATTEMPTS):
+        """
+        Enregistre un échec : renvoie le délai avant la prochaine tentative (exponentiel,
+        tiré au hasard pour étaler les reprises), ou None si le dossard est abandonné.
+        """
+        with self.lock, self.connection:
+            row = self.connection.execute("SELECT attempts FROM jobs WHERE bib = ?", (bib,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            delay = None
+            if attempts < max_attempts:
+                delay = random.uniform(0.5, 1.0) * min(SCAN_RETRY_MAX, SCAN_RETRY_BASE * 2 ** (attempts - 1))
+            self.connection.execute(
+                "INSERT OR REPLACE INTO jobs (bib, status, attempts, last_error, next_attempt, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (bib, 'retry' if delay is not None else 'failed', attempts, error,
+                 time.time() + delay if delay is not None else None, time.time())
+            )
+            return delay
+
+    def incomplete(self):
+        """Dossards non terminés ou en échec, à reprendre"""
+        with self.lock:
+            return [row[0] for row in self.connection.execute(
+                "SELECT bib FROM jobs WHERE status NOT IN ('done', 'empty') ORDER BY bib"
+            )]
+
+    def summary(self):
+        with self.lock:
+            return dict(self.connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class ManagedDriver:
+    """Navigateur du pool avec son nombre de pages chargées et sa mémoire mesurée"""
+    numbers = itertools.count(1)
+
+    def __init__(self, driver, profile):
+        self.driver = driver
+        self.profile = profile  # Profil de navigateur avec lequel il a été lancé
+        self.number = next(self.numbers)
+        self.pages = 0
+        self.rss_mb = None  # Dernière mesure (None : psutil absent ou pas encore mesuré)
+        self.replacement = None  # Future du navigateur de remplacement en cours de lancement
+
+    def measure(self):
+        """Mémoire résidente de chromedriver, Chrome et tous ses sous-processus (Mo)"""
+        try:
+            import psutil
+        except ImportError:
+            return None
+        try:
+            process = psutil.Process(self.driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+        except (AttributeError, psutil.Error):
+            return None
+        total = 0
+        for child in processes:
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass  # Sous-processus terminé entre-temps
+        self.rss_mb = total / 2 ** 20
+        return self.rss_mb
+
+    def usage(self):
+        """Part de la limite atteinte (pages ou mémoire, la plus proche)"""
+        usage = self.pages / DRIVER_MAX_PAGES
+        if self.rss_mb is not None:
+            usage = max(usage, self.rss_mb / DRIVER_MAX_RSS_MB)
+        return usage
+
+    def stats(self):
+        return {'number': self.number, 'pages': self.pages, 'rss_mb': self.rss_mb}
+
+    def quit(self):
+        if self.replacement is not None:
+            # Remplaçant jamais utilisé : annulé s'il attend encore, sinon fermé dès qu'il est prêt
+            if not self.replacement.cancel():
+                self.replacement.add_done_callback(self.quit_replacement)
+            self.replacement = None
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"Erreur lors de la fermeture d'un navigateur: {e}")
+
+    @staticmethod
+    def quit_replacement(future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        try:
+            future.result().quit()
+        except Exception as e:
+            print(f"Erreur lors de la fermeture d'un navigateur: {e}")
+
+
+class ScanWorkQueue:
+    """
+    File de travail continue d'un scan : les dossards à traiter, puis chaque nouvelle tentative
+    dès son échéance. Un dossard en attente ne retient ni les navigateurs ni les dossards suivants.
+    """
+
+    def __init__(self, items):
+        self.ready = deque(items)  # (index, dossard) dans l'ordre de la demande
+        self.delayed = []  # Tas (échéance, index, dossard) des nouvelles tentatives
+        self.remaining = len(self.ready)  # Dossards sans résultat définitif
+        self.condition = threading.Condition()
+
+    def get(self):
+        """Prochain (index, dossard), en attendant la prochaine échéance ; None quand tout est terminé"""
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                if self.delayed and self.delayed[0][0] <= now:
+                    due, index, bib = heapq.heappop(self.delayed)
+                    return index, bib
+                if self.ready:
+                    return self.ready.popleft()
+                if not self.remaining:
+                    return None
+                self.condition.wait(self.delayed[0][0] - now if self.delayed else None)
+
+    def retry(self, index, bib, delay):
+        with self.condition:
+            heapq.heappush(self.delayed, (time.monotonic() + delay, index, bib))
+            self.condition.notify()
+
+    def finish(self, count=1):
+        """Dossards arrivés à un résultat définitif (trouvé, vide ou abandonné)"""
+        with self.condition:
+            self.remaining -= count
+            if self.remaining <= 0:
+                self.condition.notify_all()
+
+
+class ScanPool:
+    """Pool de navigateurs WebDriver alimenté par une file de dossards partagée"""
+    RETRYING = object()  # Résultat provisoire : le dossard sera retenté plus tard
+    ABORTED = object()  # Fin anormale du thread de récupération : plus aucun résultat n'arrivera
+
+    def __init__(self, scraper, workers=SCAN_WORKERS, max_rate=SCAN_MAX_RATE):
+        self.scraper = scraper
+        self.workers = workers
+        self.limiter = RateLimiter(max_rate)
+        self.breaker = CircuitBreaker()
+        self.limiter.breaker = self.breaker
+        self.jobs = ScanJobQueue()
+        self.idle_drivers = []  # Navigateurs conservés d'un scan à l'autre (ManagedDriver)
+        self.drivers = {}  # Numéro -> ManagedDriver de tous les navigateurs ouverts
+        self.recycled = 0  # Navigateurs remplacés depuis le lancement
+        self.drivers_lock = threading.Lock()
+        self.warmer = ThreadPoolExecutor(max_workers=2)  # Lancement anticipé des remplaçants
+
+    def acquire_driver(self):
+        """Navigateur inactif du profil courant, sinon un nouveau (ceux d'un autre profil sont fermés)"""
+        managed = None
+        other_profile = []
+        with self.drivers_lock:
+            while self.idle_drivers and managed is None:
+                candidate = self.idle_drivers.pop()
+                if candidate.profile == self.scraper.browser_profile:
+                    managed = candidate
+                else:
+                    other_profile.append(candidate)
+                    self.drivers.pop(candidate.number, None)
+        for candidate in other_profile:
+            candidate.quit()
+        return managed or self.register(self.scraper.create_driver())
+
+    def register(self, driver):
+        managed = ManagedDriver(driver, getattr(driver, 'browser_profile', self.scraper.browser_profile))
+        with self.drivers_lock:
+            self.drivers[managed.number] = managed
+        return managed
+
+    def release_driver(self, driver):
+        with self.drivers_lock:
+            self.idle_drivers.append(driver)
+
+    def after_page(self, managed):
+        """
+        Compte une page chargée. Près de la limite (pages ou mémoire), le remplaçant est
+        lancé en arrière-plan ; la limite atteinte, il prend la place de l'ancien navigateur.
+        """
+        managed.pages += 1
+        if managed.pages % DRIVER_MEASURE_EVERY == 0:
+            managed.measure()
+        if managed.replacement is None and managed.usage() >= DRIVER_PREWARM_RATIO:
+            managed.replacement = self.warmer.submit(self.scraper.create_driver)
+        if managed.usage() < 1:
+            return managed
+
+        rss = f", {managed.rss_mb:.0f} Mo" if managed.rss_mb is not None else ""
+        print(f"Navigateur {managed.number} recyclé après {managed.pages} pages{rss}")
+        with self.drivers_lock:
+            self.drivers.pop(managed.number, None)
+            self.recycled += 1
+        replacement, managed.replacement = managed.replacement, None
+        self.warmer.submit(managed.quit)
+        try:
+            return self.register(replacement.result() if replacement else self.scraper.create_driver())
+        except Exception as e:
+            print(f"Échec du lancement du navigateur de remplacement: {e}")
+            return None  # Le prochain dossard en demandera un nouveau
+
+    def driver_stats(self):
+        """Pages chargées et mémoire de chaque navigateur ouvert"""
+        with self.drivers_lock:
+            return [managed.stats() for managed in self.drivers.values()]
+
+    def describe_drivers(self):
+        """Résumé affichable : "Navigateurs : n°3 120 pages 850 Mo, ... (2 recyclés)" """
+        parts = []
+        for stats in self.driver_stats():
+            rss = f" {stats['rss_mb']:.0f} Mo" if stats['rss_mb'] is not None else ""
+            parts.append(f"n°{stats['number']} {stats['pages']} pages{rss}")
+        if not parts:
+            return ""
+        return f"Navigateurs : {', '.join(parts)} ({self.recycled} recyclés)"
+
+    def close_idle_drivers(self):
+        """Ferme les navigateurs inactifs (changement de profil, fermeture du pool)"""
+        with self.drivers_lock:
+            drivers, self.idle_drivers = self.idle_drivers, []
+            for driver in drivers:
+                self.drivers.pop(driver.number, None)
+        for driver in drivers:
+            driver.quit()
+
+    def close(self):
+        """
+        Ferme tous les navigateurs du pool et la file de scan. Les remplaçants en attente
+        sont annulés ; ceux en cours de lancement sont attendus puis fermés.
+        """
+        self.close_idle_drivers()
+        with self.drivers_lock:
+            remaining, self.drivers = list(self.drivers.values()), {}
+        for managed in remaining:
+            managed.quit()  # Navigateurs encore attribués (scan interrompu)
+        self.warmer.shutdown(wait=True)
+        self.jobs.close()
+
+    def worker(self, work, results, failed):
+        driver = None
+        try:
+            while True:
+                item = work.get()
+                if item is None:
+                    break
+                index, bib = item
+                try:
+                    driver = self.scan_bib(work, results, failed, index, bib, driver)
+                except Exception as e:
+                    # Erreur hors chargement de page (file de scan...) : le dossard est rendu sans
+                    # données, reste 'running' dans la file et sera repris par --resume
+                    print(f"Erreur du scan pour le dossard {bib}: {e}")
+                    traceback.print_exc()
+                    failed.append(bib)
+                    results.put((index, bib, None, False))
+                    work.finish()
+        finally:
+            if driver is not None:
+                self.release_driver(driver)
+
+    def scan_bib(self, work, results, failed, index, bib, driver):
+        """Une tentative sur un dossard ; renvoie le navigateur à utiliser pour le suivant"""
+        data = None
+        started = None
+        self.scraper.empty_bibs.discard(str(bib))  # Dossard remis en file : le constat précédent ne vaut plus
+        try:
+            self.jobs.mark(bib, 'running')
+            if driver is None:
+                driver = self.acquire_driver()
+            self.breaker.wait()
+            self.limiter.wait()
+            started = time.monotonic()
+            # Le cache a déjà été consulté par run() : les dossards reçus sont à recharger
+            data = self.scraper.get_runner_data(bib, driver=driver.driver, refresh=True)
+        except Exception as e:
+            print(f"Erreur du navigateur pour le dossard {bib}: {e}")
+            traceback.print_exc()
+            self.scraper.fetch_errors[str(bib)] = str(e)
+        if started is not None:
+            driver = self.after_page(driver)
+
+        # Vide seulement sur message explicite du site (get_runner_data), sinon échec à retenter
+        empty = data is None and str(bib) in self.scraper.empty_bibs
+        if started is not None:
+            # Un dossard vide est une réponse normale du site ; une page sans données compte comme erreur
+            self.limiter.record(time.monotonic() - started, data is not None or empty)
+        if data is None and not empty:
+            error = self.scraper.fetch_errors.pop(str(bib), "Aucune donnée")
+            self.retry_later(work, results, index, bib, error, failed)
+            return driver
+        self.jobs.mark(bib, 'empty' if empty else 'done')
+        results.put((index, bib, data, False))
+        work.finish()
+        return driver
+
+    def retry_later(self, work, results, index, bib, error, failed):
+        """Remet un dossard en échec dans la file après un délai exponentiel aléatoire, ou l'abandonne"""
+        delay = self.jobs.fail(bib, error)
+        if delay is None:
+            print(f"Dossard {bib} abandonné après {SCAN_MAX_ATTEMPTS} tentatives: {error}")
+            failed.append(bib)
+            results.put((index, bib, None, False))
+            work.finish()
+        else:
+            print(f"Nouvelle tentative pour le dossard {bib} dans {delay:.0f}s ({error})")
+            results.put((index, bib, self.RETRYING, False))
+            work.retry(index, bib, delay)
+
+    def fetch(self, items, results):
+        """
+        Récupère les dossards (en HTTP d'abord si activé) puis les répartit sur les navigateurs
+        par une file continue : un échec y revient après un délai exponentiel aléatoire, jusqu'à
+        SCAN_MAX_ATTEMPTS tentatives. Renvoie le nombre de dossards abandonnés.
+        """
+        self.jobs.enqueue(bib for index, bib in items)
+
+        def on_http_result(index, bib, data):
+            self.jobs.mark(bib, 'done' if data else 'empty')
+            results.put((index, bib, data, False))
+
+        if items and self.scraper.fetch_backend == 'http':
+            items = self.scraper.http_backend.fetch_runners(items, on_http_result, limiter=self.limiter)
+
+        work = ScanWorkQueue(items)
+        failed = []
+        threads = []
+        worker_count = max(1, min(self.workers, SCAN_MAX_WORKERS))
+        for _ in range(min(worker_count, len(items))):
+            thread = threading.Thread(target=self.worker, args=(work, results, failed))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+        return len(failed)
+
+    def run(self, bib_numbers, callback, refresh=False):
+        """
+        Scanne les dossards avec le pool de navigateurs.
+        callback(index, bib, data, cached) est appelé dans l'ordre de bib_numbers, depuis
+        le thread qui appelle run() ; un dossard en attente d'une nouvelle tentative ne bloque
+        pas les suivants et arrive plus tard. Seuls les dossards absents du cache ou périmés
+        sont rechargés (tous avec refresh=True).
+        Renvoie les compteurs {'hit', 'miss', 'stale', 'failed'}.
+        """
+        results = queue.Queue()
+        to_fetch = []
+        counts = {'hit': 0, 'miss': 0, 'stale': 0, 'failed': 0}
+
+        for index, bib in enumerate(bib_numbers):
+            if refresh:
+                to_fetch.append((index, bib))
+                continue
+            data, status = self.scraper.cache_lookup(str(bib))
+            counts[status] += 1
+            if status == 'hit':
+                results.put((index, bib, data, True))
+            else:
+                to_fetch.append((index, bib))
+
+        def fetch():
+            try:
+                counts['failed'] = self.fetch(to_fetch, results)
+            except Exception as e:
+                print(f"Erreur de la récupération des dossards: {e}")
+                traceback.print_exc()
+                results.put(self.ABORTED)
+
+        fetcher = threading.Thread(target=fetch)
+        fetcher.daemon = True
+        fetcher.start()
+
+        # Remettre les résultats dans l'ordre de la liste de dossards
+        pending = {}
+        retrying = set()  # Index sautés en attendant une nouvelle tentative
+        next_index = 0
+        delivered = 0
+        while delivered < len(bib_numbers):
+            result = results.get()
+            if result is self.ABORTED:
+                # Les dossards encore sans résultat sont rendus sans données, dans l'ordre
+                for index in sorted(retrying | set(range(next_index, len(bib_numbers)))):
+                    bib, data, cached = pending.pop(index, (bib_numbers[index], None, False))
+                    if data is None:
+                        counts['failed'] += 1
+                    callback(index, bib, data, cached)
+                break
+            index, bib, data, cached = result
+            if data is self.RETRYING:
+                retrying.add(index)
+            elif index in retrying and index < next_index:
+                retrying.discard(index)
+                callback(index, bib, data, cached)
+                delivered += 1
+                continue
+            else:
+                pending[index] = (bib, data, cached)
+            while next_index in pending or next_index in retrying:
+                if next_index in pending:
+                    retrying.discard(next_index)
+                    bib, data, cached = pending.pop(next_index)
+                    callback(next_index, bib, data, cached)
+                    delivered += 1
+                next_index += 1
+
+        fetcher.join()
+        return counts
+
+
+class BibCrawl:
+    """
+    Parcours complet d'une plage de dossards, repris exactement là où il s'est arrêté.
+    Chaque dossard traité ajoute une ligne au journal : 'found' (coureur enregistré) ou
+    'empty' (aucun coureur, jamais redemandé). Les dossards en erreur ne sont pas
+    journalisés et seront retentés à la reprise.
+    """
+
+    def __init__(self, path=CRAWL_JOURNAL_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done = {}  # Dossard -> 'found' | 'empty'
+        self.journal = None
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Ligne tronquée par un arrêt brutal
+                self.done[record['bib']] = record['status']
+        print(f"Parcours repris : {len(self.done)} dossards déjà traités")
+
+    def record(self, bib, status):
+        with self.lock:
+            if self.journal is None:
+                self.journal = open(self.path, 'a', encoding='utf-8')
+            self.journal.write(json.dumps({'bib': bib, 'status': status}) + '\n')
+            self.journal.flush()
+            self.done[bib] = status
+
+    def pending(self, bibs):
+        """Dossards de la plage restant à traiter, dans l'ordre"""
+        return [bib for bib in bibs if bib not in self.done]
+
+    def count(self, bibs, status):
+        return sum(1 for bib in bibs if self.done.get(bib) == status)
+
+    def run(self, pool, bibs, callback):
+        """
+        Parcourt les dossards non traités sur le pool de navigateurs, en une seule file continue
+        (un dossard en attente d'une nouvelle tentative ne retient pas les suivants).
+        callback(bib, data, status) est appelé pour chaque dossard (status None : erreur).
+        """
+        def on_result(index, bib, data, cached):
+            if data:
+                status = 'found'
+            elif str(bib) in pool.scraper.empty_bibs:
+                status = 'empty'
+            else:
+                status = None
+            if status:
+                self.record(bib, status)
+            callback(bib, data, status)
+
+        pool.run(self.pending(bibs), on_result)
+
+    def close(self):
+        with self.lock:
+            if self.journal:
+                self.journal.close()
+                self.journal = None
+
+
+class RunnerRowModel:
+    """
+    Lignes du tableau principal, gardées hors du widget. Le tableau n'affiche qu'une vue
+    (filtrée et triée) de ce modèle : filtres et tris repartent toujours de toutes les lignes.
+    Chaque filtre a un index inversé valeur -> ensemble de lignes (bitset stocké dans un int).
+    """
+    FILTER_COLUMNS = {'race': 0, 'category': 3, 'state': 8}
+    # Colonnes triées numériquement : dossard, classements, dénivelés
+    NUMERIC_COLUMNS = {1, 4, 5, 6, 11, 12}
+    NO_FILTER = {
+        'race': "Toutes les courses",
+        'state': "Tous les états",
+        'category': "Toutes les catégories"
+    }
+
+    def __init__(self):
+        self.filters = dict(self.NO_FILTER)
+        self.generation = 0  # Incrémentée à chaque vidage : le tableau repart alors de zéro
+        self.clear()
+
+    def clear(self):
+        self.generation += 1
+        self.rows = []  # Identifiant de ligne -> valeurs affichées
+        self.row_ids = {}  # Dossard -> identifiant de ligne
+        self.indexes = {key: {} for key in self.FILTER_COLUMNS}  # Filtre -> valeur -> bitset des lignes
+        self.sort_keys = None  # Colonne -> clés de tri typées, calculées à l'insertion
+        self.permutations = {}  # (colonne, sens) -> permutation (invalidée à chaque modification)
+        self.order = None  # Permutation du tri courant (None : ordre d'arrivée)
+        self.appended = []  # Lignes arrivées après le dernier tri, affichées en fin de tableau
+        self.visible = []  # Identifiants des lignes affichées, dans l'ordre
+
+    @staticmethod
+    def row_values(data):
+        info = data['infos']
+        return (
+            info['race_name'],
+            info['bib_number'],
+            info['name'],
+            info['category'],
+            info['overall_rank'],
+            info['gender_rank'],
+            info['category_rank'],
+            info['average_speed'],
+            info['state'],
+            info['last_checkpoint'],
+            info['finish_time'],
+            f"{info['total_elevation_gain']}m",
+            f"{info['total_elevation_loss']}m"
+        )
+
+    @classmethod
+    def sort_key(cls, column, value):
+        """Clé de tri typée : nombres puis valeurs vides ("-") puis textes, ou texte en minuscules"""
+        text = str(value)
+        if column not in cls.NUMERIC_COLUMNS:
+            return (0, text.lower())
+        if not text or text.strip() == '-':
+            return (1, 0)
+        clean_value = ''.join(c for c in text if c.isdigit() or c == '.')
+        try:
+            return (0, float(clean_value) if '.' in clean_value else int(clean_value))
+        except ValueError:
+            return (2, text.lower())
+
+    def upsert(self, data):
+        """Ajoute ou remplace la ligne d'un coureur, renvoie (identifiant, nouvelle ligne ?)"""
+        values = self.row_values(data)
+        bib = str(values[1])
+        keys = [self.sort_key(column, value) for column, value in enumerate(values)]
+        if self.sort_keys is None:
+            self.sort_keys = [[] for _ in values]
+        self.permutations.clear()
+
+        row_id = self.row_ids.get(bib)
+        if row_id is not None:
+            self.unindex(row_id, self.rows[row_id])
+            self.rows[row_id] = values
+            self.index(row_id, values)
+            for column, key in enumerate(keys):
+                self.sort_keys[column][row_id] = key
+            return row_id, False
+
+        row_id = len(self.rows)
+        self.rows.append(values)
+        self.row_ids[bib] = row_id
+        self.index(row_id, values)
+        for column, key in enumerate(keys):
+            self.sort_keys[column].append(key)
+        if self.order is not None:
+            self.appended.append(row_id)  # Les nouvelles lignes arrivent en fin de tableau
+        if self.matches(values):
+            self.visible.append(row_id)
+        return row_id, True
+
+    def index(self, row_id, values):
+        for key, column in self.FILTER_COLUMNS.items():
+            index = self.indexes[key]
+            value = str(values[column])
+            index[value] = index.get(value, 0) | (1 << row_id)
+
+    def unindex(self, row_id, values):
+        for key, column in self.FILTER_COLUMNS.items():
+            index = self.indexes[key]
+            value = str(values[column])
+            index[value] &= ~(1 << row_id)
+            if not index[value]:
+                del index[value]
+
+    def selected_bits(self):
+        """Intersection des bitsets des filtres actifs"""
+        bits = (1 << len(self.rows)) - 1
+        for key, value in self.filters.items():
+            if value != self.NO_FILTER[key]:
+                bits &= self.indexes[key].get(value, 0)
+        return bits
+
+    def bits_mask(self, bits):
+        """Bitset -> tableau booléen indexé par identifiant de ligne"""
+        count = len(self.rows)
+        raw = np.frombuffer(bits.to_bytes((count + 7) // 8, 'little'), dtype=np.uint8)
+        return np.unpackbits(raw, count=count, bitorder='little').astype(bool)
+
+    def matches(self, values):
+        return all(
+            self.filters[key] == self.NO_FILTER[key] or str(values[column]) == self.filters[key]
+            for key, column in self.FILTER_COLUMNS.items()
+        )
+
+    def refresh(self):
+        """Recalcule les lignes affichées depuis l'ensemble du modèle"""
+        mask = self.bits_mask(self.selected_bits())
+        if self.order is None:
+            self.visible = np.flatnonzero(mask).tolist()
+        else:
+            order = self.order
+            if self.appended:
+                order = np.concatenate([order, np.array(self.appended, dtype=np.int64)])
+            self.visible = order[mask[order]].tolist()
+
+    def reset_filters(self):
+        self.filters = dict(self.NO_FILTER)
+        self.refresh()
+
+    def sort(self, column, reverse):
+        """Trie toutes les lignes sur une colonne ; les ex-aequo gardent l'ordre d'arrivée dans les deux sens"""
+        permutation = self.permutations.get((column, reverse))
+        if permutation is None:
+            keys = self.sort_keys[column] if self.sort_keys else []
+            permutation = np.array(sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse), dtype=np.int64)
+            self.permutations[(column, reverse)] = permutation
+        self.order = permutation
+        self.appended = []
+        self.refresh()
+
+    def distinct(self, filter_type):
+        return set(self.indexes[filter_type])
+
+    def visible_bibs(self):
+        return [self.rows[row_id][1] for row_id in self.visible]
+
+
 class CheckpointWindow:
     def __init__(self, parent, bib_number, runner_data, checkpoint_data):
         self.window = ctk.CTkToplevel(parent)
@@ -544,7 +3378,8 @@ class CheckpointWindow:
             f"Classement sexe: {runner_data['gender_rank']}\n"
             f"Classement catégorie: {runner_data['category_rank']}\n"
             f"Vitesse moyenne: {runner_data['average_speed']}\n"
-            f"Dénivelé: {runner_data['total_elevation_gain']}m / {runner_data['total_elevation_loss']}m"
+            f"Dénivelé: {runner_data['total_elevation_gain']}m / {runner_data['total_elevation_loss']}m\n"
+            f"Relevé: {format_age(runner_data.get('scraped_at'))}"
         )
 
         ctk.CTkLabel(right_info, text=right_info_text, justify="left").pack(padx=10, pady=10)
@@ -647,6 +3482,7 @@ class CheckpointWindow:
 
 class RaceTrackerApp:
     def __init__(self):
+        load_gui()
         self.root = ctk.CTk()
         self.root.title("Suivi Grand Raid")
         # Maximiser la fenêtre
@@ -658,7 +3494,7 @@ class RaceTrackerApp:
             "Treeview",
             background="#2b2b2b",
             foreground="white",
-            rowheight=25,
+            rowheight=TREE_ROW_HEIGHT,
             fieldbackground="#2b2b2b"
         )
         style.configure(
@@ -669,16 +3505,28 @@ class RaceTrackerApp:
         )
         style.map("Treeview", background=[('selected', '#22559b')])
 
+        log_startup("Interface initialisée")
         self.scraper = RaceDataScraper()
+        log_startup("Données chargées")
+        self.scan_pool = ScanPool(self.scraper)
         self.checkpoint_windows = {}
-        self.initial_data = []  # Pour stocker les données initiales
-        self.current_filters = {
-            'race': "Toutes les courses",
-            'state': "Tous les états",
-            'category': "Toutes les catégories"
-        }
+        self.row_model = RunnerRowModel()
+        self.virtual_tree = False  # Vrai quand seules les lignes visibles sont dans le tableau
+        self.tree_generation = None  # Génération du modèle affichée par le tableau
+        self.tree_rows = 0  # Lignes du modèle insérées dans le tableau (mode complet)
+        self.tree_first = 0  # Première ligne affichée (mode virtuel)
+        self.ui_events = queue.Queue()  # Évènements des threads de travail, traités par lots sur le thread Tk
+        self.scanning = False  # Vrai pendant un scan ou un rafraîchissement : le pool n'en mène qu'un à la fois
+        self.live_job = None  # Prochain rafraîchissement en direct programmé (identifiant after)
+        self.cache_status_running = False  # Âge du plus ancien relevé en cours de calcul
+        self.cache_status_dirty = False  # Données modifiées pendant ce calcul : à relancer
         self.create_widgets()
+        log_startup("Fenêtre construite")
         self.load_cached_data()
+        log_startup("Tableau rempli")
+        self.root.after(UI_TICK_MS, self.drain_ui_events)
+        self.root.after_idle(log_startup, "Première image affichée")
+        self.tick_cache_status()
 
     def create_widgets(self):
         self.main_frame = ctk.CTkFrame(self.root)
@@ -688,17 +3536,33 @@ class RaceTrackerApp:
         input_frame = ctk.CTkFrame(self.main_frame)
         input_frame.pack(fill=tk.X, padx=10, pady=10)
 
-        ctk.CTkLabel(input_frame, text="Numéros de dossard (séparés par des virgules):").pack(side=tk.LEFT, padx=5)
+        ctk.CTkLabel(input_frame, text="Dossards (ex. 12, 40, 1-2800):").pack(side=tk.LEFT, padx=5)
         self.bib_entry = ctk.CTkEntry(input_frame, width=400)
         self.bib_entry.pack(side=tk.LEFT, padx=5)
 
+        ctk.CTkLabel(input_frame, text="Navigateurs:").pack(side=tk.LEFT, padx=5)
+        self.workers_selector = ctk.CTkComboBox(
+            input_frame,
+            values=[str(i) for i in range(1, SCAN_MAX_WORKERS + 1)],
+            width=70
+        )
+        self.workers_selector.pack(side=tk.LEFT, padx=5)
+        self.workers_selector.set(str(SCAN_WORKERS))
+
         self.scan_button = ctk.CTkButton(input_frame, text="Scanner", command=self.start_scanning)
         self.scan_button.pack(side=tk.LEFT, padx=5)
 
+        self.crawl_button = ctk.CTkButton(input_frame, text="Parcourir la plage", command=self.start_crawl)
+        self.crawl_button.pack(side=tk.LEFT, padx=5)
+
         # Frame de progression
         progress_frame = ctk.CTkFrame(self.main_frame)
         progress_frame.pack(fill=tk.X, padx=10, pady=5)
         self.progress_label = ctk.CTkLabel(progress_frame, text="")
+        self.cache_label = ctk.CTkLabel(progress_frame, text="")
+        self.cache_label.pack(side=tk.RIGHT, padx=5)
+        self.driver_label = ctk.CTkLabel(progress_frame, text="")
+        self.driver_label.pack(side=tk.RIGHT, padx=5)
         self.progress_label.pack(side=tk.LEFT, padx=5)
 
         # Configuration du tableau principal avec toutes les colonnes
@@ -759,12 +3623,17 @@ class RaceTrackerApp:
             self.tree.column(col, width=widths[col], anchor="center")
 
         # Scrollbar
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.tree_scrollbar.set)
+        self.tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.tree.pack(fill=tk.BOTH, expand=True)
 
         self.tree.bind('<Double-1>', self.show_checkpoint_details)
+        # Défilement du mode virtuel
+        self.tree.bind('<MouseWheel>', self.on_tree_wheel)
+        self.tree.bind('<Button-4>', self.on_tree_wheel)
+        self.tree.bind('<Button-5>', self.on_tree_wheel)
+        self.tree.bind('<Configure>', lambda event: self.virtual_tree and self.render_virtual_rows())
 
         # Frame pour les filtres
         filter_frame = ctk.CTkFrame(self.main_frame)
@@ -813,63 +3682,217 @@ class RaceTrackerApp:
         )
         self.analysis_button.pack(side=tk.LEFT, padx=5)
 
-    def load_initial_data(self):
-        """Charger et stocker les données initiales"""
-        self.initial_data.clear()
-        for item in self.tree.get_children():
-            self.initial_data.append(self.tree.item(item))
+        # Archive des pages brutes
+        self.archive_var = tk.BooleanVar(value=self.scraper.page_archive is not None)
+        ctk.CTkCheckBox(
+            input_frame,
+            text="Archiver les pages",
+            variable=self.archive_var,
+            command=self.toggle_page_archive
+        ).pack(side=tk.LEFT, padx=5)
+
+        self.rebuild_button = ctk.CTkButton(
+            input_frame,
+            text="Relire l'archive",
+            command=self.start_archive_rebuild
+        )
+        self.rebuild_button.pack(side=tk.LEFT, padx=5)
+
+        self.fast_browser_var = tk.BooleanVar(value=self.scraper.browser_profile == 'fast')
+        ctk.CTkCheckBox(
+            input_frame,
+            text="Navigateur rapide",
+            variable=self.fast_browser_var,
+            command=self.toggle_browser_profile
+        ).pack(side=tk.LEFT, padx=5)
+
+        self.live_var = tk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            input_frame,
+            text="Suivi en direct",
+            variable=self.live_var,
+            command=self.toggle_live_refresh
+        ).pack(side=tk.LEFT, padx=5)
 
     def on_filter_change(self, filter_type, value):
         """Gestion du changement de filtre avec type de filtre"""
         print(f"Changement du filtre {filter_type}: {value}")
-        self.current_filters[filter_type] = value
+        self.row_model.filters[filter_type] = value
         self.apply_filters()
 
     def reset_filters(self):
-        """Réinitialiser tous les filtres et restaurer les données initiales"""
+        """Réinitialiser tous les filtres et réafficher toutes les lignes"""
         # Réinitialiser les valeurs des filtres
         self.race_filter.set("Toutes les courses")
         self.state_filter.set("Tous les états")
         self.category_filter.set("Toutes les catégories")
 
-        self.current_filters = {
-            'race': "Toutes les courses",
-            'state': "Tous les états",
-            'category': "Toutes les catégories"
-        }
-
-        # Effacer le tableau actuel
-        self.tree.delete(*self.tree.get_children())
+        self.row_model.reset_filters()
+        self.refresh_tree()
 
-        # Restaurer les données initiales
-        for item_data in self.initial_data:
-            self.tree.insert('', 'end', values=item_data['values'], tags=item_data.get('tags', ()))
-
-        print("Filtres réinitialisés - Données restaurées à l'état initial")
-        print(f"Nombre total de coureurs: {len(self.initial_data)}")
+        print("Filtres réinitialisés - Toutes les lignes sont affichées")
+        print(f"Nombre total de coureurs: {len(self.row_model.rows)}")
 
     def load_cached_data(self):
-        """Charger les données en cache et initialiser les données de référence"""
+        """Charger les données en cache dans le modèle de lignes"""
+        self.row_model.clear()
         if self.scraper.all_data:
-            cached_bibs = list(self.scraper.all_data.keys())
-            print(f"Chargement automatique de {len(cached_bibs)} dossards")
-            for bib in cached_bibs:
-                data = self.scraper.all_data[bib]
-                self.add_runner_to_tree(data)
-
-            # Stocker les données initiales après le chargement
-            self.load_initial_data()
+            for bib, infos in self.scraper.runner_infos():
+                self.row_model.upsert({'infos': infos})
+            print(f"Chargement automatique de {len(self.row_model.rows)} dossards")
 
             self.update_filters()
-            self.progress_label.configure(text=f"{len(cached_bibs)} dossards chargés depuis le cache")
+            self.progress_label.configure(text=f"{len(self.row_model.rows)} dossards chargés depuis le cache")
+        self.refresh_tree()
+        self.update_cache_status()
+
+    def update_cache_status(self):
+        """
+        Affiche les compteurs du cache et l'âge du plus ancien relevé d'un coureur en course.
+        Les relevés sont lus dans un thread (lecture SQLite possible), l'affichage suit.
+        """
+        if self.cache_status_running:
+            self.cache_status_dirty = True
+            return
+        self.cache_status_running = True
+        bibs = [values[1] for values in self.row_model.rows if values[8] not in FINAL_STATES]
+        thread = threading.Thread(target=self.compute_cache_status, args=(bibs,))
+        thread.daemon = True
+        thread.start()
+
+    def compute_cache_status(self, bibs):
+        oldest = None
+        try:
+            found = dict(self.scraper.get_runners(bibs))
+            oldest = min(
+                (found[bib]['infos'].get('scraped_at', 0) if bib in found else 0 for bib in bibs), default=None
+            )
+        except Exception as e:
+            print(f"Erreur lors du calcul de l'âge des relevés: {e}")
+        self.post_ui('call', lambda: self.show_cache_status(oldest))
+
+    def show_cache_status(self, oldest):
+        self.cache_status_running = False
+        if self.cache_status_dirty:
+            self.cache_status_dirty = False
+            self.update_cache_status()
+            return
+
+        stats = self.scraper.cache_stats
+        text = f"Cache : {stats['hit']} trouvés, {stats['miss']} absents, {stats['stale']} périmés"
+        if oldest is not None:
+            text += f" · plus ancien relevé en course {format_age(oldest)}"
+        self.cache_label.configure(text=text)
+
+    def tick_cache_status(self):
+        """Rafraîchit chaque minute l'âge affiché des relevés et l'état des navigateurs"""
+        self.update_cache_status()
+        self.driver_label.configure(text=self.describe_browsers())
+        self.root.after(60000, self.tick_cache_status)
+
+    def refresh_tree(self):
+        """Affiche dans le tableau la vue courante (filtrée et triée) du modèle de lignes"""
+        virtual = len(self.row_model.rows) > VIRTUAL_TREE_THRESHOLD
+        if virtual != self.virtual_tree or self.tree_generation != self.row_model.generation:
+            # Changement de mode ou modèle vidé : on repart d'un tableau vide
+            self.tree.delete(*self.tree.get_children())
+            self.tree_generation = self.row_model.generation
+            self.tree_rows = 0
+            self.tree_first = 0
+            self.virtual_tree = virtual
+            if virtual:
+                self.tree_scrollbar.configure(command=self.on_tree_scroll)
+                self.tree.configure(yscrollcommand=lambda *args: None)
+            else:
+                self.tree_scrollbar.configure(command=self.tree.yview)
+                self.tree.configure(yscrollcommand=self.tree_scrollbar.set)
+
+        if self.virtual_tree:
+            self.render_virtual_rows()
+            return
+
+        # Mode complet : chaque ligne est insérée une fois ; set_children détache les lignes filtrées
+        # et rattache les lignes retenues dans l'ordre, en un seul appel
+        for row_id in range(self.tree_rows, len(self.row_model.rows)):
+            self.tree.insert('', 'end', iid=str(row_id), values=self.row_model.rows[row_id])
+        self.tree_rows = len(self.row_model.rows)
+        self.tree.set_children('', *[str(row_id) for row_id in self.row_model.visible])
+
+    def visible_row_count(self):
+        """Nombre de lignes que le tableau peut afficher (en-tête déduit)"""
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return 50  # Tableau pas encore affiché
+        return max(1, height // TREE_ROW_HEIGHT - 1)
+
+    def render_virtual_rows(self):
+        """Mode virtuel : le tableau ne contient que la fenêtre de lignes visible"""
+        visible = self.row_model.visible
+        height = self.visible_row_count()
+        self.tree_first = max(0, min(self.tree_first, len(visible) - height))
+        window = [str(row_id) for row_id in visible[self.tree_first:self.tree_first + height]]
+
+        shown = set(self.tree.get_children())
+        stale = shown.difference(window)
+        if stale:
+            self.tree.delete(*stale)
+        for iid in window:
+            if iid not in shown:
+                self.tree.insert('', 'end', iid=iid, values=self.row_model.rows[int(iid)])
+        self.tree.set_children('', *window)
+
+        if visible:
+            self.tree_scrollbar.set(self.tree_first / len(visible), min(1.0, (self.tree_first + height) / len(visible)))
+        else:
+            self.tree_scrollbar.set(0.0, 1.0)
+
+    def on_tree_scroll(self, action, amount, unit=None):
+        """Barre de défilement du mode virtuel"""
+        if action == 'moveto':
+            self.tree_first = int(float(amount) * len(self.row_model.visible))
+        elif action == 'scroll':
+            self.tree_first += int(amount) * (self.visible_row_count() if unit == 'pages' else 1)
+        self.render_virtual_rows()
+
+    def on_tree_wheel(self, event):
+        """Molette en mode virtuel (le mode complet garde le défilement natif)"""
+        if not self.virtual_tree:
+            return None
+        step = -TREE_WHEEL_ROWS if event.num == 4 or event.delta > 0 else TREE_WHEEL_ROWS
+        self.tree_first += step
+        self.render_virtual_rows()
+        return "break"
+
+    def toggle_page_archive(self):
+        """Active ou désactive l'archivage des pages récupérées"""
+        self.scraper.page_archive = PageArchive(PAGE_ARCHIVE_DIR) if self.archive_var.get() else None
+
+    def start_archive_rebuild(self):
+        """Reconstruit les données depuis l'archive des pages, sans navigateur"""
+        self.rebuild_button.configure(state="disabled")
+        self.progress_label.configure(text="Relecture de l'archive des pages...")
+
+        def rebuild():
+            try:
+                count = self.scraper.rebuild_from_archive()
+            except Exception as e:
+                print(f"Erreur lors de la relecture de l'archive: {e}")
+                traceback.print_exc()
+                count = 0
+            self.post_ui('call', lambda: self.archive_rebuild_complete(count))
+
+        thread = threading.Thread(target=rebuild)
+        thread.daemon = True
+        thread.start()
+
+    def archive_rebuild_complete(self, count):
+        self.rebuild_button.configure(state="normal")
+        self.load_cached_data()
+        self.progress_label.configure(text=f"{count} coureurs reconstruits depuis l'archive")
 
     def show_top_analysis(self):
-        # Récupérer tous les dossards actuellement affichés dans le tableau
-        bibs = []
-        for item in self.tree.get_children():
-            values = self.tree.item(item)['values']
-            if values:
-                bibs.append(values[1])  # L'index 1 correspond à la colonne du dossard
+        # Récupérer tous les dossards affichés (filtrés), y compris hors de la fenêtre visible
+        bibs = self.row_model.visible_bibs()
 
         if not bibs:
             messagebox.showwarning(
@@ -881,15 +3904,98 @@ class RaceTrackerApp:
         # Créer la fenêtre d'analyse
         TopAnalysisWindow(self.root, self.scraper, bibs)
 
-    def scanning_complete(self, scanned, cached):
+    def toggle_browser_profile(self):
+        """Profil rapide (sans fenêtre ni images, polices et traceurs) ou standard pour les prochains navigateurs"""
+        self.scraper.browser_profile = 'fast' if self.fast_browser_var.get() else 'standard'
+
+    def describe_browsers(self):
+        return " · ".join(text for text in (
+            self.scan_pool.describe_drivers(), self.scraper.describe_page_metrics()
+        ) if text)
+
+    def set_scanning(self, scanning):
+        """Réserve ou libère le pool de navigateurs : les boutons de scan suivent"""
+        self.scanning = scanning
+        self.driver_label.configure(text=self.describe_browsers())
+        state = "disabled" if scanning else "normal"
+        self.scan_button.configure(state=state)
+        self.crawl_button.configure(state=state)
+
+    def toggle_live_refresh(self):
+        """Active ou arrête le rafraîchissement périodique des coureurs encore en course"""
+        if self.live_job is not None:
+            self.root.after_cancel(self.live_job)
+            self.live_job = None
+        if self.live_var.get():
+            self.start_live_refresh()
+        else:
+            self.progress_label.configure(text="Suivi en direct arrêté")
+
+    def schedule_live_refresh(self, delay_ms):
+        if self.live_var.get():
+            self.live_job = self.root.after(delay_ms, self.start_live_refresh)
+
+    def start_live_refresh(self):
+        """Relance le scan des seuls coureurs du tableau dont l'état n'est pas définitif"""
+        self.live_job = None
+        if self.scanning:
+            self.schedule_live_refresh(5000)  # Un scan est en cours : réessayer un peu plus tard
+            return
+
+        bibs = [int(values[1]) for values in self.row_model.rows if values[8] not in FINAL_STATES]
+        if not bibs:
+            self.progress_label.configure(text="Suivi en direct : aucun coureur en course dans le tableau")
+            self.schedule_live_refresh(LIVE_REFRESH_INTERVAL * 1000)
+            return
+
+        try:
+            workers = int(self.workers_selector.get())
+        except ValueError:
+            workers = SCAN_WORKERS
+
+        self.set_scanning(True)
+        thread = threading.Thread(target=self.live_refresh, args=(bibs, workers))
+        thread.daemon = True
+        thread.start()
+
+    def live_refresh(self, bib_numbers, workers):
+        """Recharge les dossards et ne poste que les coureurs dont les données ont changé"""
+        total = len(bib_numbers)
+        with self.scraper.data_lock:
+            previous = {bib: self.scraper.all_data.get(str(bib)) for bib in bib_numbers}
+        changed = []
+
+        def on_result(index, bib, data, from_cache):
+            self.post_ui('progress', f"Suivi en direct : dossard {bib} ({index + 1}/{total})...")
+            if data and self.scraper.merge_runner(previous[bib], data) is not None:
+                changed.append(bib)
+                self.post_ui('runner', data)
+
+        self.scan_pool.workers = workers
+        self.scan_pool.run(bib_numbers, on_result, refresh=True)
+        self.post_ui('call', lambda: self.live_refresh_complete(len(changed), total))
+
+    def live_refresh_complete(self, changed, total):
+        self.set_scanning(False)
+        self.progress_label.configure(
+            text=f"Suivi en direct : {changed}/{total} coureurs mis à jour à {datetime.now():%H:%M:%S}"
+        )
+        if changed:
+            self.update_filters()
+        self.update_cache_status()
+        self.schedule_live_refresh(LIVE_REFRESH_INTERVAL * 1000)
+
+    def scanning_complete(self, scanned, cached, stale=0, failed=0):
         """Finalise le processus de scan"""
-        self.scan_button.configure(state="normal")
+        self.set_scanning(False)
         if scanned + cached > 0:
-            self.progress_label.configure(
-                text=f"Scan terminé ! ({cached} depuis le cache, {scanned} nouveaux scans)"
-            )
+            text = f"Scan terminé ! ({cached} depuis le cache, {scanned} nouveaux scans dont {stale} relevés périmés)"
+            if failed:
+                text += f" - {failed} dossards en échec, à reprendre avec un champ de saisie vide"
+            self.progress_label.configure(text=text)
         else:
             self.progress_label.configure(text="Scan terminé !")
+        self.update_cache_status()
 
     def show_checkpoint_details(self, event):
         """Affiche la fenêtre des détails pour un coureur"""
@@ -928,42 +4034,11 @@ class RaceTrackerApp:
     def treeview_sort_column(self, col, reverse):
         """Trie le tableau selon une colonne avec gestion correcte des nombres"""
         try:
-            data = [(self.tree.set(item, col), item) for item in self.tree.get_children('')]
+            # Tri sur le modèle, avec les clés typées calculées à l'insertion
+            self.row_model.sort(self.tree['columns'].index(col), reverse)
 
-            def convert_to_number(value):
-                """Convertit une valeur en nombre en gérant les cas spéciaux"""
-                if not value or value.strip() == '-':
-                    return float('inf')  # Mettre les valeurs vides à la fin
-                try:
-                    # Nettoyer la valeur et convertir en nombre
-                    clean_value = ''.join(c for c in value if c.isdigit() or c == '.')
-                    return float(clean_value) if '.' in clean_value else int(clean_value)
-                except:
-                    return value
-
-            # Détermine si la colonne doit être triée numériquement
-            numeric_columns = {
-                "overall_rank", "gender_rank", "category_rank",  # Classements
-                "bib",  # Dossards
-                "total_elevation_gain", "total_elevation_loss"  # Dénivelés
-            }
-
-            # Tri avec gestion spéciale pour les colonnes numériques
-            if col in numeric_columns:
-                data.sort(
-                    key=lambda x: convert_to_number(x[0]),
-                    reverse=reverse
-                )
-            else:
-                # Tri normal pour les autres colonnes
-                data.sort(
-                    key=lambda x: x[0].lower() if isinstance(x[0], str) else x[0],
-                    reverse=reverse
-                )
-
-            # Réorganiser les items
-            for idx, (val, item) in enumerate(data):
-                self.tree.move(item, '', idx)
+            # Réorganiser l'affichage
+            self.refresh_tree()
 
             # Inverser le sens pour le prochain clic
             self.tree.heading(
@@ -977,25 +4052,57 @@ class RaceTrackerApp:
             traceback.print_exc()
 
 
-    def add_runner_to_tree(self, data):
-        """Ajoute un coureur au tableau principal avec toutes les nouvelles données"""
-        if data and 'infos' in data:
-            info = data['infos']
-            self.tree.insert('', 'end', values=(
-                info['race_name'],  # Ajout du nom de la course
-                info['bib_number'],
-                info['name'],
-                info['category'],
-                info['overall_rank'],
-                info['gender_rank'],
-                info['category_rank'],
-                info['average_speed'],
-                info['state'],
-                info['last_checkpoint'],
-                info['finish_time'],
-                f"{info['total_elevation_gain']}m",
-                f"{info['total_elevation_loss']}m"
-            ))
+    def add_runners_to_tree(self, runners):
+        """Ajoute (ou met à jour) un lot de coureurs dans le modèle de lignes, puis rafraîchit le tableau une fois"""
+        updated = []
+        for data in runners:
+            if data and 'infos' in data:
+                row_id, added = self.row_model.upsert(data)
+                if not added:
+                    updated.append(row_id)
+
+        for row_id in updated:
+            if self.tree.exists(str(row_id)):
+                self.tree.item(str(row_id), values=self.row_model.rows[row_id])
+        if updated:
+            self.row_model.refresh()  # Les lignes modifiées peuvent ne plus passer les filtres
+        self.refresh_tree()
+
+    def post_ui(self, kind, payload):
+        """
+        Poste un évènement pour le thread Tk (appelable depuis n'importe quel thread) :
+        'progress' (texte), 'runner' (données d'un coureur) ou 'call' (fonction à exécuter)
+        """
+        self.ui_events.put((kind, payload))
+
+    def drain_ui_events(self):
+        """Traite par lots, à période fixe, les évènements postés par les threads de travail"""
+        runners = []
+        progress = None
+        calls = []
+        for _ in range(UI_BATCH_SIZE):
+            try:
+                kind, payload = self.ui_events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'runner':
+                runners.append(payload)
+            elif kind == 'progress':
+                progress = payload  # Seul le dernier message du lot est affiché
+            else:
+                calls.append(payload)
+
+        try:
+            if runners:
+                self.add_runners_to_tree(runners)
+            if progress is not None:
+                self.progress_label.configure(text=progress)
+            for call in calls:
+                call()
+        except Exception as e:
+            print(f"Erreur lors de la mise à jour de l'interface: {e}")
+            traceback.print_exc()
+        self.root.after(UI_TICK_MS, self.drain_ui_events)
 
     def update_filters(self):
         """Mise à jour des listes de filtres en fonction des données actuelles"""
@@ -1006,12 +4113,9 @@ class RaceTrackerApp:
         states.add("Tous les états")
         categories.add("Toutes les catégories")
 
-        for item in self.tree.get_children():
-            values = self.tree.item(item)['values']
-            if values:
-                races.add(values[0])  # Course (index 0)
-                categories.add(values[3])  # Catégorie (index 3)
-                states.add(values[8])  # État (index 8)
+        races.update(self.row_model.distinct('race'))
+        categories.update(self.row_model.distinct('category'))
+        states.update(self.row_model.distinct('state'))
 
         # Mettre à jour les valeurs des ComboBox
         self.race_filter.configure(values=sorted(list(races)))
@@ -1021,101 +4125,137 @@ class RaceTrackerApp:
 
 
     def apply_filters(self):
-        """Application des filtres avec gestion améliorée"""
-        # Sauvegarder toutes les lignes originales
-        all_items = [(self.tree.item(item), item) for item in self.tree.get_children()]
-
-        # Effacer l'affichage actuel
-        self.tree.delete(*self.tree.get_children())
-
-        filtered_count = 0
-
-        for item_data, item_id in all_items:
-            values = item_data['values']
-            if not values:
-                continue
-
-            show_item = True
-
-            # Vérifier chaque filtre
-            if self.current_filters['race'] != "Toutes les courses" and values[0] != self.current_filters['race']:
-                show_item = False
-            if self.current_filters['category'] != "Toutes les catégories" and values[3] != self.current_filters[
-                'category']:
-                show_item = False
-            if self.current_filters['state'] != "Tous les états" and values[8] != self.current_filters['state']:
-                show_item = False
-
-            if show_item:
-                self.tree.insert('', 'end', values=values, tags=item_data.get('tags', ()))
-                filtered_count += 1
+        """Application des filtres sur toutes les lignes du modèle"""
+        self.row_model.refresh()
+        self.refresh_tree()
 
         # Afficher un résumé des filtres appliqués
+        filters = self.row_model.filters
         filter_summary = []
-        if self.current_filters['race'] != "Toutes les courses":
-            filter_summary.append(f"Course: {self.current_filters['race']}")
-        if self.current_filters['category'] != "Toutes les catégories":
-            filter_summary.append(f"Catégorie: {self.current_filters['category']}")
-        if self.current_filters['state'] != "Tous les états":
-            filter_summary.append(f"État: {self.current_filters['state']}")
+        if filters['race'] != "Toutes les courses":
+            filter_summary.append(f"Course: {filters['race']}")
+        if filters['category'] != "Toutes les catégories":
+            filter_summary.append(f"Catégorie: {filters['category']}")
+        if filters['state'] != "Tous les états":
+            filter_summary.append(f"État: {filters['state']}")
 
         print(f"Filtres actifs: {' | '.join(filter_summary) if filter_summary else 'Aucun'}")
-        print(f"Nombre de coureurs affichés: {filtered_count}")
+        print(f"Nombre de coureurs affichés: {len(self.row_model.visible)}")
 
-
-    def scan_bibs(self, bib_numbers):
+    def scan_bibs(self, bib_numbers, workers=SCAN_WORKERS):
         total = len(bib_numbers)
-        scanned = 0
-        cached = 0
-
-        for i, bib in enumerate(bib_numbers, 1):
-            bib_str = str(bib)
-            if bib_str in self.scraper.all_data:
-                self.progress_label.configure(
-                    text=f"Récupération du cache pour le dossard {bib} ({i}/{total})..."
-                )
-                data = self.scraper.all_data[bib_str]
-                cached += 1
+        counts = {'scanned': 0, 'cached': 0}
+
+        def on_result(index, bib, data, from_cache):
+            if from_cache:
+                counts['cached'] += 1
+                text = f"Récupération du cache pour le dossard {bib} ({index + 1}/{total})..."
             else:
-                self.progress_label.configure(
-                    text=f"Scan du dossard {bib} ({i}/{total})..."
-                )
-                data = self.scraper.get_runner_data(bib)
-                scanned += 1
+                counts['scanned'] += 1
+                text = f"Dossard {bib} scanné ({index + 1}/{total})..."
+            self.post_ui('progress', text)
 
             if data:
-                self.root.after(0, self.add_runner_to_tree, data)
-            time.sleep(1)
+                self.post_ui('runner', data)
 
-        self.root.after(0, lambda: self.scanning_complete(scanned, cached))
-        self.root.after(0, self.update_filters)
+        self.scan_pool.workers = workers
+        cache_counts = self.scan_pool.run(bib_numbers, on_result)
 
-    def start_scanning(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.post_ui('call', lambda: self.scanning_complete(
+            counts['scanned'], counts['cached'], cache_counts['stale'], cache_counts['failed']
+        ))
+        self.post_ui('call', self.update_filters)
 
+    def start_scanning(self):
         bib_text = self.bib_entry.get().strip()
         if not bib_text:
-            messagebox.showwarning("Attention", "Veuillez entrer des numéros de dossard!")
-            return
+            # Champ vide : reprise des dossards non terminés ou en échec lors des scans précédents
+            bib_numbers = self.scan_pool.jobs.incomplete()
+            if not bib_numbers:
+                messagebox.showwarning("Attention", "Veuillez entrer des numéros de dossard!")
+                return
+            self.progress_label.configure(text=f"Reprise de {len(bib_numbers)} dossards non terminés...")
+        else:
+            try:
+                bib_numbers = parse_bib_list(bib_text)
+            except ValueError:
+                messagebox.showerror("Erreur", f"Format de numéro de dossard invalide (au plus {MAX_BIB_COUNT} dossards)!")
+                return
+
+        try:
+            workers = int(self.workers_selector.get())
+        except ValueError:
+            workers = SCAN_WORKERS
+
+        # Saisie valide : le tableau n'est vidé qu'à présent, une erreur laisse les données affichées
+        self.row_model.clear()
+        self.refresh_tree()
+        self.set_scanning(True)
+        thread = threading.Thread(target=self.scan_bibs, args=(bib_numbers, workers))
+        thread.daemon = True
+        thread.start()
 
+    def start_crawl(self):
+        """Parcourt toute la plage saisie, en reprenant un parcours interrompu"""
         try:
-            bib_numbers = [int(x.strip()) for x in bib_text.split(',')]
+            bib_numbers = parse_bib_list(self.bib_entry.get().strip())
         except ValueError:
-            messagebox.showerror("Erreur", "Format de numéro de dossard invalide!")
+            messagebox.showerror("Erreur", f"Format de numéro de dossard invalide (au plus {MAX_BIB_COUNT} dossards)!")
+            return
+        if not bib_numbers:
+            messagebox.showwarning("Attention", "Veuillez entrer une plage de dossards, ex. 1-2800")
+            return
+        if self.scanning:
+            messagebox.showwarning("Attention", "Un scan est déjà en cours")
             return
 
-        self.scan_button.configure(state="disabled")
-        thread = threading.Thread(target=self.scan_bibs, args=(bib_numbers,))
+        try:
+            workers = int(self.workers_selector.get())
+        except ValueError:
+            workers = SCAN_WORKERS
+
+        self.set_scanning(True)
+        thread = threading.Thread(target=self.crawl_bibs, args=(bib_numbers, workers))
         thread.daemon = True
         thread.start()
 
+    def crawl_bibs(self, bib_numbers, workers):
+        crawl = BibCrawl()
+        total = len(bib_numbers)
+        counts = {'found': crawl.count(bib_numbers, 'found'), 'empty': crawl.count(bib_numbers, 'empty'), None: 0}
+
+        def on_result(bib, data, status):
+            counts[status] += 1
+            done = counts['found'] + counts['empty']
+            self.post_ui('progress', f"Parcours : {done}/{total} dossards traités "
+                                     f"({counts['found']} coureurs, {counts['empty']} vides, {counts[None]} erreurs)")
+            if data:
+                self.post_ui('runner', data)
+
+        self.scan_pool.workers = workers
+        try:
+            crawl.run(self.scan_pool, bib_numbers, on_result)
+        finally:
+            crawl.close()
+        self.post_ui('call', lambda: self.crawl_complete(counts['found'], counts['empty'], counts[None]))
+        self.post_ui('call', self.update_filters)
+
+    def crawl_complete(self, found, empty, errors):
+        self.set_scanning(False)
+        text = f"Parcours terminé : {found} coureurs, {empty} dossards vides"
+        if errors:
+            text += f", {errors} erreurs (relancer le parcours pour les retenter)"
+        self.progress_label.configure(text=text)
+        self.update_cache_status()
+
     def run(self):
         self.root.mainloop()
 
     def __del__(self):
+        if hasattr(self, 'scan_pool'):
+            self.scan_pool.close()
         if hasattr(self, 'scraper'):
-            self.scraper.close_driver()
+            self.scraper.close()
 
 
 class TopAnalysisWindow:
@@ -1125,7 +4265,16 @@ class TopAnalysisWindow:
         self.window.geometry("1400x800")
         self.scraper = scraper
         self.bibs = bibs
+        self.bibs_key = tuple(bibs)  # Sélection analysée, partie de la clé du cache des classements
         self.sections_info = {}  # Initialisation de sections_info ici
+        self.computed_tabs = {}  # Onglet -> course pour laquelle il est calculé (ou en cours de calcul)
+        self.generation = 0  # Incrémentée à chaque changement de course : annule les calculs en cours
+        self.section_generation = 0  # Incrémentée à chaque choix de section : seul le dernier est affiché
+        self.section_request = None  # (génération, section, infos) de la section à calculer
+        self.tab_results = queue.Queue()  # Résultats des calculs en arrière-plan, affichés sur le thread Tk
+        self.panels = {}  # Clé -> panneau persistant (titre + tableau), réutilisé d'un affichage à l'autre
+        self.panel_order = {}  # Cadre parent -> panneaux dans leur ordre d'affichage
+        self.apply_table_style()
 
         # Frame principal avec défilement
         self.main_frame = ctk.CTkFrame(self.window)
@@ -1146,12 +4295,15 @@ class TopAnalysisWindow:
         self.race_selector.pack(side=tk.LEFT, padx=5)
         self.race_selector.set("Toutes les courses")
 
+        self.status_label = ctk.CTkLabel(self.filter_frame, text="")
+        self.status_label.pack(side=tk.RIGHT, padx=5)
+
         # Sélecteur de section (visible uniquement pour l'onglet sections)
         self.section_frame = ctk.CTkFrame(self.filter_frame)
         self.section_selector = None
 
         # Créer les onglets
-        self.tabview = ctk.CTkTabview(self.main_frame)
+        self.tabview = ctk.CTkTabview(self.main_frame, command=self.show_current_tab)
         self.tabview.pack(fill=tk.BOTH, expand=True, pady=10)
 
         # Ajouter les onglets
@@ -1166,18 +4318,52 @@ class TopAnalysisWindow:
         self.create_speed_subtabs()
         self.create_sections_subtabs()
 
-        # Initialiser l'affichage
-        self.update_displays()
+        # Chaque onglet est calculé en arrière-plan à sa première ouverture
+        self.tab_handlers = {
+            "Progression": (self.compute_progressions, self.update_progression_displays),
+            "Dénivelés": (self.compute_elevations, self.update_elevation_displays),
+            "Vitesses": (self.compute_speeds, self.update_speed_displays),
+            "Sections": (self.compute_sections, self.update_section_selector),
+            "Section": (self.compute_section_display, self.show_section_display)  # Section choisie
+        }
+        self.show_current_tab()
+        self.window.after(UI_TICK_MS, self.drain_tab_results)
 
     def get_unique_races(self):
         races = set()
         races.add("Toutes les courses")
-        for bib in self.bibs:
-            if str(bib) in self.scraper.all_data:
-                race_name = self.scraper.all_data[str(bib)]['infos']['race_name']
-                races.add(race_name)
+        for bib, record in self.get_runners("Toutes les courses"):
+            races.add(record.race_name)
         return sorted(list(races))
 
+    def get_runners(self, race):
+        """Coureurs analysés (dossard, données) pour la course demandée"""
+        return self.scraper.get_runner_records(self.bibs, race)
+
+    def get_matrix(self, race):
+        """
+        Matrice des coureurs de la course, reconstruite seulement si ses données ont changé.
+        Elle est gardée par le scraper : les fenêtres TOP d'une même sélection la partagent.
+        """
+        key = (self.bibs_key, race)
+        version = self.scraper.race_version(race)
+        with self.scraper.matrix_lock:
+            matrix = self.scraper.matrix_cache.get(key, version)
+            if matrix is None:
+                matrix = RaceMatrix(self.get_runners(race))
+                self.scraper.matrix_cache.put(key, version, matrix)
+        return matrix
+
+    def get_ranking(self, race, analysis, compute, section=None):
+        """Classement mémorisé par (sélection, course, analyse, section) et version des données"""
+        key = (self.bibs_key, race, analysis, section)
+        version = self.scraper.race_version(race)
+        result = self.scraper.top_cache.get(key, version)
+        if result is None:
+            result = compute(self.get_matrix(race))
+            self.scraper.top_cache.put(key, version, result)
+        return result
+
     def create_progression_subtabs(self):
         self.progress_tabs = ctk.CTkTabview(self.tab_progress)
         self.progress_tabs.pack(fill=tk.BOTH, expand=True)
@@ -1241,77 +4427,116 @@ class TopAnalysisWindow:
         self.section_results_scroll.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
     def on_race_selected(self, selection):
-        # Mettre à jour les sections disponibles
-        self.update_section_selector(selection)
-        # Mettre à jour tous les affichages
-        self.update_displays()
+        # Annuler les calculs en cours et recalculer l'onglet affiché
+        self.generation += 1
+        self.computed_tabs.clear()
+        self.clear_all_displays()
+        self.show_current_tab()
 
     def on_section_selected(self, selection):
         # Mettre à jour l'affichage des performances de la section
         self.update_section_display()
 
-    def update_section_selector(self, race):
-        """Mettre à jour la liste des sections avec les données associées"""
-        self.sections_info = {}  # Réinitialiser les infos de section
-        for bib in self.bibs:
-            if str(bib) in self.scraper.all_data:
-                data = self.scraper.all_data[str(bib)]
-                if race == "Toutes les courses" or data['infos']['race_name'] == race:
-                    checkpoints = data['checkpoints']
-                    for i in range(len(checkpoints) - 1):
-                        section_name = f"{checkpoints[i]['point']} → {checkpoints[i + 1]['point']}"
-                        if section_name not in self.sections_info:
-                            self.sections_info[section_name] = {
-                                'name': section_name,
-                                'distance': checkpoints[i + 1]['kilometer'] - checkpoints[i]['kilometer'],
-                                'elevation_gain': checkpoints[i + 1]['elevation_gain'],
-                                'elevation_loss': checkpoints[i + 1]['elevation_loss']
-                            }
+    def show_current_tab(self):
+        """Lance en arrière-plan le calcul de l'onglet affiché, s'il n'est pas déjà fait pour cette course"""
+        tab = self.tabview.get()
+        race = self.race_selector.get()
+        if tab not in self.tab_handlers or self.computed_tabs.get(tab) == race:
+            return
+        self.computed_tabs[tab] = race
+        self.status_label.configure(text=f"Calcul de l'onglet {tab}...")
 
-        # Mettre à jour le ComboBox avec les noms des sections
-        section_names = sorted(list(self.sections_info.keys()))
-        self.section_selector.configure(values=section_names)
-        if section_names:
-            self.section_selector.set(section_names[0])
+        thread = threading.Thread(target=self.compute_tab, args=(tab, race, self.generation))
+        thread.daemon = True
+        thread.start()
 
-    def update_displays(self):
-        """Mettre à jour tous les affichages en fonction de la course sélectionnée"""
-        self.clear_all_displays()
-        selected_race = self.race_selector.get()
+    def cancelled(self, token):
+        return token != self.generation
+
+    def compute_tab(self, tab, race, token):
+        """Calcule les classements d'un onglet (thread de travail)"""
+        compute, render = self.tab_handlers[tab]
+        try:
+            results = compute(race, token)
+        except Exception as e:
+            print(f"Erreur lors du calcul de l'onglet {tab}: {e}")
+            traceback.print_exc()
+            results = None
+        if not self.cancelled(token):
+            self.tab_results.put((token, tab, results))
+
+    def drain_tab_results(self):
+        """Affiche sur le thread Tk les onglets calculés en arrière-plan"""
+        try:
+            while True:
+                token, tab, results = self.tab_results.get_nowait()
+                if self.cancelled(token):
+                    continue  # Course changée entre-temps
+                if results is None:
+                    self.computed_tabs.pop(tab, None)
+                    self.status_label.configure(text=f"Erreur lors du calcul de l'onglet {tab}")
+                    continue
+                self.tab_handlers[tab][1](results)
+                self.status_label.configure(text="")
+        except queue.Empty:
+            pass
+        try:
+            self.window.after(UI_TICK_MS, self.drain_tab_results)
+        except tk.TclError:
+            pass  # Fenêtre fermée
+
+    def compute_progressions(self, race, token):
+        global_progressions = self.get_ranking(race, 'progressions', RaceMatrix.progressions)
+        if self.cancelled(token):
+            return None
+        section_progressions = self.get_ranking(race, 'section_progressions', RaceMatrix.section_progressions)
+        return global_progressions, section_progressions
 
-        # Mettre à jour les progressions
-        self.update_progression_displays(selected_race)
+    def compute_elevations(self, race, token):
+        climbers = self.get_ranking(race, 'climbers', RaceMatrix.climbers)
+        if self.cancelled(token):
+            return None
+        return climbers, self.get_ranking(race, 'descenders', RaceMatrix.descenders)
 
-        # Mettre à jour les dénivelés
-        self.update_elevation_displays(selected_race)
+    def compute_speeds(self, race, token):
+        speeds, efforts = self.get_ranking(race, 'average_speeds', RaceMatrix.average_speeds)
+        if self.cancelled(token):
+            return None
+        return speeds, efforts, self.get_ranking(race, 'section_speeds', RaceMatrix.section_speeds)
+
+    def compute_sections(self, race, token):
+        """Sections de la course, avec les classements de la première section déjà calculés"""
+        sections_info = self.get_ranking(race, 'sections', RaceMatrix.sections_info)
+        section_names = sorted(sections_info)
+        if section_names and not self.cancelled(token):
+            self.get_section_performances(race, section_names[0], sections_info[section_names[0]])
+        return sections_info, section_names
+
+    def get_section_performances(self, race, section, section_info):
+        return self.get_ranking(
+            race,
+            'section_performances',
+            lambda matrix: matrix.section_performances(section, section_info),
+            section=section
+        )
 
-        # Mettre à jour les vitesses
-        self.update_speed_displays(selected_race)
+    def update_section_selector(self, results):
+        """Mettre à jour la liste des sections avec les données associées"""
+        self.sections_info, section_names = results
 
-        # Mettre à jour l'affichage des sections
+        # Mettre à jour le ComboBox avec les noms des sections
+        self.section_selector.configure(values=section_names)
+        if section_names:
+            self.section_selector.set(section_names[0])
         self.update_section_display()
 
     def clear_all_displays(self):
-        """Effacer tous les affichages existants"""
-        for widget in self.progress_global_scroll.winfo_children():
-            widget.destroy()
-        for widget in self.progress_sections_scroll.winfo_children():
-            widget.destroy()
-        for widget in self.climbers_scroll.winfo_children():
-            widget.destroy()
-        for widget in self.descenders_scroll.winfo_children():
-            widget.destroy()
-        for widget in self.speed_avg_scroll.winfo_children():
-            widget.destroy()
-        for widget in self.speed_effort_scroll.winfo_children():
-            widget.destroy()
-        for widget in self.speed_sections_scroll.winfo_children():
-            widget.destroy()
-        for widget in self.section_results_scroll.winfo_children():
-            widget.destroy()
+        """Masquer tous les panneaux (ils sont remplis à nouveau, sans être recréés, au prochain affichage)"""
+        for panel in self.panels.values():
+            self.set_panel_visible(panel, False)
 
-    def create_table(self, parent, columns, headers, data, height=10, tooltips=None):
-        """Créer un tableau personnalisé avec style uniforme et infobulles"""
+    def apply_table_style(self):
+        """Style des tableaux d'analyse, appliqué une seule fois"""
         style = ttk.Style()
         style.configure(
             "Custom.Treeview",
@@ -1326,6 +4551,8 @@ class TopAnalysisWindow:
             foreground="white"
         )
 
+    def create_table(self, parent, columns, headers, data, height=10, tooltips=None):
+        """Créer un tableau personnalisé avec style uniforme et infobulles"""
         tree = ttk.Treeview(
             parent,
             columns=columns,
@@ -1359,14 +4586,72 @@ class TopAnalysisWindow:
 
         return tree
 
-    def create_section_info_card(self, parent, section_info):
+    def add_panel(self, key, parent, frame, pack_options, **widgets):
+        """Enregistre un panneau persistant ; il reste masqué jusqu'à son premier affichage"""
+        panel = {'frame': frame, 'parent': parent, 'pack': pack_options, 'visible': False, **widgets}
+        self.panels[key] = panel
+        self.panel_order.setdefault(str(parent), []).append(panel)
+        return panel
+
+    def set_panel_visible(self, panel, visible):
+        """Affiche ou masque un panneau en conservant l'ordre des panneaux de son cadre"""
+        if panel['visible'] == visible:
+            return
+        panel['visible'] = visible
+        if not visible:
+            panel['frame'].pack_forget()
+            return
+
+        siblings = self.panel_order[str(panel['parent'])]
+        following = [other for other in siblings[siblings.index(panel) + 1:] if other['visible']]
+        options = dict(panel['pack'])
+        if following:
+            options['before'] = following[0]['frame']
+        panel['frame'].pack(**options)
+
+    def hide_panels(self, parent):
+        for panel in self.panel_order.get(str(parent), []):
+            self.set_panel_visible(panel, False)
+
+    def show_table(self, key, parent, title, columns, headers, data, tooltips=None, boxed=False):
+        """Affiche un panneau titre + tableau, créé au premier appel puis mis à jour en place"""
+        panel = self.panels.get(key)
+        if panel is None:
+            if boxed:
+                frame = ctk.CTkFrame(parent)
+                pack_options = {'fill': tk.X, 'padx': 5, 'pady': 10}
+            else:
+                frame = ctk.CTkFrame(parent, fg_color="transparent")
+                pack_options = {'fill': tk.X}
+            label = ctk.CTkLabel(frame, text="", font=("Arial", 14 if boxed else 16, "bold"))
+            label.pack(pady=5 if boxed else 10)
+            tree = self.create_table(frame, columns, headers, [], tooltips=tooltips)
+            tree.pack(fill=tk.X, padx=5, pady=5)
+            panel = self.add_panel(key, parent, frame, pack_options, label=label, tree=tree)
+
+        tree = panel['tree']
+        tree.delete(*tree.get_children())
+        for row in data:
+            tree.insert("", "end", values=row)
+        panel['label'].configure(text=title)
+        self.set_panel_visible(panel, True)
+
+    def show_section_info_card(self, parent, section_info):
+        """Afficher la carte d'information de la section (créée une seule fois)"""
+        panel = self.panels.get('section_card') or self.create_section_info_card(parent)
+        panel['title'].configure(text=section_info['name'])
+        panel['distance'].configure(text=f"Distance: {section_info['distance']:.1f}km")
+        panel['dplus'].configure(text=f"D+: {section_info['elevation_gain']}m")
+        panel['dminus'].configure(text=f"D-: {section_info['elevation_loss']}m")
+        self.set_panel_visible(panel, True)
+
+    def create_section_info_card(self, parent):
         """Créer une carte d'information pour une section avec infobulles"""
         frame = ctk.CTkFrame(parent)
-        frame.pack(fill=tk.X, padx=5, pady=5)
 
         title = ctk.CTkLabel(
             frame,
-            text=section_info['name'],
+            text="",
             font=("Arial", 16, "bold")
         )
         title.pack(pady=5)
@@ -1380,7 +4665,7 @@ class TopAnalysisWindow:
         distance_frame.pack(side=tk.LEFT, padx=10)
         distance_label = ctk.CTkLabel(
             distance_frame,
-            text=f"Distance: {section_info['distance']:.1f}km"
+            text=""
         )
         distance_label.pack(side=tk.LEFT)
 
@@ -1401,7 +4686,7 @@ class TopAnalysisWindow:
         dplus_frame.pack(side=tk.LEFT, padx=10)
         dplus_label = ctk.CTkLabel(
             dplus_frame,
-            text=f"D+: {section_info['elevation_gain']}m"
+            text=""
         )
         dplus_label.pack(side=tk.LEFT)
 
@@ -1423,7 +4708,7 @@ class TopAnalysisWindow:
         dminus_frame.pack(side=tk.LEFT, padx=10)
         dminus_label = ctk.CTkLabel(
             dminus_frame,
-            text=f"D-: {section_info['elevation_loss']}m"
+            text=""
         )
         dminus_label.pack(side=tk.LEFT)
 
@@ -1440,45 +4725,16 @@ class TopAnalysisWindow:
         )
         dminus_info.pack(side=tk.LEFT, padx=2)
 
-        return frame
+        return self.add_panel(
+            'section_card', parent, frame, {'fill': tk.X, 'padx': 5, 'pady': 5},
+            title=title, distance=distance_label, dplus=dplus_label, dminus=dminus_label
+        )
 
 
-    def update_progression_displays(self, selected_race):
+    def update_progression_displays(self, results):
         """Mettre à jour les affichages de progression"""
         # Progression globale
-        global_progressions = []
-        for bib in self.bibs:
-            if str(bib) in self.scraper.all_data:
-                data = self.scraper.all_data[str(bib)]
-                if selected_race == "Toutes les courses" or data['infos']['race_name'] == selected_race:
-                    checkpoints = data['checkpoints']
-                    if len(checkpoints) >= 2:
-                        first_rank = None
-                        last_rank = None
-
-                        for cp in checkpoints:
-                            if cp['rank'] is not None:
-                                try:
-                                    rank = int(cp['rank'])
-                                    if first_rank is None:
-                                        first_rank = rank
-                                    last_rank = rank
-                                except ValueError:
-                                    continue
-
-                        if first_rank is not None and last_rank is not None:
-                            progression = first_rank - last_rank
-                            global_progressions.append({
-                                'progression': progression,
-                                'bib': bib,
-                                'name': data['infos']['name'],
-                                'race': data['infos']['race_name'],
-                                'start_pos': first_rank,
-                                'end_pos': last_rank
-                            })
-
-        # Trier et afficher les meilleures progressions
-        global_progressions.sort(key=lambda x: x['progression'], reverse=True)
+        global_progressions, section_progressions = results
 
         columns = ["rank", "bib", "name", "race", "start_pos", "end_pos", "progression"]
         headers = {
@@ -1519,14 +4775,12 @@ class TopAnalysisWindow:
         }
 
         if data:
-            ctk.CTkLabel(
+            self.show_table(
+                'progress_global',
                 self.progress_global_scroll,
-                text="Top 20 des meilleures progressions (Clic droit sur les en-têtes pour plus d'informations)",
-                font=("Arial", 16, "bold")
-            ).pack(pady=10)
-
-            tree = self.create_table(self.progress_global_scroll, columns, headers, data, tooltips=tooltips)
-            tree.pack(fill=tk.X, padx=5, pady=5)
+                "Top 20 des meilleures progressions (Clic droit sur les en-têtes pour plus d'informations)",
+                columns, headers, data, tooltips=tooltips
+            )
 
         # Ajouter les tooltips pour la progression entre points
         section_tooltips = {
@@ -1537,42 +4791,7 @@ class TopAnalysisWindow:
 
 
         # Progression entre points
-        section_progressions = []
-        for bib in self.bibs:
-            if str(bib) in self.scraper.all_data:
-                data = self.scraper.all_data[str(bib)]
-                if selected_race == "Toutes les courses" or data['infos']['race_name'] == selected_race:
-                    checkpoints = data['checkpoints']
-
-                    for i in range(len(checkpoints) - 1):
-                        if checkpoints[i]['rank'] and checkpoints[i + 1]['rank']:
-                            try:
-                                rank1 = int(checkpoints[i]['rank'])
-                                rank2 = int(checkpoints[i + 1]['rank'])
-                                progression = rank1 - rank2
-                                if progression > 0:
-                                    section_progressions.append({
-                                        'progression': progression,
-                                        'bib': bib,
-                                        'name': data['infos']['name'],
-                                        'race': data['infos']['race_name'],
-                                        'from_point': checkpoints[i]['point'],
-                                        'to_point': checkpoints[i + 1]['point'],
-                                        'start_rank': rank1,
-                                        'end_rank': rank2
-                                    })
-                            except ValueError:
-                                continue
-
-        section_progressions.sort(key=lambda x: x['progression'], reverse=True)
-
         if section_progressions:
-            ctk.CTkLabel(
-                self.progress_sections_scroll,
-                text="Top 20 des meilleures progressions entre points",
-                font=("Arial", 16, "bold")
-            ).pack(pady=10)
-
             columns = ["rank", "bib", "name", "race", "section", "progression", "ranks"]
             headers = {
                 "rank": "Position",
@@ -1604,53 +4823,17 @@ class TopAnalysisWindow:
                 for i, prog in enumerate(section_progressions[:20])
             ]
 
-            tree = self.create_table(self.progress_sections_scroll, columns, headers, data)
-            tree.pack(fill=tk.X, padx=5, pady=5)
+            self.show_table(
+                'progress_sections',
+                self.progress_sections_scroll,
+                "Top 20 des meilleures progressions entre points",
+                columns, headers, data
+            )
 
-    def update_elevation_displays(self, selected_race):
+    def update_elevation_displays(self, results):
         """Mettre à jour les affichages de dénivelé avec tooltips et indicateurs de tendance"""
-        # Calcul pour les grimpeurs
-        climbers = []
-        for bib in self.bibs:
-            if str(bib) in self.scraper.all_data:
-                data = self.scraper.all_data[str(bib)]
-                if selected_race == "Toutes les courses" or data['infos']['race_name'] == selected_race:
-                    checkpoints = data['checkpoints']
-                    total_elevation_time = 0
-                    total_elevation_gain = 0
-                    total_distance = 0
-
-                    for i in range(len(checkpoints) - 1):
-                        if checkpoints[i]['elevation_gain'] > 100:  # Sections significatives
-                            try:
-                                time1 = datetime.strptime(checkpoints[i]['race_time'], "%H:%M:%S")
-                                time2 = datetime.strptime(checkpoints[i + 1]['race_time'], "%H:%M:%S")
-                                segment_time = (time2 - time1).total_seconds() / 3600
-                                distance = checkpoints[i + 1]['kilometer'] - checkpoints[i]['kilometer']
-
-                                if segment_time > 0:
-                                    total_elevation_time += segment_time
-                                    total_elevation_gain += checkpoints[i]['elevation_gain']
-                                    total_distance += distance
-                            except:
-                                continue
-
-                    if total_elevation_time > 0:
-                        climbing_speed = total_elevation_gain / total_elevation_time
-                        # Calculer le ratio dénivelé/distance pour évaluer la difficulté
-                        elevation_ratio = total_elevation_gain / (total_distance * 1000) if total_distance > 0 else 0
-                        climbers.append({
-                            'speed': climbing_speed,
-                            'bib': bib,
-                            'name': data['infos']['name'],
-                            'race': data['infos']['race_name'],
-                            'elevation_gain': total_elevation_gain,
-                            'time': total_elevation_time,
-                            'distance': total_distance,
-                            'elevation_ratio': elevation_ratio
-                        })
-
-        climbers.sort(key=lambda x: x['speed'], reverse=True)
+        # Grimpeurs et descendeurs
+        climbers, descenders = results
 
         # Tooltips pour les grimpeurs
         climber_tooltips = {
@@ -1662,12 +4845,6 @@ class TopAnalysisWindow:
         }
 
         if climbers:
-            ctk.CTkLabel(
-                self.climbers_scroll,
-                text="Top 20 des meilleurs grimpeurs (Clic droit sur les en-têtes pour plus d'informations)",
-                font=("Arial", 16, "bold")
-            ).pack(pady=10)
-
             columns = ["rank", "bib", "name", "race", "elevation", "time", "speed", "ratio", "tendency"]
             headers = {
                 "rank": "Position",
@@ -1713,51 +4890,14 @@ class TopAnalysisWindow:
                 for i, climb in enumerate(climbers[:20])
             ]
 
-            tree = self.create_table(self.climbers_scroll, columns, headers, data, tooltips=climber_tooltips)
-            tree.pack(fill=tk.X, padx=5, pady=5)
+            self.show_table(
+                'climbers',
+                self.climbers_scroll,
+                "Top 20 des meilleurs grimpeurs (Clic droit sur les en-têtes pour plus d'informations)",
+                columns, headers, data, tooltips=climber_tooltips
+            )
 
         # Descente (avec les mêmes améliorations)
-        descenders = []
-        for bib in self.bibs:
-            if str(bib) in self.scraper.all_data:
-                data = self.scraper.all_data[str(bib)]
-                if selected_race == "Toutes les courses" or data['infos']['race_name'] == selected_race:
-                    checkpoints = data['checkpoints']
-                    total_descent_time = 0
-                    total_elevation_loss = 0
-                    total_distance = 0
-
-                    for i in range(len(checkpoints) - 1):
-                        if checkpoints[i]['elevation_loss'] > 100:
-                            try:
-                                time1 = datetime.strptime(checkpoints[i]['race_time'], "%H:%M:%S")
-                                time2 = datetime.strptime(checkpoints[i + 1]['race_time'], "%H:%M:%S")
-                                segment_time = (time2 - time1).total_seconds() / 3600
-                                distance = checkpoints[i + 1]['kilometer'] - checkpoints[i]['kilometer']
-
-                                if segment_time > 0:
-                                    total_descent_time += segment_time
-                                    total_elevation_loss += abs(checkpoints[i]['elevation_loss'])
-                                    total_distance += distance
-                            except:
-                                continue
-
-                    if total_descent_time > 0:
-                        descending_speed = total_elevation_loss / total_descent_time
-                        elevation_ratio = total_elevation_loss / (total_distance * 1000) if total_distance > 0 else 0
-                        descenders.append({
-                            'speed': descending_speed,
-                            'bib': bib,
-                            'name': data['infos']['name'],
-                            'race': data['infos']['race_name'],
-                            'elevation_loss': total_elevation_loss,
-                            'time': total_descent_time,
-                            'distance': total_distance,
-                            'elevation_ratio': elevation_ratio
-                        })
-
-        descenders.sort(key=lambda x: x['speed'], reverse=True)
-
         # Tooltips pour les descendeurs
         descender_tooltips = {
             "elevation": "Dénivelé négatif total cumulé sur les sections de descente significative (>100m D-)",
@@ -1768,12 +4908,6 @@ class TopAnalysisWindow:
         }
 
         if descenders:
-            ctk.CTkLabel(
-                self.descenders_scroll,
-                text="Top 20 des meilleurs descendeurs (Clic droit sur les en-têtes pour plus d'informations)",
-                font=("Arial", 16, "bold")
-            ).pack(pady=10)
-
             def get_descent_indicator(ratio):
                 if ratio > 0.15:  # >15%
                     return "↘️↘️↘️"  # Très raide
@@ -1797,75 +4931,18 @@ class TopAnalysisWindow:
                 for i, desc in enumerate(descenders[:20])
             ]
 
-            tree = self.create_table(self.descenders_scroll, columns, headers, data, tooltips=descender_tooltips)
-            tree.pack(fill=tk.X, padx=5, pady=5)
+            self.show_table(
+                'descenders',
+                self.descenders_scroll,
+                "Top 20 des meilleurs descendeurs (Clic droit sur les en-têtes pour plus d'informations)",
+                columns, headers, data, tooltips=descender_tooltips
+            )
 
-    def update_speed_displays(self, selected_race):
+    def update_speed_displays(self, results):
         """Mettre à jour les affichages de vitesse"""
-        speeds = []
-        efforts = []
-        section_speeds = []
-
-        for bib in self.bibs:
-            if str(bib) in self.scraper.all_data:
-                data = self.scraper.all_data[str(bib)]
-                if selected_race == "Toutes les courses" or data['infos']['race_name'] == selected_race:
-                    checkpoints = data['checkpoints']
-
-                    # Calcul des vitesses moyennes
-                    avg_speed = 0
-                    avg_effort = 0
-                    count = 0
-
-                    for cp in checkpoints:
-                        try:
-                            speed = float(cp['speed'].replace('km/h', '').strip())
-                            effort = float(cp['effort_speed'].replace('km/h', '').strip())
-                            avg_speed += speed
-                            avg_effort += effort
-                            count += 1
-                        except:
-                            continue
-
-                    if count > 0:
-                        speeds.append({
-                            'speed': avg_speed / count,
-                            'bib': bib,
-                            'name': data['infos']['name'],
-                            'race': data['infos']['race_name']
-                        })
-
-                        efforts.append({
-                            'effort': avg_effort / count,
-                            'bib': bib,
-                            'name': data['infos']['name'],
-                            'race': data['infos']['race_name']
-                        })
-
-                    # Calcul des vitesses par section
-                    for i in range(len(checkpoints) - 1):
-                        try:
-                            time1 = datetime.strptime(checkpoints[i]['race_time'], "%H:%M:%S")
-                            time2 = datetime.strptime(checkpoints[i + 1]['race_time'], "%H:%M:%S")
-                            segment_time = (time2 - time1).total_seconds() / 3600
-                            distance = checkpoints[i + 1]['kilometer'] - checkpoints[i]['kilometer']
-
-                            if segment_time > 0:
-                                section_speed = distance / segment_time
-                                section_speeds.append({
-                                    'speed': section_speed,
-                                    'bib': bib,
-                                    'name': data['infos']['name'],
-                                    'race': data['infos']['race_name'],
-                                    'from_point': checkpoints[i]['point'],
-                                    'to_point': checkpoints[i + 1]['point'],
-                                    'distance': distance
-                                })
-                        except:
-                            continue
+        speeds, efforts, section_speeds = results
 
         # Afficher les vitesses moyennes
-        speeds.sort(key=lambda x: x['speed'], reverse=True)
         self.display_speed_table(
             self.speed_avg_scroll,
             speeds[:20],
@@ -1874,7 +4951,6 @@ class TopAnalysisWindow:
         )
 
         # Afficher les vitesses effort
-        efforts.sort(key=lambda x: x['effort'], reverse=True)
         self.display_speed_table(
             self.speed_effort_scroll,
             efforts[:20],
@@ -1883,7 +4959,6 @@ class TopAnalysisWindow:
         )
 
         # Afficher les vitesses par section
-        section_speeds.sort(key=lambda x: x['speed'], reverse=True)
         self.display_section_speed_table(
             self.speed_sections_scroll,
             section_speeds[:20]
@@ -1901,12 +4976,6 @@ class TopAnalysisWindow:
             }[speed_type]
         }
 
-        ctk.CTkLabel(
-            parent,
-            text=title + " (Clic droit sur les en-têtes pour plus d'informations)",
-            font=("Arial", 16, "bold")
-        ).pack(pady=10)
-
         columns = ["rank", "bib", "name", "race", "speed"]
         headers = {
             "rank": "Position",
@@ -1935,8 +5004,12 @@ class TopAnalysisWindow:
             for i, item in enumerate(data)
         ]
 
-        tree = self.create_table(parent, columns, headers, table_data, tooltips=tooltips)
-        tree.pack(fill=tk.X, padx=5, pady=5)
+        self.show_table(
+            f'speed_{speed_type}',
+            parent,
+            title + " (Clic droit sur les en-têtes pour plus d'informations)",
+            columns, headers, table_data, tooltips=tooltips
+        )
 
     def display_section_speed_table(self, parent, data):
         """Afficher un tableau de vitesses par section avec infobulles"""
@@ -1949,12 +5022,6 @@ class TopAnalysisWindow:
             "section": "Points de début et de fin de la section."
         }
 
-        ctk.CTkLabel(
-            parent,
-            text="Top 20 des meilleures vitesses par section (Clic droit sur les en-têtes pour plus d'informations)",
-            font=("Arial", 16, "bold")
-        ).pack(pady=10)
-
         columns = ["rank", "bib", "name", "race", "section", "distance", "speed"]
         headers = {
             "rank": "Position",
@@ -1986,161 +5053,83 @@ class TopAnalysisWindow:
             for i, item in enumerate(data)
         ]
 
-        tree = self.create_table(parent, columns, headers, table_data, tooltips=tooltips)
-        tree.pack(fill=tk.X, padx=5, pady=5)
-
-    def convert_time_to_seconds(self, time_str):
-        """Convertit un temps au format HH:MM:SS en secondes"""
-        try:
-            hours, minutes, seconds = map(int, time_str.split(':'))
-            return hours * 3600 + minutes * 60 + seconds
-        except Exception as e:
-            print(f"Erreur lors de la conversion du temps {time_str}: {e}")
-            return None
+        self.show_table(
+            'section_speeds',
+            parent,
+            "Top 20 des meilleures vitesses par section (Clic droit sur les en-têtes pour plus d'informations)",
+            columns, headers, table_data, tooltips=tooltips
+        )
 
     def update_section_display(self):
-        """Mettre à jour l'affichage des performances par section"""
-        # Nettoyer l'affichage existant
-        for widget in self.section_results_scroll.winfo_children():
-            widget.destroy()
-
-        selected_race = self.race_selector.get()
+        """
+        Lance en arrière-plan le calcul des performances de la section choisie : la matrice
+        peut être à reconstruire ou en cours de calcul pour un autre onglet
+        """
         selected_section = self.section_selector.get()
 
         if not selected_section or selected_section not in self.sections_info:
+            self.hide_panels(self.section_results_scroll)
             return
 
-        # Utiliser les informations de section stockées
-        section_info = self.sections_info[selected_section]
-
-        # Collecter les performances pour la section sélectionnée
-        section_performances = []
-
-        for bib in self.bibs:
-            if str(bib) in self.scraper.all_data:
-                data = self.scraper.all_data[str(bib)]
-                if selected_race == "Toutes les courses" or data['infos']['race_name'] == selected_race:
-                    checkpoints = data['checkpoints']
-
-                    for i in range(len(checkpoints) - 1):
-                        section = f"{checkpoints[i]['point']} → {checkpoints[i + 1]['point']}"
-                        if section == selected_section:
-                            try:
-                                # Calculer le temps de la section en gardant le format HH:MM:SS
-                                section_time = self.time_diff(
-                                    checkpoints[i + 1]['race_time'],
-                                    checkpoints[i]['race_time']
-                                )
-
-                                if not section_time:
-                                    continue
-
-                                # Pour le calcul des vitesses, on a besoin du temps en heures
-                                h, m, s = map(int, section_time.split(':'))
-                                hours = h + m / 60 + s / 3600
-
-                                # Calculer la vitesse si le temps est valide
-                                if hours > 0:
-                                    speed = section_info['distance'] / hours
-
-                                    # Calculer la vitesse effort
-                                    effort_speed = (
-                                                           section_info['distance'] +
-                                                           (section_info['elevation_gain'] / 1000 * 10) +
-                                                           (section_info['elevation_loss'] / 1000 * 2)
-                                                   ) / hours
-
-                                    # Calculer la progression de classement
-                                    rank1 = int(checkpoints[i]['rank']) if checkpoints[i]['rank'] else 0
-                                    rank2 = int(checkpoints[i + 1]['rank']) if checkpoints[i + 1]['rank'] else 0
-                                    progression = rank1 - rank2 if rank1 and rank2 else 0
-
-                                    # Calculer la tendance (montée/descente/plat)
-                                    total_distance_m = section_info['distance'] * 1000
-                                    if total_distance_m > 0:
-                                        elevation_ratio = (
-                                                (section_info['elevation_gain'] - section_info['elevation_loss'])
-                                                / total_distance_m
-                                        )
-                                        if elevation_ratio > 0.05:
-                                            tendency = "↗️"
-                                        elif elevation_ratio < -0.05:
-                                            tendency = "↘️"
-                                        else:
-                                            tendency = "➡️"
-                                    else:
-                                        tendency = "➡️"
-
-                                    # Ajouter les performances calculées
-                                    section_performances.append({
-                                        'bib': bib,
-                                        'name': data['infos']['name'],
-                                        'race': data['infos']['race_name'],
-                                        'time': section_time,  # Format HH:MM:SS
-                                        'speed': speed,
-                                        'effort_speed': effort_speed,
-                                        'progression': progression,
-                                        'start_rank': rank1,
-                                        'end_rank': rank2,
-                                        'tendency': tendency
-                                    })
-
-                            except Exception as e:
-                                print(f"Erreur lors du calcul des performances: {e}")
-                                continue
-
-            # Tri des performances
-
-        def time_to_seconds(time_str):
-            """Convertit HH:MM:SS en secondes pour le tri"""
-            h, m, s = map(int, time_str.split(':'))
-            return h * 3600 + m * 60 + s
+        self.section_generation += 1
+        self.section_request = (self.section_generation, selected_section, self.sections_info[selected_section])
+        self.status_label.configure(text="Calcul de la section...")
+        thread = threading.Thread(target=self.compute_tab, args=("Section", self.race_selector.get(), self.generation))
+        thread.daemon = True
+        thread.start()
 
-            # Pour le tri par temps
+    def compute_section_display(self, race, token):
+        """Classements de la section demandée (thread de travail)"""
+        section_token, section, section_info = self.section_request
+        return section_token, section_info, self.get_section_performances(race, section, section_info)
 
-        section_performances.sort(key=lambda x: time_to_seconds(x['time']))
+    def show_section_display(self, results):
+        """Mettre à jour l'affichage des performances par section"""
+        section_token, section_info, section_performances = results
+        if section_token != self.section_generation:
+            return  # Une autre section a été choisie entre-temps
 
         if section_info:
-            # Créer la carte d'information de la section
-            self.create_section_info_card(self.section_results_scroll, section_info)
+            # Afficher la carte d'information de la section
+            self.show_section_info_card(self.section_results_scroll, section_info)
 
             # Créer les tableaux de performance si on a des données
             if section_performances:
                 # 1. Classement par temps
-                section_performances.sort(key=lambda x: x['time'])
                 self.create_section_performance_table(
                     self.section_results_scroll,
-                    section_performances[:20],
+                    section_performances['time'],
                     "Top 20 temps sur la section",
                     'time'
                 )
 
                 # 2. Classement par vitesse
-                section_performances.sort(key=lambda x: x['speed'], reverse=True)
                 self.create_section_performance_table(
                     self.section_results_scroll,
-                    section_performances[:20],
+                    section_performances['speed'],
                     "Top 20 vitesses sur la section",
                     'speed'
                 )
 
                 # 3. Classement par vitesse effort
-                section_performances.sort(key=lambda x: x['effort_speed'], reverse=True)
                 self.create_section_performance_table(
                     self.section_results_scroll,
-                    section_performances[:20],
+                    section_performances['effort'],
                     "Top 20 vitesses effort sur la section",
                     'effort'
                 )
 
                 # 4. Classement par progression
-                section_performances.sort(key=lambda x: x['progression'], reverse=True)
                 self.create_section_performance_table(
                     self.section_results_scroll,
-                    section_performances[:20],
+                    section_performances['progression'],
                     "Top 20 progressions sur la section",
                     'progression'
                 )
+            else:
+                for performance_type in ('time', 'speed', 'effort', 'progression'):
+                    if f'section_{performance_type}' in self.panels:
+                        self.set_panel_visible(self.panels[f'section_{performance_type}'], False)
 
     def calculate_effort_speed(self, distance, time_seconds, elevation_gain, elevation_loss):
         """
@@ -2176,9 +5165,6 @@ class TopAnalysisWindow:
         if not data:
             return
 
-        frame = ctk.CTkFrame(parent)
-        frame.pack(fill=tk.X, padx=5, pady=10)
-
         tooltips = {
             "performance": {
                 'time': (
@@ -2208,12 +5194,6 @@ class TopAnalysisWindow:
             "tendency": "Indication du profil de la section:\n↗️ Montée (>5%)\n➡️ Plat\n↘️ Descente (>5%)"
         }
 
-        ctk.CTkLabel(
-            frame,
-            text=title + " (Clic droit sur les en-têtes pour plus d'informations)",
-            font=("Arial", 14, "bold")
-        ).pack(pady=5)
-
         columns = ["rank", "bib", "name", "race", "performance", "tendency"]
         headers = {
             "rank": "Position",
@@ -2237,7 +5217,7 @@ class TopAnalysisWindow:
 
         def format_performance(item):
             if performance_type == 'time':
-                return item['time']  # Déjà au format HH:MM:SS
+                return format_duration(item['time'])
             elif performance_type == 'speed':
                 return f"{item['speed']:.1f} km/h"
             elif performance_type == 'effort':
@@ -2257,35 +5237,205 @@ class TopAnalysisWindow:
             for i, item in enumerate(data)
         ]
 
-        tree = self.create_table(frame, columns, headers, table_data, tooltips=tooltips)
-        tree.pack(fill=tk.X, padx=5, pady=5)
-
-    def time_diff(self, time2, time1):
-        """
-        Calcule la différence entre deux temps au format HH:MM:SS
-        Retourne le résultat au format HH:MM:SS
-        """
-        try:
-            # Extraire les heures, minutes, secondes
-            h1, m1, s1 = map(int, time1.split(':'))
-            h2, m2, s2 = map(int, time2.split(':'))
-
-            # Convertir en secondes pour le calcul
-            total_seconds = (h2 * 3600 + m2 * 60 + s2) - (h1 * 3600 + m1 * 60 + s1)
+        self.show_table(
+            f'section_{performance_type}',
+            parent,
+            title + " (Clic droit sur les en-têtes pour plus d'informations)",
+            columns, headers, table_data, tooltips=tooltips, boxed=True
+        )
 
-            # Reconvertir en HH:MM:SS
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-
-            return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-        except Exception as e:
-            print(f"Erreur lors du calcul de différence de temps: {e}")
-            return None
 
+def compute_top_tables(scraper, bibs, race="Toutes les courses", section=None, limit=20):
+    """Classements TOP d'une sélection de coureurs, mêmes calculs que la fenêtre TOP Analyses"""
+    matrix = RaceMatrix(scraper.get_runner_records(bibs, race))
+    speeds, efforts = matrix.average_speeds(limit)
+    tables = {
+        'progressions': matrix.progressions(limit),
+        'section_progressions': matrix.section_progressions(limit),
+        'climbers': matrix.climbers(limit),
+        'descenders': matrix.descenders(limit),
+        'average_speeds': speeds,
+        'effort_speeds': efforts,
+        'section_speeds': matrix.section_speeds(limit)
+    }
+    if section:
+        section_info = matrix.sections_info().get(section)
+        if section_info is None:
+            raise ValueError(f"Section inconnue : {section}")
+        for ranking, rows in matrix.section_performances(section, section_info, limit).items():
+            tables[f'section_{ranking}'] = rows
+    return tables
+
+
+def write_top_tables(tables, output, output_format):
+    """Écrit les classements en JSON (un objet par tableau) ou en CSV (une ligne par coureur classé)"""
+    if output_format == 'json':
+        json.dump(tables, output, ensure_ascii=False, indent=2, default=float)
+        output.write('\n')
+        return
+
+    fieldnames = ['table', 'position']
+    for rows in tables.values():
+        for row in rows:
+            fieldnames.extend(key for key in row if key not in fieldnames)
+    writer = csv.DictWriter(output, fieldnames=fieldnames, restval='')
+    writer.writeheader()
+    for table, rows in tables.items():
+        for position, row in enumerate(rows, start=1):
+            writer.writerow({'table': table, 'position': position, **row})
+
+
+def run_cli_scan(args):
+    """Scanne une liste de dossards sans interface graphique"""
+    scraper = RaceDataScraper()
+    scraper.browser_profile = args.profile
+    scraper.fetch_backend = args.backend
+    pool = ScanPool(scraper, workers=args.workers, max_rate=args.rate)
+    counts = {'scanned': 0, 'cached': 0, 'missing': 0}
+    total = 0
+
+    def on_result(index, bib, data, from_cache):
+        counts['cached' if from_cache else 'scanned'] += 1
+        if not data:
+            counts['missing'] += 1
+        print(f"[{index + 1}/{total}] Dossard {bib} : {'cache' if from_cache else 'scanné'}"
+              f"{'' if data else ' (aucune donnée)'}")
+
+    bibs = args.bibs or []
+    if args.resume:
+        requested = set(bibs)
+        bibs = bibs + [bib for bib in pool.jobs.incomplete() if bib not in requested]
+    total = len(bibs)
+
+    try:
+        cache_counts = pool.run(bibs, on_result)
+        drivers = pool.describe_drivers()  # Avant la fermeture des navigateurs
+    finally:
+        pool.close()
+        scraper.close()
+    print(f"Scan terminé : {counts['scanned']} scannés (dont {cache_counts['stale']} relevés périmés), "
+          f"{counts['cached']} depuis le cache, {counts['missing']} sans données")
+    if cache_counts['failed']:
+        print(f"{cache_counts['failed']} dossards en échec après {SCAN_MAX_ATTEMPTS} tentatives "
+              f"(voir {SCAN_JOBS_FILE}, reprise avec --resume)")
+    if drivers:
+        print(drivers)
+    if scraper.describe_page_metrics():
+        print(f"Pages chargées par navigateur : {scraper.describe_page_metrics()}")
+    stats = pool.limiter.stats()
+    if stats['latency'] is not None:
+        print(f"Débit final {stats['rate'] or 0:.2f} page/s, latence moyenne {stats['latency']:.2f}s, "
+              f"erreurs {stats['error_rate']:.0%}")
+    return 1 if cache_counts['failed'] else 0
+
+
+def run_cli_crawl(args):
+    """Parcourt une plage de dossards sans interface graphique, avec reprise"""
+    scraper = RaceDataScraper()
+    scraper.browser_profile = args.profile
+    scraper.fetch_backend = args.backend
+    pool = ScanPool(scraper, workers=args.workers, max_rate=args.rate)
+    crawl = BibCrawl(args.journal)
+    counts = {'found': 0, 'empty': 0, None: 0}
+    pending = len(crawl.pending(args.bibs))
+
+    def on_result(bib, data, status):
+        counts[status] += 1
+        label = {'found': "coureur", 'empty': "vide", None: "erreur"}[status]
+        print(f"[{sum(counts.values())}/{pending}] Dossard {bib} : {label}")
+
+    try:
+        crawl.run(pool, args.bibs, on_result)
+    finally:
+        crawl.close()
+        pool.close()
+        scraper.close()
+    print(f"Parcours terminé : {counts['found']} coureurs, {counts['empty']} vides, {counts[None]} erreurs "
+          f"({len(args.bibs) - pending} dossards déjà traités lors d'un parcours précédent)")
+    if scraper.describe_page_metrics():
+        print(f"Pages chargées par navigateur : {scraper.describe_page_metrics()}")
+    return 0 if not counts[None] else 1
+
+
+def run_cli_top(args):
+    """Calcule et écrit les classements TOP depuis les données en cache"""
+    # Les messages de chargement vont sur la sortie d'erreur : la sortie standard reste du JSON/CSV valide
+    with contextlib.redirect_stdout(sys.stderr):
+        scraper = RaceDataScraper(offline=True)
+        scraper.load_data()
+        try:
+            bibs = args.bibs if args.bibs is not None else list(scraper.all_data.keys())
+            tables = compute_top_tables(scraper, bibs, args.race, args.section, args.limit)
+        except ValueError as e:
+            print(f"Erreur : {e}")
+            return 1
+        finally:
+            scraper.close()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            write_top_tables(tables, f, args.format)
+    else:
+        write_top_tables(tables, sys.stdout, args.format)
+    return 0
+
+
+def bib_list_argument(text):
+    try:
+        return parse_bib_list(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"liste de dossards invalide (au plus {MAX_BIB_COUNT} dossards) : {text}")
+
+
+def main(argv=None):
+    """Sans argument : interface graphique. Avec 'scan' ou 'top' : mode ligne de commande."""
+    parser = argparse.ArgumentParser(description="Suivi Grand Raid")
+    commands = parser.add_subparsers(dest='command')
+
+    scan_parser = commands.add_parser('scan', help="Scanner des dossards (ex. 1-100,250)")
+    scan_parser.add_argument('bibs', type=bib_list_argument, nargs='?')
+    scan_parser.add_argument('--workers', type=int, default=SCAN_WORKERS, help="Navigateurs simultanés")
+    scan_parser.add_argument('--rate', type=float, default=SCAN_MAX_RATE,
+                             help="Plafond de pages par seconde, adapté à la baisse selon les réponses (0 : sans limite)")
+    scan_parser.add_argument('--profile', choices=('standard', 'fast'), default=BROWSER_PROFILE,
+                             help="Navigateur : 'fast' sans fenêtre, sans images, polices ni traceurs")
+    scan_parser.add_argument('--backend', choices=('webdriver', 'http'), default='webdriver',
+                             help="'http' : essayer d'abord sans navigateur (pages rendues côté serveur)")
+    scan_parser.add_argument('--resume', action='store_true',
+                             help="Ajouter les dossards non terminés ou en échec des scans précédents")
+
+    crawl_parser = commands.add_parser('crawl', help="Parcourir une plage de dossards (reprise automatique)")
+    crawl_parser.add_argument('bibs', type=bib_list_argument)
+    crawl_parser.add_argument('--workers', type=int, default=SCAN_WORKERS, help="Navigateurs simultanés")
+    crawl_parser.add_argument('--rate', type=float, default=SCAN_MAX_RATE, help="Plafond de pages par seconde")
+    crawl_parser.add_argument('--profile', choices=('standard', 'fast'), default=BROWSER_PROFILE,
+                              help="Navigateur : 'fast' sans fenêtre, sans images, polices ni traceurs")
+    crawl_parser.add_argument('--backend', choices=('webdriver', 'http'), default='webdriver',
+                              help="'http' : essayer d'abord sans navigateur (pages rendues côté serveur)")
+    crawl_parser.add_argument('--journal', default=CRAWL_JOURNAL_FILE, help="Journal de progression du parcours")
+
+    top_parser = commands.add_parser('top', help="Écrire les classements TOP en JSON ou CSV")
+    top_parser.add_argument('--bibs', type=bib_list_argument, help="Dossards analysés (tous par défaut)")
+    top_parser.add_argument('--race', default="Toutes les courses")
+    top_parser.add_argument('--section', help="Section détaillée, ex. \"Cilaos → Marla\"")
+    top_parser.add_argument('--limit', type=int, default=20)
+    top_parser.add_argument('--format', choices=('json', 'csv'), default='json')
+    top_parser.add_argument('--output', help="Fichier de sortie (sortie standard par défaut)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'scan':
+        if not args.bibs and not args.resume:
+            scan_parser.error("indiquer des dossards (ex. 1-100,250) ou --resume")
+        return run_cli_scan(args)
+    if args.command == 'crawl':
+        return run_cli_crawl(args)
+    if args.command == 'top':
+        return run_cli_top(args)
 
+    app = RaceTrackerApp()
+    app.run()
+    return 0
 
 
 if __name__ == "__main__":
-    app = RaceTrackerApp()
-    app.run()
+    sys.exit(main())
@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    """Les stockages écrivent dans le répertoire courant : chaque test a le sien"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,17 @@
+import pytest
+
+import GR_v2
+
+
+def test_scan_without_bibs_or_resume_is_an_error(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        GR_v2.main(['scan'])
+    assert exit_info.value.code == 2
+    assert "--resume" in capsys.readouterr().err
+
+
+def test_invalid_bib_list_is_an_error(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        GR_v2.main(['scan', '10-abc'])
+    assert exit_info.value.code == 2
+    assert "liste de dossards invalide" in capsys.readouterr().err
@@ -0,0 +1,189 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import GR_v2
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+RACE_QUERY = '?raceId=GRR'
+
+# Page enregistrée (dossard 1234) telle que PAGE_EXTRACTION_JS la renvoie dans Chrome
+RENDERED_PAGE = {
+    'name': 'DUPONT Jean',
+    'category': 'SE H',
+    'state': 'Finisher',
+    'finish_time': '38:12:45',
+    'speed_items': [['Vit. moy.', '4.32 km/h'], ['Distance', '165 km']],
+    'rankings': [['Général', '152'], ['Sexe', '140'], ['Catégorie', '37']],
+    'rows': [
+        {'point': 'Départ', 'kilometer': '0.0 km', 'passage_time': 'jeu. 22:00', 'race_time': '00:00:00',
+         'speeds': ['00:00:00', '-'], 'effort_speed': None, 'elevations': ['0 m', '0 m'],
+         'rank': '1520', 'rank_evolution': None},
+        {'point': 'Domaine Vidot', 'kilometer': '15.2 km', 'passage_time': 'ven. 00:41', 'race_time': '02:41:12',
+         'speeds': ['02:41:12', '00:03', '5.65 km/h'], 'effort_speed': '8.10 km/h',
+         'elevations': ['8.10 km/h', '1204 m', '96 m'], 'rank': '612', 'rank_evolution': '(+908)'},
+        {'point': 'Arrivée', 'kilometer': '165.0 km', 'passage_time': 'sam. 12:12', 'race_time': '38:12:45',
+         'speeds': ['38:12:45', '3.90 km/h'], 'effort_speed': '6.02 km/h',
+         'elevations': ['6.02 km/h', '312 m', '1877 m'], 'rank': '152', 'rank_evolution': '(-3)'},
+    ]
+}
+
+# Ce que renvoie le serveur quand la page n'est rendue que dans le navigateur
+CLIENT_SHELL = '<html><body><div id="root"></div><script src="/static/js/main.js"></script></body></html>'
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def livetrail():
+    """Serveur local qui rejoue les pages enregistrées : /fr/2024/runners/<dossard>"""
+    pages = {'1234': read_fixture('runner_1234.html')}
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            bib = self.path.rsplit('/', 1)[-1]
+            requests.append(bib)
+            if bib in pages:
+                body, status = pages[bib], 200
+            elif bib.startswith('9'):
+                body, status = CLIENT_SHELL, 200
+            else:
+                body, status = 'Not found', 404
+            content = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.requests = requests
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class FakeElement:
+    text = ''
+
+
+class FakeDriver:
+    """Chrome simulé : la page est déjà rendue, le script d'extraction renvoie RENDERED_PAGE"""
+
+    def __init__(self, html):
+        self.page_source = html
+        self.current_url = ''
+
+    def get(self, url):
+        self.current_url = url + RACE_QUERY
+
+    def find_elements(self, by, class_name):
+        return [FakeElement()]
+
+    def find_element(self, by, class_name):
+        return FakeElement()
+
+    def execute_script(self, script):
+        return RENDERED_PAGE if script == GR_v2.PAGE_EXTRACTION_JS else 0
+
+
+def collect(backend, bibs):
+    results = {}
+    failed = backend.fetch_runners(list(enumerate(bibs)), lambda index, bib, data: results.update({bib: data}))
+    return results, failed
+
+
+def test_parser_matches_javascript_extraction():
+    assert GR_v2.RunnerPageParser().parse(read_fixture('runner_1234.html')) == RENDERED_PAGE
+
+
+def test_http_backend_matches_selenium_path(livetrail):
+    GR_v2.load_selenium()
+    selenium_scraper = GR_v2.RaceDataScraper(offline=True)
+    expected = selenium_scraper.get_runner_data(1234, driver=FakeDriver(read_fixture('runner_1234.html')))
+
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    results, failed = collect(GR_v2.HttpFetchBackend(scraper, base_url=livetrail.base_url), [1234])
+
+    assert failed == []
+    assert expected['infos']['race_name'] == 'Diagonale des Fous'
+    assert results[1234] == expected
+    assert scraper.all_data['1234']['checkpoints'] == expected['checkpoints']
+
+
+def test_http_backend_missing_runner(livetrail):
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    results, failed = collect(GR_v2.HttpFetchBackend(scraper, base_url=livetrail.base_url), [404])
+
+    assert results == {404: None}
+    assert failed == []
+    assert '404' in scraper.empty_bibs
+
+
+def test_http_backend_disabled_after_client_rendered_pages(livetrail):
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    backend = GR_v2.HttpFetchBackend(scraper, base_url=livetrail.base_url, concurrency=1)
+    bibs = [9000 + n for n in range(GR_v2.HTTP_MAX_PARSE_MISSES + 3)]
+
+    results, failed = collect(backend, bibs)
+
+    assert backend.disabled
+    assert results == {}
+    assert [bib for _, bib in failed] == bibs
+    assert len(livetrail.requests) == GR_v2.HTTP_MAX_PARSE_MISSES
+
+    # Désactivé : plus aucune requête, tout part vers Selenium
+    results, failed = collect(backend, [1234])
+    assert failed == [(0, 1234)]
+    assert len(livetrail.requests) == GR_v2.HTTP_MAX_PARSE_MISSES
+
+
+def test_page_metrics_cost_no_extra_round_trip(monkeypatch):
+    """Les octets reçus arrivent avec l'extraction : un seul execute_script par page"""
+    class CountingDriver(FakeDriver):
+        scripts = 0
+
+        def execute_script(self, script):
+            CountingDriver.scripts += 1
+            return {**RENDERED_PAGE, 'transferred': 4096} if script == GR_v2.PAGE_EXTRACTION_JS else 0
+
+    GR_v2.load_selenium()
+    monkeypatch.setattr(GR_v2.RaceDataScraper, 'get_race_from_url', lambda self, driver: "Diagonale des Fous")
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    driver = CountingDriver('')
+    driver.browser_profile = 'fast'
+    assert scraper.get_runner_data(1234, driver=driver)['infos']['name']
+
+    assert CountingDriver.scripts == 1
+    assert scraper.page_metrics['fast']['bytes'] == 4096
+    assert "4 Ko par page" in scraper.describe_page_metrics()
+    scraper.close()
+
+
+def test_http_error_returns_only_undelivered_bibs(livetrail):
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    backend = GR_v2.HttpFetchBackend(scraper, base_url=livetrail.base_url, concurrency=1)
+    delivered = []
+
+    def on_result(index, bib, data):
+        delivered.append(bib)
+        if bib == 404:
+            raise RuntimeError("consommateur en erreur")
+
+    failed = backend.fetch_runners([(0, 1234), (1, 404), (2, 405)], on_result)
+
+    # Le dossard 1234, déjà transmis et enregistré, n'est pas relu par Selenium
+    assert delivered == [1234, 404]
+    assert failed == [(2, 405)]
@@ -0,0 +1,109 @@
+import json
+import os
+
+import GR_v2
+
+
+def checkpoint(index):
+    return {'point': f"Point {index}", 'kilometer': index * 5.0, 'passage_time': f"ven. {index:02d}:00",
+            'race_time': f"{index:02d}:00:00", 'speed': "5.00 km/h", 'effort_speed': "N/A",
+            'elevation_gain': 100, 'elevation_loss': 50, 'rank': str(100 - index), 'rank_evolution': 1}
+
+
+def runner(bib, passages, state="En course"):
+    checkpoints = [checkpoint(index) for index in range(passages)]
+    return {
+        'infos': {'bib_number': bib, 'race_name': "Diagonale des Fous", 'name': f"Coureur {bib}",
+                  'category': "SE H", 'state': state,
+                  'last_checkpoint': checkpoints[-1]['point'] if checkpoints else ""},
+        'checkpoints': checkpoints
+    }
+
+
+def journal_lines():
+    with open(GR_v2.JOURNAL_FILE, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def reload():
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    scraper.load_data()
+    data = dict(scraper.all_data)
+    scraper.close()
+    return data
+
+
+def test_new_passages_are_journaled_as_deltas():
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    scraper.store_runner('7', runner(7, 2))
+    scraper.store_runner('7', runner(7, 4))
+    scraper.store_runner('7', runner(7, 5, state="Finisher"))
+    expected = dict(scraper.all_data)
+    scraper.close()
+
+    lines = journal_lines()
+    assert 'data' in lines[0]
+    assert [(line['checkpoints_from'], len(line['checkpoints'])) for line in lines[1:]] == [(2, 2), (4, 1)]
+    assert lines[2]['infos']['state'] == "Finisher"
+    assert reload() == expected
+
+
+def test_corrected_passages_are_journaled_in_full():
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    scraper.store_runner('7', runner(7, 3))
+    corrected = runner(7, 4)
+    corrected['checkpoints'][1]['race_time'] = "01:05:00"
+    scraper.store_runner('7', corrected)
+    expected = dict(scraper.all_data)
+    scraper.close()
+
+    assert all('data' in line for line in journal_lines())
+    assert reload() == expected
+
+
+def test_deltas_replay_after_compaction():
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    scraper.store_runner('7', runner(7, 2))
+    scraper.store_runner('8', runner(8, 1))
+    scraper.save_data()
+    scraper.store_runner('7', runner(7, 3))
+    expected = dict(scraper.all_data)
+    scraper.close()
+
+    assert [line['bib'] for line in journal_lines()] == ['7']
+    assert reload() == expected
+
+
+def test_unchanged_reading_persists_its_date():
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    assert scraper.store_runner('7', runner(7, 3))
+    first = scraper.all_data['7']['infos']['scraped_at']
+    assert not scraper.store_runner('7', runner(7, 3))
+    refreshed = scraper.all_data['7']['infos']['scraped_at']
+    scraper.close()
+
+    assert refreshed >= first
+    assert journal_lines()[-1] == {'bib': '7', 'scraped_at': refreshed}
+    reloaded = reload()
+    assert reloaded['7']['infos']['scraped_at'] == refreshed
+    assert reloaded['7']['checkpoints'] == runner(7, 3)['checkpoints']
+
+
+def test_failed_snapshot_keeps_the_rotated_journal(monkeypatch):
+    """Un instantané en échec puis une nouvelle compaction interrompue ne perdent aucun coureur"""
+    def failing_dump(*args, **kwargs):
+        raise OSError("disque plein")
+
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    scraper.store_runner('1', runner(1, 2))
+    with monkeypatch.context() as patch:
+        patch.setattr(GR_v2.json, 'dump', failing_dump)
+        scraper.save_data()
+        scraper.store_runner('2', runner(2, 1))
+        scraper.save_data()  # Arrêt avant que l'instantané ne soit écrit
+    expected = dict(scraper.all_data)
+    scraper.close()
+
+    assert reload() == expected
+    assert not os.path.exists(GR_v2.JOURNAL_FILE + '.compacting')
+
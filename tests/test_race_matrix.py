@@ -0,0 +1,239 @@
+import random
+
+import pytest
+
+import GR_v2
+from GR_v2 import RaceMatrix, RunnerRecord
+
+POINTS = ['Départ', 'Domaine Vidot', 'Cilaos', 'Marla', 'Roche Plate', 'Deux Bras', 'Colorado', 'Arrivée']
+
+
+def generate_race(seed, size):
+    """Coureurs (dossard, données brutes) avec passages manquants, temps absents et classements illisibles"""
+    rnd = random.Random(seed)
+    runners = []
+    for bib in range(1, size + 1):
+        seconds = 0
+        kilometer = 0.0
+        checkpoints = []
+        for i in range(rnd.randint(0, len(POINTS))):
+            if i:
+                seconds += rnd.choice([0, 600, 1200, 3600, 3600, 5400])
+                kilometer += rnd.choice([0.0, 5.3, 10.1, 7.7])
+            checkpoints.append({
+                'point': POINTS[i] if rnd.random() > 0.05 else 'Ravitaillement',
+                'kilometer': round(kilometer, 1),
+                'race_time': None if rnd.random() < 0.05 else GR_v2.format_duration(seconds),
+                'speed': rnd.choice(["N/A", "5.00 km/h", "6.20 km/h", "7.10 km/h"]),
+                'effort_speed': rnd.choice(["N/A", "8.00 km/h", "9.30 km/h", "10.10 km/h"]),
+                'elevation_gain': rnd.choice([0, 50, 150, 800]),
+                'elevation_loss': rnd.choice([0, 120, 600, -200]),
+                'rank': rnd.choice([None, "", "DNF"]) if rnd.random() < 0.15 else str(rnd.randint(1, 50)),
+                'rank_evolution': None
+            })
+        runners.append((bib, {
+            'infos': {'race_name': rnd.choice(["Diagonale des Fous", "Trail de Bourbon"]),
+                      'name': f"Coureur {bib}", 'category': "SE H", 'state': "Finisher"},
+            'checkpoints': checkpoints
+        }))
+    return runners
+
+
+# Implémentation de référence : les boucles Python d'avant RaceMatrix
+
+def reference_tops(runners, limit=20):
+    records = [(bib, RunnerRecord.from_data(data)) for bib, data in runners]
+    tops = {}
+
+    progressions = []
+    for bib, record in records:
+        checkpoints = record.checkpoints
+        if len(checkpoints) >= 2:
+            ranks = [cp.rank for cp in checkpoints if cp.rank is not None]
+            if ranks:
+                progressions.append({'progression': ranks[0] - ranks[-1], 'bib': bib, 'name': record.name,
+                                     'race': record.race_name, 'start_pos': ranks[0], 'end_pos': ranks[-1]})
+    progressions.sort(key=lambda x: x['progression'], reverse=True)
+    tops['progressions'] = progressions[:limit]
+
+    section_progressions = []
+    for bib, record in records:
+        checkpoints = record.checkpoints
+        for i in range(len(checkpoints) - 1):
+            rank1, rank2 = checkpoints[i].rank, checkpoints[i + 1].rank
+            if rank1 is not None and rank2 is not None and rank1 - rank2 > 0:
+                section_progressions.append({
+                    'progression': rank1 - rank2, 'bib': bib, 'name': record.name, 'race': record.race_name,
+                    'from_point': checkpoints[i].point, 'to_point': checkpoints[i + 1].point,
+                    'start_rank': rank1, 'end_rank': rank2
+                })
+    section_progressions.sort(key=lambda x: x['progression'], reverse=True)
+    tops['section_progressions'] = section_progressions[:limit]
+
+    for attribute in ('elevation_gain', 'elevation_loss'):
+        climbers = []
+        for bib, record in records:
+            checkpoints = record.checkpoints
+            total_time = total_elevation = total_distance = 0
+            for i in range(len(checkpoints) - 1):
+                if getattr(checkpoints[i], attribute) > 100:
+                    time1, time2 = checkpoints[i].race_seconds, checkpoints[i + 1].race_seconds
+                    if time1 is None or time2 is None:
+                        continue
+                    hours = (time2 - time1) / 3600
+                    distance = checkpoints[i + 1].kilometer - checkpoints[i].kilometer
+                    if hours > 0:
+                        total_time += hours
+                        total_elevation += abs(getattr(checkpoints[i], attribute))
+                        total_distance += distance
+            if total_time > 0:
+                climbers.append({
+                    'speed': total_elevation / total_time, 'bib': bib, 'name': record.name,
+                    'race': record.race_name, attribute: total_elevation, 'time': total_time,
+                    'distance': total_distance,
+                    'elevation_ratio': total_elevation / (total_distance * 1000) if total_distance > 0 else 0
+                })
+        climbers.sort(key=lambda x: x['speed'], reverse=True)
+        tops[attribute] = climbers[:limit]
+
+    speeds, efforts, section_speeds = [], [], []
+    for bib, record in records:
+        checkpoints = record.checkpoints
+        speed_sum = effort_sum = count = 0
+        for cp in checkpoints:
+            if cp.speed is None or cp.effort_speed is None:
+                continue
+            speed_sum += cp.speed
+            effort_sum += cp.effort_speed
+            count += 1
+        if count:
+            speeds.append({'speed': speed_sum / count, 'bib': bib, 'name': record.name, 'race': record.race_name})
+            efforts.append({'effort': effort_sum / count, 'bib': bib, 'name': record.name, 'race': record.race_name})
+        for i in range(len(checkpoints) - 1):
+            time1, time2 = checkpoints[i].race_seconds, checkpoints[i + 1].race_seconds
+            if time1 is None or time2 is None:
+                continue
+            hours = (time2 - time1) / 3600
+            distance = checkpoints[i + 1].kilometer - checkpoints[i].kilometer
+            if hours > 0:
+                section_speeds.append({
+                    'speed': distance / hours, 'bib': bib, 'name': record.name, 'race': record.race_name,
+                    'from_point': checkpoints[i].point, 'to_point': checkpoints[i + 1].point, 'distance': distance
+                })
+    speeds.sort(key=lambda x: x['speed'], reverse=True)
+    efforts.sort(key=lambda x: x['effort'], reverse=True)
+    section_speeds.sort(key=lambda x: x['speed'], reverse=True)
+    tops['speeds'], tops['efforts'], tops['section_speeds'] = speeds[:limit], efforts[:limit], section_speeds[:limit]
+
+    sections_info = {}
+    for bib, record in records:
+        checkpoints = record.checkpoints
+        for i in range(len(checkpoints) - 1):
+            name = f"{checkpoints[i].point} → {checkpoints[i + 1].point}"
+            if name not in sections_info:
+                sections_info[name] = {
+                    'name': name,
+                    'distance': checkpoints[i + 1].kilometer - checkpoints[i].kilometer,
+                    'elevation_gain': checkpoints[i + 1].elevation_gain,
+                    'elevation_loss': checkpoints[i + 1].elevation_loss
+                }
+    tops['sections_info'] = sections_info
+    tops['section_performances'] = {
+        name: reference_section_performances(runners, records, name, info, limit)
+        for name, info in sections_info.items()
+    }
+    return tops
+
+
+def reference_section_performances(runners, records, section_name, section_info, limit):
+    """Classements d'une section ; les classements sont relus depuis le texte, un texte illisible écarte le passage"""
+    performances = []
+    for (bib, data), (_, record) in zip(runners, records):
+        checkpoints = record.checkpoints
+        for i in range(len(checkpoints) - 1):
+            if f"{checkpoints[i].point} → {checkpoints[i + 1].point}" != section_name:
+                continue
+            time1, time2 = checkpoints[i].race_seconds, checkpoints[i + 1].race_seconds
+            if time1 is None or time2 is None:
+                continue
+            seconds = time2 - time1
+            hours = seconds / 3600
+            if hours <= 0:
+                continue
+            try:
+                raw1, raw2 = data['checkpoints'][i]['rank'], data['checkpoints'][i + 1]['rank']
+                rank1 = int(raw1) if raw1 else 0
+                rank2 = int(raw2) if raw2 else 0
+            except ValueError:
+                continue
+            distance_m = section_info['distance'] * 1000
+            tendency = "➡️"
+            if distance_m > 0:
+                ratio = (section_info['elevation_gain'] - section_info['elevation_loss']) / distance_m
+                tendency = "↗️" if ratio > 0.05 else ("↘️" if ratio < -0.05 else "➡️")
+            performances.append({
+                'bib': bib, 'name': record.name, 'race': record.race_name, 'time': seconds,
+                'speed': section_info['distance'] / hours,
+                'effort_speed': (section_info['distance'] + section_info['elevation_gain'] / 1000 * 10 +
+                                 section_info['elevation_loss'] / 1000 * 2) / hours,
+                'progression': rank1 - rank2 if rank1 and rank2 else 0,
+                'start_rank': rank1, 'end_rank': rank2, 'tendency': tendency
+            })
+
+    results = {}
+    if performances:
+        performances.sort(key=lambda x: x['time'])
+        results['time'] = performances[:limit]
+        performances.sort(key=lambda x: x['speed'], reverse=True)
+        results['speed'] = performances[:limit]
+        performances.sort(key=lambda x: x['effort_speed'], reverse=True)
+        results['effort'] = performances[:limit]
+        performances.sort(key=lambda x: x['progression'], reverse=True)
+        results['progression'] = performances[:limit]
+    return results
+
+
+def matrix_tops(runners, limit=20):
+    matrix = RaceMatrix([(bib, RunnerRecord.from_data(data)) for bib, data in runners])
+    tops = {
+        'progressions': matrix.progressions(limit),
+        'section_progressions': matrix.section_progressions(limit),
+        'elevation_gain': matrix.climbers(limit),
+        'elevation_loss': matrix.descenders(limit),
+        'section_speeds': matrix.section_speeds(limit),
+        'sections_info': matrix.sections_info()
+    }
+    tops['speeds'], tops['efforts'] = matrix.average_speeds(limit)
+    tops['section_performances'] = {
+        name: matrix.section_performances(name, info, limit) for name, info in tops['sections_info'].items()
+    }
+    return tops
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_matrix_matches_reference_loops(seed):
+    runners = generate_race(seed, random.Random(seed).randint(0, 150))
+    expected = reference_tops(runners)
+    actual = matrix_tops(runners)
+    assert actual.keys() == expected.keys()
+    for key in expected:
+        assert actual[key] == expected[key], key
+
+
+def test_unreadable_rank_skips_section_performance():
+    runners = [(bib, {
+        'infos': {'race_name': "Zembrocal", 'name': f"Coureur {bib}", 'category': "SE H", 'state': "En course"},
+        'checkpoints': [
+            {'point': 'Départ', 'kilometer': 0.0, 'race_time': "00:00:00", 'rank': rank, 'speed': "N/A",
+             'effort_speed': "N/A", 'elevation_gain': 0, 'elevation_loss': 0, 'rank_evolution': None},
+            {'point': 'Cilaos', 'kilometer': 10.0, 'race_time': "02:00:00", 'rank': "3", 'speed': "N/A",
+             'effort_speed': "N/A", 'elevation_gain': 500, 'elevation_loss': 100, 'rank_evolution': None}
+        ]
+    }) for bib, rank in ((1, "DNF"), (2, ""), (3, "5"))]
+    matrix = RaceMatrix([(bib, RunnerRecord.from_data(data)) for bib, data in runners])
+    name = "Départ → Cilaos"
+
+    performances = matrix.section_performances(name, matrix.sections_info()[name])
+
+    assert [p['bib'] for p in performances['time']] == [2, 3]
+    assert [p['progression'] for p in performances['time']] == [0, 2]
@@ -0,0 +1,119 @@
+import random
+
+import pytest
+
+from GR_v2 import RunnerRowModel
+
+RACES = ["Diagonale des Fous", "Trail de Bourbon", "Mascareignes"]
+CATEGORIES = ["SE H", "SE F", "V1 H", "V2 F"]
+STATES = ["En course", "Finisher", "Abandon", "Non partant"]
+
+
+def make_runner(rnd, bib):
+    """Données d'un coureur avec des ex-aequo, des classements vides ("-", "") et des textes"""
+    return {
+        'infos': {
+            'race_name': rnd.choice(RACES),
+            'bib_number': bib,
+            'name': rnd.choice(["DUPONT Jean", "MARTIN Léa", "Hoarau Paul", "payet Marie"]),
+            'category': rnd.choice(CATEGORIES),
+            'overall_rank': rnd.choice(["-", "", str(rnd.randint(1, 30))]),
+            'gender_rank': str(rnd.randint(1, 10)),
+            'category_rank': rnd.choice(["-", "DNF", str(rnd.randint(1, 5))]),
+            'average_speed': rnd.choice(["N/A", "4.32 km/h", "5.10 km/h"]),
+            'state': rnd.choice(STATES),
+            'last_checkpoint': rnd.choice(["Cilaos", "Marla", "Arrivée"]),
+            'finish_time': rnd.choice(["En course", "38h12", "-"]),
+            'total_elevation_gain': rnd.choice([0, 1204, 9800]),
+            'total_elevation_loss': rnd.choice([0, 96, 10100])
+        },
+        'checkpoints': []
+    }
+
+
+def expected_bibs(all_data, filters, column=None, reverse=False):
+    """Référence : filtre puis sorted() sur toutes les données, sans index ni permutation en cache"""
+    rows = [RunnerRowModel.row_values(data) for data in all_data.values()]
+    rows = [
+        values for values in rows
+        if all(filters[key] == RunnerRowModel.NO_FILTER[key] or str(values[index]) == filters[key]
+               for key, index in RunnerRowModel.FILTER_COLUMNS.items())
+    ]
+    if column is not None:
+        rows = sorted(rows, key=lambda values: RunnerRowModel.sort_key(column, values[column]), reverse=reverse)
+    return [values[1] for values in rows]
+
+
+def random_filters(rnd):
+    return {
+        'race': rnd.choice([RunnerRowModel.NO_FILTER['race']] + RACES),
+        'category': rnd.choice([RunnerRowModel.NO_FILTER['category']] + CATEGORIES),
+        'state': rnd.choice([RunnerRowModel.NO_FILTER['state']] + STATES)
+    }
+
+
+def load(model, all_data):
+    for data in all_data.values():
+        model.upsert(data)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_sort_and_filters_match_sorted(seed):
+    rnd = random.Random(seed)
+    all_data = {str(bib): make_runner(rnd, bib) for bib in rnd.sample(range(1, 3000), 150)}
+    model = RunnerRowModel()
+    load(model, all_data)
+
+    for column in range(13):
+        for reverse in (False, True):
+            model.filters = random_filters(rnd)
+            model.sort(column, reverse)
+            assert model.visible_bibs() == expected_bibs(all_data, model.filters, column, reverse), (column, reverse)
+            # Deuxième passage : permutation reprise du cache
+            model.sort(column, reverse)
+            assert model.visible_bibs() == expected_bibs(all_data, model.filters, column, reverse)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_filters_without_sort_keep_arrival_order(seed):
+    rnd = random.Random(seed)
+    all_data = {str(bib): make_runner(rnd, bib) for bib in range(1, 120)}
+    model = RunnerRowModel()
+    load(model, all_data)
+
+    for _ in range(20):
+        model.filters = random_filters(rnd)
+        model.refresh()
+        assert model.visible_bibs() == expected_bibs(all_data, model.filters)
+        assert model.distinct('race') == {data['infos']['race_name'] for data in all_data.values()}
+
+
+def test_updates_invalidate_cached_permutations():
+    rnd = random.Random(42)
+    all_data = {str(bib): make_runner(rnd, bib) for bib in range(1, 200)}
+    model = RunnerRowModel()
+    load(model, all_data)
+    model.filters = {**RunnerRowModel.NO_FILTER, 'state': "Finisher"}
+    model.sort(4, False)
+
+    # Nouveaux relevés : états et classements modifiés, nouveaux coureurs
+    for bib in rnd.sample(sorted(all_data), 50):
+        all_data[bib] = make_runner(rnd, int(bib))
+        model.upsert(all_data[bib])
+    new_bibs = list(range(500, 520))
+    for bib in new_bibs:
+        all_data[str(bib)] = make_runner(rnd, bib)
+        model.upsert(all_data[str(bib)])
+
+    # Les coureurs arrivés après le tri restent en fin de tableau jusqu'au prochain tri
+    model.refresh()
+    tail = [bib for bib in model.visible_bibs() if bib in new_bibs]
+    assert model.visible_bibs()[len(model.visible_bibs()) - len(tail):] == tail
+    assert tail == [bib for bib in new_bibs if all_data[str(bib)]['infos']['state'] == "Finisher"]
+
+    for column, reverse in ((4, False), (4, True), (1, True), (2, False)):
+        model.sort(column, reverse)
+        assert model.visible_bibs() == expected_bibs(all_data, model.filters, column, reverse)
+
+    model.reset_filters()
+    assert model.visible_bibs() == expected_bibs(all_data, RunnerRowModel.NO_FILTER, 2, False)
@@ -0,0 +1,226 @@
+import json
+import threading
+import time
+
+import pytest
+
+import GR_v2
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    def quit(self):
+        self.closed = True
+
+
+def make_runner(bib):
+    return {
+        'infos': {'bib_number': bib, 'race_name': "Zembrocal", 'name': f"Coureur {bib}", 'category': "SE H",
+                  'state': "Finisher"},
+        'checkpoints': []
+    }
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Pool sans Chrome : get_runner_data est remplacé par chaque test"""
+    monkeypatch.setattr(GR_v2, 'SCAN_RETRY_BASE', 0.02)
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    scraper.create_driver = FakeBrowser
+    pool = GR_v2.ScanPool(scraper, workers=1, max_rate=0)
+    pool.breaker.cooldown = pool.breaker.base_cooldown = 0.01
+    yield pool
+    pool.close()
+    scraper.close()
+
+
+def test_retry_does_not_wait_for_the_rest_of_the_scan(pool):
+    calls = []
+    lock = threading.Lock()
+
+    def get_runner_data(bib, driver=None, refresh=False):
+        with lock:
+            calls.append(bib)
+            first_attempt = calls.count(bib) == 1
+        time.sleep(0.02)
+        if bib == 1 and first_attempt:
+            pool.scraper.fetch_errors[str(bib)] = "Page sans coureur"
+            return None
+        return make_runner(bib)
+
+    pool.scraper.get_runner_data = get_runner_data
+    delivered = []
+    counts = pool.run(list(range(1, 21)), lambda index, bib, data, cached: delivered.append((bib, bool(data))))
+
+    assert counts['failed'] == 0
+    assert sorted(delivered) == [(bib, True) for bib in range(1, 21)]
+    # Le dossard 1 est retenté dès son échéance, pas après le 20
+    assert calls.index(1, 1) < calls.index(20)
+
+
+def test_crawl_journals_found_and_empty_but_retries_failures(pool):
+    def get_runner_data(bib, driver=None, refresh=False):
+        if bib == 3:
+            pool.scraper.empty_bibs.add(str(bib))
+            return None
+        if bib == 4:
+            pool.scraper.fetch_errors[str(bib)] = "Page sans coureur après 10s"
+            return None
+        return make_runner(bib)
+
+    pool.scraper.get_runner_data = get_runner_data
+    crawl = GR_v2.BibCrawl()
+    statuses = {}
+    crawl.run(pool, [1, 2, 3, 4, 5], lambda bib, data, status: statuses.update({bib: status}))
+    crawl.close()
+
+    assert statuses == {1: 'found', 2: 'found', 3: 'empty', 4: None, 5: 'found'}
+    with open(GR_v2.CRAWL_JOURNAL_FILE, encoding='utf-8') as f:
+        assert sorted(json.loads(line)['bib'] for line in f) == [1, 2, 3, 5]
+    assert GR_v2.BibCrawl().pending([1, 2, 3, 4, 5]) == [4]
+
+
+def test_bib_list_size_is_bounded():
+    assert GR_v2.parse_bib_list("1-3, 7") == [1, 2, 3, 7]
+    assert len(GR_v2.parse_bib_list(f"1-{GR_v2.MAX_BIB_COUNT}")) == GR_v2.MAX_BIB_COUNT
+    with pytest.raises(ValueError):
+        GR_v2.parse_bib_list("1-99999999")
+    with pytest.raises(ValueError):
+        GR_v2.parse_bib_list(f"1-{GR_v2.MAX_BIB_COUNT}, {GR_v2.MAX_BIB_COUNT + 1}")
+
+
+def test_bib_list_drops_duplicates_in_order():
+    assert GR_v2.parse_bib_list("7, 3-5, 4, 7, 1-3") == [7, 3, 4, 5, 1, 2]
+    # Des plages qui se recouvrent ne comptent qu'une fois dans la limite
+    assert len(GR_v2.parse_bib_list(f"1-{GR_v2.MAX_BIB_COUNT}, 1-{GR_v2.MAX_BIB_COUNT}")) == GR_v2.MAX_BIB_COUNT
+
+
+class RenderedPage:
+    """Chrome simulé sans coureur affiché : seul le texte de la page varie"""
+
+    def __init__(self, body, url="https://example.test/fr/2024/runners/3"):
+        self.body = body
+        self.url = url
+        self.current_url = ''
+
+    def get(self, url):
+        self.current_url = self.url
+
+    def find_elements(self, by, class_name):
+        return []
+
+    def execute_script(self, script):
+        return self.body if 'innerText' in script else 0
+
+
+@pytest.mark.parametrize('body, url, empty', [
+    ("Coureur introuvable", "https://example.test/fr/2024/runners/3", True),
+    ("", "https://example.test/fr/2024/runners/3", False),
+    ("Impossible de trouver l'adresse : introuvable", "chrome-error://chromewebdata/", False),
+])
+def test_only_an_explicit_message_marks_a_bib_empty(body, url, empty):
+    GR_v2.load_selenium()
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    scraper.wait_for_page = lambda driver: False  # Pas d'attente réelle de PAGE_READY_TIMEOUT
+
+    assert scraper.get_runner_data(3, driver=RenderedPage(body, url)) is None
+    assert ('3' in scraper.empty_bibs) == empty
+    assert ('3' in scraper.fetch_errors) == (not empty)
+
+
+def test_outage_is_retried_and_trips_the_breaker(pool):
+    pool.breaker.window = 4
+    pool.breaker.max_cooldown = 0.05
+
+    def get_runner_data(bib, driver=None, refresh=False):
+        pool.scraper.fetch_errors[str(bib)] = "Page sans coureur après 10s"
+        return None
+
+    pool.scraper.get_runner_data = get_runner_data
+    pool.scraper.empty_bibs.add('2')  # Constaté vide lors d'un scan précédent de la session
+    delivered = []
+    counts = pool.run([1, 2, 3, 4], lambda index, bib, data, cached: delivered.append(bib), refresh=True)
+
+    assert counts['failed'] == 4
+    assert sorted(delivered) == [1, 2, 3, 4]
+    assert pool.breaker.trips >= 1
+    assert pool.jobs.incomplete() == [1, 2, 3, 4]
+    assert not pool.scraper.empty_bibs
+
+
+def test_job_queue_error_does_not_kill_the_worker(pool, monkeypatch):
+    mark = pool.jobs.mark
+
+    def failing_mark(bib, status):
+        # Dossard 2 : échec à chaque tentative (retenté) ; dossard 3 : échec après le chargement
+        if (bib, status) in ((2, 'running'), (3, 'done')):
+            raise GR_v2.sqlite3.OperationalError("database is locked")
+        mark(bib, status)
+
+    monkeypatch.setattr(pool.jobs, 'mark', failing_mark)
+    pool.scraper.get_runner_data = lambda bib, driver=None, refresh=False: make_runner(bib)
+    delivered = []
+    counts = pool.run([1, 2, 3, 4], lambda index, bib, data, cached: delivered.append((bib, bool(data))))
+
+    assert sorted(delivered) == [(1, True), (2, False), (3, False), (4, True)]
+    assert counts['failed'] == 2
+    assert pool.jobs.incomplete() == [2, 3]
+
+
+def test_fetch_error_still_returns_every_bib(pool, monkeypatch):
+    def broken_fetch(items, results):
+        results.put((0, 1, make_runner(1), False))
+        raise RuntimeError("file de scan indisponible")
+
+    monkeypatch.setattr(pool, 'fetch', broken_fetch)
+    delivered = []
+    counts = pool.run([1, 2, 3], lambda index, bib, data, cached: delivered.append((bib, bool(data))))
+
+    assert delivered == [(1, True), (2, False), (3, False)]
+    assert counts['failed'] == 2
+
+
+def test_close_cancels_or_quits_prewarmed_browsers(pool):
+    """Aucun navigateur de remplacement ne survit à la fermeture du pool"""
+    launching, release = threading.Event(), threading.Event()
+    launched = []
+
+    def slow_browser():
+        launching.set()
+        release.wait(5)
+        launched.append(FakeBrowser())
+        return launched[-1]
+
+    first = pool.register(FakeBrowser())
+    second = pool.register(FakeBrowser())
+    # Le premier remplaçant occupe un thread, un bouchon occupe l'autre : le second attend
+    first.replacement = pool.warmer.submit(slow_browser)
+    pool.warmer.submit(release.wait, 5)
+    second.replacement = pool.warmer.submit(slow_browser)
+    assert launching.wait(5)
+    pending = second.replacement
+    pool.release_driver(first)  # Le second reste attribué, comme après un scan interrompu
+
+    threading.Timer(0.05, release.set).start()
+    pool.close()
+
+    assert pending.cancelled()
+    assert len(launched) == 1 and launched[0].closed
+    assert first.driver.closed and second.driver.closed
+
+
+def test_browser_keeps_the_profile_it_was_launched_with(pool):
+    """Basculer le profil n'affecte ni les mesures ni le recyclage des navigateurs déjà lancés"""
+    class FastBrowser(FakeBrowser):
+        browser_profile = 'fast'
+
+    browser = FastBrowser()
+    pool.scraper.browser_profile = 'standard'
+    managed = pool.register(browser)
+    pool.scraper.record_page_metrics(browser, 0.5)
+    pool.scraper.record_page_transfer(browser, 2048)
+
+    assert managed.profile == 'fast'
+    assert pool.scraper.page_metrics == {'fast': {'pages': 1, 'seconds': 0.5, 'bytes': 2048, 'measured': 1}}
@@ -0,0 +1,56 @@
+import threading
+
+import GR_v2
+
+
+def checkpoint(index):
+    return {'point': f"Point {index}", 'kilometer': index * 5.0, 'passage_time': f"ven. {index:02d}:00",
+            'race_time': f"{index:02d}:00:00", 'speed': "5.00 km/h", 'effort_speed': "N/A",
+            'elevation_gain': 100, 'elevation_loss': 50, 'rank': str(100 - index), 'rank_evolution': 1}
+
+
+def runner(bib, passages=2):
+    return {
+        'infos': {'bib_number': bib, 'race_name': "Mascareignes", 'name': f"Coureur {bib}", 'category': "SE H",
+                  'state': "En course"},
+        'checkpoints': [checkpoint(index) for index in range(passages)]
+    }
+
+
+def test_infos_and_items_are_read_in_chunks(monkeypatch):
+    monkeypatch.setattr(GR_v2, 'SQLITE_READ_CHUNK', 3)
+    store = GR_v2.SQLiteRaceStore('runners.db')
+    runners = store.load()
+    runners.update({str(bib): runner(bib) for bib in range(1, 9)})
+
+    assert [(bib, infos['name']) for bib, infos in runners.infos()] == [
+        (str(bib), f"Coureur {bib}") for bib in range(1, 9)
+    ]
+    assert dict(runners.items()) == {str(bib): runner(bib) for bib in range(1, 9)}
+    assert list(runners.values()) == [runner(bib) for bib in range(1, 9)]
+    store.connection.close()
+
+
+def test_lru_cache_survives_concurrent_access():
+    store = GR_v2.SQLiteRaceStore('runners.db')
+    runners = GR_v2.SQLiteRunnerMap(store, cache_size=4)
+    runners.update({str(bib): runner(bib, 1) for bib in range(1, 21)})
+    errors = []
+
+    def read(offset):
+        try:
+            for turn in range(200):
+                bib = str((turn + offset) % 20 + 1)
+                assert runners[bib]['infos']['bib_number'] == int(bib)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(runners.cache) <= 4
+    store.connection.close()
@@ -0,0 +1,90 @@
+import GR_v2
+from GR_v2 import TopResultCache
+
+
+def make_runner(bib, race, rank):
+    return {
+        'infos': {'bib_number': bib, 'race_name': race, 'name': f"Coureur {bib}", 'category': "SE H",
+                  'state': "En course"},
+        'checkpoints': [
+            {'point': "Départ", 'kilometer': 0.0, 'race_time': "00:00:00", 'rank': "10", 'speed': "N/A",
+             'effort_speed': "N/A", 'elevation_gain': 0, 'elevation_loss': 0, 'rank_evolution': None},
+            {'point': "Cilaos", 'kilometer': 10.0, 'race_time': "02:00:00", 'rank': str(rank), 'speed': "N/A",
+             'effort_speed': "N/A", 'elevation_gain': 500, 'elevation_loss': 100, 'rank_evolution': None}
+        ]
+    }
+
+
+def cached_ranking(scraper, race, computed):
+    """Même parcours que TopAnalysisWindow.get_ranking : lecture au numéro de version, sinon calcul"""
+    key = ((), race, 'progressions', None)
+    version = scraper.race_version(race)
+    result = scraper.top_cache.get(key, version)
+    if result is None:
+        computed.append(race)
+        result = GR_v2.compute_top_tables(scraper, list(scraper.all_data), race)['progressions']
+        scraper.top_cache.put(key, version, result)
+    return result
+
+
+def test_results_follow_version():
+    cache = TopResultCache(max_size=2)
+    cache.put('a', 1, ['résultat'])
+    assert cache.get('a', 1) == ['résultat']
+    assert cache.get('a', 2) is None
+    assert cache.get('a', 1) is None  # Entrée périmée supprimée
+
+    cache.put('a', 1, 'A')
+    cache.put('b', 1, 'B')
+    cache.get('a', 1)
+    cache.put('c', 1, 'C')
+    assert cache.get('b', 1) is None  # Moins récemment utilisée
+    assert cache.get('a', 1) == 'A' and cache.get('c', 1) == 'C'
+
+
+def test_scan_invalidates_only_touched_race():
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    scraper.store_runner('1', make_runner(1, "Diagonale des Fous", 5))
+    scraper.store_runner('2', make_runner(2, "Zembrocal", 3))
+    computed = []
+
+    grr = cached_ranking(scraper, "Diagonale des Fous", computed)
+    cached_ranking(scraper, "Zembrocal", computed)
+    cached_ranking(scraper, "Toutes les courses", computed)
+    assert cached_ranking(scraper, "Diagonale des Fous", computed) is grr
+    assert computed == ["Diagonale des Fous", "Zembrocal", "Toutes les courses"]
+
+    # Nouveau relevé sur la Diagonale : sa version et la version globale changent
+    grr_version, zem_version = scraper.race_version("Diagonale des Fous"), scraper.race_version("Zembrocal")
+    assert scraper.store_runner('1', make_runner(1, "Diagonale des Fous", 2))
+    assert scraper.race_version("Diagonale des Fous") > grr_version
+    assert scraper.race_version("Zembrocal") == zem_version
+
+    computed.clear()
+    updated = cached_ranking(scraper, "Diagonale des Fous", computed)
+    cached_ranking(scraper, "Zembrocal", computed)
+    cached_ranking(scraper, "Toutes les courses", computed)
+    assert computed == ["Diagonale des Fous", "Toutes les courses"]
+    assert updated[0]['progression'] == 8 and grr[0]['progression'] == 5
+
+    # Relevé identique : aucune version ne bouge, les classements restent en cache
+    computed.clear()
+    assert not scraper.store_runner('1', make_runner(1, "Diagonale des Fous", 2))
+    cached_ranking(scraper, "Diagonale des Fous", computed)
+    cached_ranking(scraper, "Toutes les courses", computed)
+    assert computed == []
+
+
+def test_runner_changing_race_invalidates_both_races():
+    scraper = GR_v2.RaceDataScraper(offline=True)
+    scraper.store_runner('1', make_runner(1, "Diagonale des Fous", 5))
+    scraper.store_runner('2', make_runner(2, "Zembrocal", 3))
+    computed = []
+    cached_ranking(scraper, "Diagonale des Fous", computed)
+    cached_ranking(scraper, "Zembrocal", computed)
+
+    computed.clear()
+    scraper.store_runner('1', make_runner(1, "Zembrocal", 5))
+    assert cached_ranking(scraper, "Diagonale des Fous", computed) == []
+    assert [row['bib'] for row in cached_ranking(scraper, "Zembrocal", computed)] == ['2', '1']
+    assert computed == ["Diagonale des Fous", "Zembrocal"]